@@ -0,0 +1,60 @@
+"""Benchmark the interpretation agent graph, sequential vs fan-out/fan-in vs fused vs chunked.
+
+Usage:
+    python -m benchmarks.bench_agent
+
+Runs the agent on synthetic sessions with both graph shapes and prints the
+total wall time next to the per-node wall times reported in node_timings.
+The branches share the GIL, so the parallel graph mostly pays off once a
+branch waits on I/O (e.g. an LLM call in moment interpretation). The fused
+and chunked engines are timed end to end for comparison; the chunked engine
+only gains on sessions spanning several chunks and machines with several
+CPUs, and its first run includes starting the worker processes.
+"""
+
+import time
+
+from benchmarks.bench_alignment import make_session, to_records
+from src.core.agent import get_interpretation_agent, run_interpretation_on_records
+
+NODES = (
+    "temporal_alignment", "speaker_indexing", "pattern_analysis", "anomaly_detection",
+    "moment_interpretation", "speaker_profiling", "report_synthesis",
+)
+
+
+def run(parallel: bool, transcription, emotions):
+    """Return (total wall ms, node timings) for one agent run."""
+    agent = get_interpretation_agent(parallel=parallel)
+    started = time.perf_counter()
+    state = agent.invoke({
+        "transcription_entries": transcription,
+        "emotion_detections": emotions,
+        "input_format": "ms",
+        "steps_completed": []
+    })
+    return (time.perf_counter() - started) * 1000, state["node_timings"]
+
+
+def run_engine(engine, transcription, emotions):
+    """Return the total wall ms of one run of a non-graph engine."""
+    started = time.perf_counter()
+    run_interpretation_on_records(transcription, emotions, engine=engine)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    header = " ".join(f"{name[:12]:>12}" for name in NODES)
+    print(f"{'minutes':>8} {'graph':>10} {'total ms':>9} {header}")
+    for minutes in (5, 15, 60):
+        transcription, emotions = to_records(*make_session(minutes))
+        for parallel in (False, True):
+            total, timings = run(parallel, transcription, emotions)
+            cells = " ".join(f"{timings[name]:>12.1f}" for name in NODES)
+            print(f"{minutes:>8} {'parallel' if parallel else 'sequential':>10} {total:>9.1f} {cells}")
+        for engine in ("fused", "chunked"):
+            print(f"{minutes:>8} {engine:>10} {run_engine(engine, transcription, emotions):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark the alignment engines on synthetic sessions of growing length.
+
+Usage:
+    python -m benchmarks.bench_alignment
+
+Each session has one transcript segment every ~4s and several emotion
+detections per second, matching the shape of our long interviews. The
+nested engine grows with N * M while the sweep engine grows with N + M.
+A second table compares aligning five windows separately with one
+multi-window pass.
+"""
+
+import random
+import time
+
+from src.core.alignment import (
+    DEFAULT_WINDOWS_MS,
+    align_emotion_with_transcript,
+    align_multi_window,
+    align_records,
+    ms_to_timestamp,
+    parse_timestamps,
+)
+
+
+def make_session(minutes: int, detections_per_second: int = 5, seed: int = 0):
+    """Build a synthetic session covering the given number of minutes."""
+    rng = random.Random(seed)
+    span_ms = minutes * 60 * 1000
+
+    transcription = []
+    start = 0
+    while start < span_ms:
+        end = start + rng.randrange(1500, 6000)
+        transcription.append({
+            "startTime": ms_to_timestamp(start),
+            "endTime": ms_to_timestamp(end),
+            "speaker": rng.choice(["Interviewer", "Subject"]),
+            "transcript": "..."
+        })
+        start = end + rng.randrange(0, 500)
+
+    step_ms = 1000 // detections_per_second
+    emotions = [
+        {
+            "timestamp": ms_to_timestamp(t),
+            "emotion": rng.choice(["Neutral", "Fear", "Surprise", "Joy", "Anxiety"]),
+            "confidence": round(rng.random(), 3)
+        }
+        for t in range(0, span_ms, step_ms)
+    ]
+    return transcription, emotions
+
+
+def time_engine(engine: str, transcription, emotions) -> float:
+    """Return the wall time in seconds for one alignment run."""
+    started = time.perf_counter()
+    align_emotion_with_transcript(transcription, emotions, engine=engine)
+    return time.perf_counter() - started
+
+
+def to_records(transcription, emotions):
+    """Convert a synthetic session to integer-millisecond records."""
+    transcription_records = [
+        {
+            "start_time_ms": start,
+            "end_time_ms": end,
+            "speaker": entry["speaker"],
+            "transcript": entry["transcript"],
+        }
+        for entry, start, end in zip(
+            transcription,
+            parse_timestamps([e["startTime"] for e in transcription]),
+            parse_timestamps([e["endTime"] for e in transcription]),
+        )
+    ]
+    emotion_records = [
+        {"timestamp_ms": ms, "emotion": d["emotion"], "confidence": d["confidence"]}
+        for d, ms in zip(emotions, parse_timestamps([d["timestamp"] for d in emotions]))
+    ]
+    return transcription_records, emotion_records
+
+
+def bench_windows():
+    """Compare one alignment per window with a single multi-window pass."""
+    print(f"\n{'minutes':>8} {'windows':>8} {'separate s':>11} {'one pass s':>11} {'speedup':>8}")
+    for minutes in (15, 60, 240):
+        transcription, emotions = to_records(*make_session(minutes))
+
+        started = time.perf_counter()
+        for window in DEFAULT_WINDOWS_MS:
+            align_records(transcription, emotions, window)
+        separate = time.perf_counter() - started
+
+        started = time.perf_counter()
+        align_multi_window(transcription, emotions, DEFAULT_WINDOWS_MS)
+        one_pass = time.perf_counter() - started
+
+        print(f"{minutes:>8} {len(DEFAULT_WINDOWS_MS):>8} {separate:>11.3f} {one_pass:>11.3f} {separate / one_pass:>7.1f}x")
+
+
+def main():
+    print(f"{'minutes':>8} {'segments':>9} {'detections':>11} {'nested s':>10} {'sweep s':>9} {'speedup':>8}")
+    for minutes in (1, 5, 15, 30, 60):
+        transcription, emotions = make_session(minutes)
+        nested = time_engine("nested", transcription, emotions)
+        sweep = time_engine("sweep", transcription, emotions)
+        print(
+            f"{minutes:>8} {len(transcription):>9} {len(emotions):>11} "
+            f"{nested:>10.3f} {sweep:>9.3f} {nested / sweep:>7.1f}x"
+        )
+    bench_windows()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Micro-benchmark for parsing one million timestamps.
+
+Usage:
+    python -m benchmarks.bench_timestamps
+
+Compares the previous per-call `re.match` with an uncompiled pattern
+against the batch parser used by the upload endpoints and the aligner.
+"""
+
+import random
+import re
+import time
+
+from src.core.alignment import parse_timestamps
+
+COUNT = 1_000_000
+
+
+def legacy_timestamp_to_ms(timestamp: str) -> int:
+    """The original parser: uncompiled pattern, unpadded fraction."""
+    match = re.match(r"(\d+):(\d+)\.(\d+)", timestamp)
+    if not match:
+        raise ValueError(f"Invalid timestamp format: {timestamp}. Expected MM:SS.mmm")
+    return int(match.group(1)) * 60000 + int(match.group(2)) * 1000 + int(match.group(3))
+
+
+def make_timestamps(count: int, seed: int = 0):
+    """Build MM:SS.mmm timestamps with a share of HH:MM:SS.mmm ones."""
+    rng = random.Random(seed)
+    values = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            values.append(f"{rng.randrange(4):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}.{rng.randrange(1000):03d}")
+        else:
+            values.append(f"{rng.randrange(60):02d}:{rng.randrange(60):02d}.{rng.randrange(1000):03d}")
+    return values
+
+
+def main():
+    values = make_timestamps(COUNT)
+    # The legacy parser cannot read HH:MM:SS.mmm, so give it the MM:SS.mmm share only
+    legacy_values = [v for v in values if v.count(":") == 1]
+
+    started = time.perf_counter()
+    for value in legacy_values:
+        legacy_timestamp_to_ms(value)
+    legacy = time.perf_counter() - started
+
+    started = time.perf_counter()
+    parse_timestamps(values)
+    batch = time.perf_counter() - started
+
+    print(f"legacy re.match : {len(legacy_values):>9} timestamps in {legacy:.3f}s ({legacy / len(legacy_values) * 1e9:.0f} ns each)")
+    print(f"parse_timestamps: {len(values):>9} timestamps in {batch:.3f}s ({batch / len(values) * 1e9:.0f} ns each)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,59 @@
 """Agent package."""
 
-from src.core.agent.agent import create_interpretation_agent, run_interpretation
+from src.core.agent.agent import (
+    AGENT_CONFIG_OPTIONS,
+    ANALYSIS_ENGINES,
+    ANOMALY_DETECTORS,
+    ENGINE_STEPS,
+    create_interpretation_agent,
+    get_interpretation_agent,
+    clear_agent_cache,
+    run_interpretation,
+    run_interpretation_on_records,
+    has_resumable_interpretation,
+    resume_interpretation,
+    NoResumableInterpretation,
+)
 from src.core.agent.state import AgentState
+from src.core.agent.instrumentation import NODE_CARDINALITIES, instrument_node
+from src.core.agent.fused import fused_analysis, run_fused
+from src.core.agent.chunked import (
+    DEFAULT_CHUNK_MS,
+    chunked_analysis,
+    merge_summaries,
+    plan_chunks,
+    run_chunked,
+    summarize_chunk,
+)
+from src.core.agent.baselines import (
+    baseline_emotion,
+    combine_statistics,
+    empty_statistics,
+    speaker_statistics,
+    statistics_profile,
+)
+from src.core.agent.cache import ANALYSIS_VERSION, AnalysisCache, analysis_cache_key
+from src.core.agent.checkpoint import SQLCheckpointSaver
+from src.core.agent.context import ContextBuilder, compress_emotions, estimate_tokens
+from src.core.agent.interpretation import (
+    InterpretationBackend,
+    StubInterpretationBackend,
+    ChatModelBackend,
+    InterpretationCache,
+    SQLInterpretationCache,
+    MomentInterpreter,
+    moment_cache_key,
+)
+from src.core.agent.anomalies import (
+    StreamingAnomalyDetector,
+    stream_anomalies,
+    astream_anomalies,
+    detect_anomalies_rolling,
+)
 from src.core.agent.nodes import (
+    ALIGNMENT_WINDOW_MS,
     perform_temporal_alignment,
+    build_speaker_index,
     analyze_emotion_patterns,
     detect_anomalies,
     interpret_moments,
@@ -12,10 +62,55 @@ from src.core.agent.nodes import (
 )
 
 __all__ = [
+    "AGENT_CONFIG_OPTIONS",
+    "ANALYSIS_ENGINES",
+    "ANOMALY_DETECTORS",
+    "ENGINE_STEPS",
     "create_interpretation_agent",
+    "get_interpretation_agent",
+    "clear_agent_cache",
     "run_interpretation",
+    "run_interpretation_on_records",
+    "has_resumable_interpretation",
+    "resume_interpretation",
+    "NoResumableInterpretation",
     "AgentState",
+    "NODE_CARDINALITIES",
+    "instrument_node",
+    "fused_analysis",
+    "run_fused",
+    "DEFAULT_CHUNK_MS",
+    "chunked_analysis",
+    "merge_summaries",
+    "plan_chunks",
+    "run_chunked",
+    "summarize_chunk",
+    "baseline_emotion",
+    "combine_statistics",
+    "empty_statistics",
+    "speaker_statistics",
+    "statistics_profile",
+    "ANALYSIS_VERSION",
+    "AnalysisCache",
+    "analysis_cache_key",
+    "SQLCheckpointSaver",
+    "ContextBuilder",
+    "compress_emotions",
+    "estimate_tokens",
+    "InterpretationBackend",
+    "StubInterpretationBackend",
+    "ChatModelBackend",
+    "InterpretationCache",
+    "SQLInterpretationCache",
+    "MomentInterpreter",
+    "moment_cache_key",
+    "StreamingAnomalyDetector",
+    "stream_anomalies",
+    "astream_anomalies",
+    "detect_anomalies_rolling",
+    "ALIGNMENT_WINDOW_MS",
     "perform_temporal_alignment",
+    "build_speaker_index",
     "analyze_emotion_patterns",
     "detect_anomalies",
     "interpret_moments",
@@ -1,9 +1,19 @@
 """LangGraph agent for emotion interpretation."""
 
+import threading
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple
+
 from langgraph.graph import StateGraph, END
 from src.core.agent.state import AgentState
+from src.core.agent.instrumentation import instrument_node, tracing_memory
+from src.core.agent.fused import FUSED_STAGES, run_fused
+from src.core.agent.chunked import CHUNKED_STAGES, run_chunked
+from src.core.agent.anomalies import detect_anomalies_rolling
 from src.core.agent.nodes import (
     perform_temporal_alignment,
+    build_speaker_index,
     analyze_emotion_patterns,
     detect_anomalies,
     interpret_moments,
@@ -12,45 +22,332 @@ from src.core.agent.nodes import (
 )
 
 
-def create_interpretation_agent():
+# Graph configuration options accepted by create_interpretation_agent: "parallel"
+# selects the graph shape, "anomaly_detector" the anomaly_detection node and
+# "interpreter" the MomentInterpreter of moment_interpretation; the others
+# are passed to compile()
+AGENT_CONFIG_OPTIONS = (
+    "parallel", "anomaly_detector", "interpreter",
+    "checkpointer", "interrupt_before", "interrupt_after", "debug", "name",
+)
+_AGENT_CONFIG_DEFAULTS = {"parallel": True, "anomaly_detector": "dominant"}
+
+# Anomaly detection nodes by anomaly_detector: strong emotions against the
+# speaker's session-wide dominant emotion, or scored against a rolling
+# per-speaker baseline (see StreamingAnomalyDetector)
+ANOMALY_DETECTORS = {
+    "dominant": detect_anomalies,
+    "rolling": detect_anomalies_rolling,
+}
+
+# Analysis engines accepted by run_interpretation: the LangGraph agent, the
+# fused two-pass kernel for very large sessions, or the map-reduce over time
+# chunks on a process pool for multi-hour sessions
+ANALYSIS_ENGINES = ("graph", "fused", "chunked")
+
+# Steps each engine reports to on_step, in workflow order (the parallel
+# graph may finish its two branches in either order)
+ENGINE_STEPS = {
+    "graph": (
+        "temporal_alignment", "speaker_indexing", "pattern_analysis", "anomaly_detection",
+        "moment_interpretation", "speaker_profiling", "report_synthesis",
+    ),
+    "fused": tuple(name for name, _ in FUSED_STAGES),
+    "chunked": CHUNKED_STAGES,
+}
+
+# Compiled agents by configuration key, shared by every request in the process
+_agent_cache: Dict[Tuple, Any] = {}
+_agent_cache_lock = threading.Lock()
+
+# Locks of the checkpoint threads in use, with the number of runs holding or
+# waiting for each; a thread's lock is dropped when no run needs it
+_thread_locks: Dict[str, list] = {}
+_thread_locks_lock = threading.Lock()
+
+
+class NoResumableInterpretation(ValueError):
+    """Raised when a session has no unfinished checkpointed run to resume."""
+
+
+def _config_key(config: Dict[str, Any]) -> Tuple:
+    """Build a hashable cache key from a graph configuration."""
+    unknown = set(config) - set(AGENT_CONFIG_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown agent configuration options: {sorted(unknown)}. Expected {AGENT_CONFIG_OPTIONS}")
+    detector = config.get("anomaly_detector")
+    if detector is not None and detector not in ANOMALY_DETECTORS:
+        raise ValueError(f"Unknown anomaly detector: {detector}. Expected one of {tuple(ANOMALY_DETECTORS)}")
+    return tuple(
+        (name, tuple(value) if isinstance(value, (list, tuple)) else value)
+        for name, value in sorted({**_AGENT_CONFIG_DEFAULTS, **config}.items())
+        if value is not None
+    )
+
+
+def create_interpretation_agent(**config):
     """
     Create the LangGraph agent for emotion interpretation.
     
     The agent follows this workflow:
     1. Temporal Alignment: Match emotions with transcription
+       (then Speaker Indexing: group events and emotions by speaker once)
     2. Pattern Analysis: Identify emotion patterns and transitions
     3. Anomaly Detection: Find emotional incongruities
     4. Moment Interpretation: Interpret critical moments
     5. Speaker Profiling: Create baseline profiles
     6. Report Synthesis: Generate final report
+    
+    With parallel=True (the default) the graph fans out after pattern
+    analysis: anomaly detection -> moment interpretation and speaker
+    profiling run as concurrent branches and join before report synthesis.
+    parallel=False runs the same nodes strictly one after another.
+    anomaly_detector="rolling" swaps in detect_anomalies_rolling, which
+    judges each detection against the speaker's recent emotions, and
+    interpreter (a MomentInterpreter) replaces the rule-based stub that
+    interprets critical moments. Every
+    node is instrumented: wall times go to node_timings, and wall/CPU time,
+    cardinalities and (with trace_memory) peak allocation go to metrics.
+    
+    Building and compiling the graph is comparatively slow; request paths
+    should use get_interpretation_agent, which reuses compiled agents.
+    
+    Args:
+        **config: Graph configuration (see AGENT_CONFIG_OPTIONS)
     """
+    _config_key(config)
+    parallel = config.pop("parallel", _AGENT_CONFIG_DEFAULTS["parallel"])
+    detector = config.pop("anomaly_detector", None) or _AGENT_CONFIG_DEFAULTS["anomaly_detector"]
+    interpreter = config.pop("interpreter", None)
+    interpret = interpret_moments if interpreter is None else partial(interpret_moments, interpreter=interpreter)
+    
     # Create the graph
     workflow = StateGraph(AgentState)
     
     # Add nodes
-    workflow.add_node("temporal_alignment", perform_temporal_alignment)
-    workflow.add_node("pattern_analysis", analyze_emotion_patterns)
-    workflow.add_node("anomaly_detection", detect_anomalies)
-    workflow.add_node("moment_interpretation", interpret_moments)
-    workflow.add_node("speaker_profiling", create_speaker_profiles)
-    workflow.add_node("report_synthesis", synthesize_report)
-    
-    # Define the workflow edges (sequential for now)
+    workflow.add_node("temporal_alignment", instrument_node("temporal_alignment", perform_temporal_alignment))
+    workflow.add_node("speaker_indexing", instrument_node("speaker_indexing", build_speaker_index))
+    workflow.add_node("pattern_analysis", instrument_node("pattern_analysis", analyze_emotion_patterns))
+    workflow.add_node("anomaly_detection", instrument_node("anomaly_detection", ANOMALY_DETECTORS[detector]))
+    workflow.add_node("moment_interpretation", instrument_node("moment_interpretation", interpret))
+    workflow.add_node("speaker_profiling", instrument_node("speaker_profiling", create_speaker_profiles))
+    workflow.add_node("report_synthesis", instrument_node("report_synthesis", synthesize_report))
+    
+    # Define the workflow edges
     workflow.set_entry_point("temporal_alignment")
-    workflow.add_edge("temporal_alignment", "pattern_analysis")
-    workflow.add_edge("pattern_analysis", "anomaly_detection")
-    workflow.add_edge("anomaly_detection", "moment_interpretation")
-    workflow.add_edge("moment_interpretation", "speaker_profiling")
-    workflow.add_edge("speaker_profiling", "report_synthesis")
+    workflow.add_edge("temporal_alignment", "speaker_indexing")
+    workflow.add_edge("speaker_indexing", "pattern_analysis")
+    if parallel:
+        # Fan out into two independent branches, then join before synthesis
+        workflow.add_edge("pattern_analysis", "anomaly_detection")
+        workflow.add_edge("anomaly_detection", "moment_interpretation")
+        workflow.add_edge("pattern_analysis", "speaker_profiling")
+        workflow.add_edge(["moment_interpretation", "speaker_profiling"], "report_synthesis")
+    else:
+        workflow.add_edge("pattern_analysis", "anomaly_detection")
+        workflow.add_edge("anomaly_detection", "moment_interpretation")
+        workflow.add_edge("moment_interpretation", "speaker_profiling")
+        workflow.add_edge("speaker_profiling", "report_synthesis")
     workflow.add_edge("report_synthesis", END)
     
     # Compile the graph
-    agent = workflow.compile()
+    agent = workflow.compile(**{name: value for name, value in config.items() if value is not None})
     
     return agent
 
 
-def run_interpretation(transcription_entries, emotion_detections, session_id=None):
+def get_interpretation_agent(force_rebuild: bool = False, **config):
+    """
+    Return the compiled agent for a graph configuration, building it once per process.
+    
+    Compiled agents hold no per-run state, so one instance is shared by
+    concurrent invocations; the lock only guards building and the cache.
+    
+    Args:
+        force_rebuild: Build and cache a fresh agent even if one is cached
+        **config: Graph configuration (see AGENT_CONFIG_OPTIONS)
+        
+    Returns:
+        Compiled LangGraph agent
+    """
+    key = _config_key(config)
+    if not force_rebuild:
+        agent = _agent_cache.get(key)
+        if agent is not None:
+            return agent
+    
+    with _agent_cache_lock:
+        agent = None if force_rebuild else _agent_cache.get(key)
+        if agent is None:
+            agent = _agent_cache[key] = create_interpretation_agent(**config)
+    return agent
+
+
+def clear_agent_cache():
+    """Drop every cached compiled agent."""
+    with _agent_cache_lock:
+        _agent_cache.clear()
+
+
+def _thread_config(session_id) -> Dict[str, Any]:
+    """Return the run config whose checkpoints are keyed by a session id."""
+    if session_id is None:
+        raise ValueError("Checkpointed analyses need a session_id")
+    return {"configurable": {"thread_id": str(session_id)}}
+
+
+@contextmanager
+def _thread_lock(config: Dict[str, Any]):
+    """
+    Hold the lock of a checkpoint thread for a whole run.
+    
+    Runs of one session share its checkpoints, so a run that started while
+    another was still going would delete the other's checkpoints; runs of a
+    session in this process wait for each other instead.
+    """
+    thread_id = config["configurable"]["thread_id"]
+    with _thread_locks_lock:
+        entry = _thread_locks.setdefault(thread_id, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _thread_locks_lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del _thread_locks[thread_id]
+
+
+def _invoke(agent, state: Optional[AgentState], config, on_step, durability: Optional[str] = None) -> Dict[str, Any]:
+    """Invoke a compiled agent; with on_step, stream it and report each finished node."""
+    # durability="sync" saves each step before starting the next, so a crash
+    # never loses a step that already finished; LangGraph's default saves in
+    # the background while the next step runs
+    options = {"durability": durability} if config is not None and durability is not None else {}
+    if on_step is None:
+        return agent.invoke(state, config, **options)
+    
+    # Stream node updates for progress; the last values chunk is the final state
+    final_state = None
+    for mode, chunk in agent.stream(state, config, stream_mode=["updates", "values"], **options):
+        if mode == "values":
+            final_state = chunk
+        else:
+            for name in chunk:
+                on_step(name)
+    return final_state
+
+
+def _run(
+    initial_state: AgentState,
+    engine: str,
+    trace_memory: bool,
+    on_step: Optional[Callable[[str], None]] = None,
+    checkpointer=None,
+    anomaly_detector: str = "dominant",
+    interpreter=None,
+    checkpoint_durability: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run an initial state through the selected analysis engine."""
+    if engine not in ANALYSIS_ENGINES:
+        raise ValueError(f"Unknown analysis engine: {engine}. Expected one of {ANALYSIS_ENGINES}")
+    if checkpointer is not None and engine != "graph":
+        raise ValueError("Checkpointing is only supported by the graph engine")
+    if anomaly_detector != "dominant" and engine != "graph":
+        raise ValueError("Alternative anomaly detectors are only supported by the graph engine")
+    if interpreter is not None and engine == "fused":
+        raise ValueError("Moment interpreters are not supported by the fused engine")
+    if initial_state.get("speaker_baselines") and anomaly_detector != "dominant":
+        raise ValueError("Historical speaker baselines are only used by the dominant anomaly detector")
+    graph_config = {"anomaly_detector": anomaly_detector, "interpreter": interpreter}
+    
+    with tracing_memory(trace_memory):
+        if engine == "fused":
+            return run_fused(initial_state, on_step)
+        if engine == "chunked":
+            return run_chunked(initial_state, on_step, interpreter)
+        if checkpointer is None:
+            return _invoke(get_interpretation_agent(**graph_config), initial_state, None, on_step)
+        
+        # A new run replaces whatever an earlier run of the session left behind
+        config = _thread_config(initial_state.get("session_id"))
+        agent = get_interpretation_agent(checkpointer=checkpointer, **graph_config)
+        with _thread_lock(config):
+            checkpointer.delete_thread(config["configurable"]["thread_id"])
+            result = _invoke(agent, initial_state, config, on_step, checkpoint_durability)
+            checkpointer.delete_thread(config["configurable"]["thread_id"])
+        return result
+
+
+def has_resumable_interpretation(session_id, checkpointer, anomaly_detector="dominant", interpreter=None) -> bool:
+    """
+    Return whether a checkpointed run of the session stopped before finishing.
+    
+    anomaly_detector and interpreter must be those the run was started
+    with, as for resume_interpretation.
+    """
+    agent = get_interpretation_agent(checkpointer=checkpointer, anomaly_detector=anomaly_detector, interpreter=interpreter)
+    return bool(agent.get_state(_thread_config(session_id)).next)
+
+
+def resume_interpretation(
+    session_id,
+    checkpointer,
+    trace_memory=False,
+    on_step=None,
+    anomaly_detector="dominant",
+    interpreter=None,
+    checkpoint_durability=None
+):
+    """
+    Resume a checkpointed run of the session from its last completed node.
+    
+    Nodes that finished before the failure are not run again; their
+    results, steps and metrics come from the checkpoint. The checkpoints
+    are deleted once the run completes.
+    
+    Args:
+        session_id: Session whose run to resume (the checkpoint thread id)
+        checkpointer: Checkpoint saver the run was started with
+        trace_memory: Record peak allocation of the nodes that still run
+        on_step: Optional per-step progress callback, called for the nodes that still run
+        anomaly_detector: Anomaly detector the run was started with
+        interpreter: Moment interpreter the run was started with
+        checkpoint_durability: LangGraph durability of the remaining
+            checkpoints (see run_interpretation_on_records)
+        
+    Returns:
+        Final state, as run_interpretation_on_records would have returned it
+        
+    Raises:
+        NoResumableInterpretation: If the session has no unfinished
+            checkpointed run, e.g. because another run of the session
+            completed while this one waited for it
+    """
+    agent = get_interpretation_agent(checkpointer=checkpointer, anomaly_detector=anomaly_detector, interpreter=interpreter)
+    config = _thread_config(session_id)
+    with _thread_lock(config):
+        if not agent.get_state(config).next:
+            raise NoResumableInterpretation(f"No unfinished analysis to resume for session {session_id}")
+        
+        with tracing_memory(trace_memory):
+            result = _invoke(agent, None, config, on_step, checkpoint_durability)
+        checkpointer.delete_thread(config["configurable"]["thread_id"])
+    return result
+
+
+def run_interpretation(
+    transcription_entries,
+    emotion_detections,
+    session_id=None,
+    trace_memory=False,
+    engine="graph",
+    on_step=None,
+    anomaly_detector="dominant",
+    interpreter=None,
+    speaker_baselines=None
+):
     """
     Run the interpretation agent on transcription and emotion data.
     
@@ -58,21 +355,94 @@ def run_interpretation(transcription_entries, emotion_detections, session_id=Non
         transcription_entries: List of transcription entries
         emotion_detections: List of emotion detections
         session_id: Optional session ID for tracking
+        trace_memory: Record each node's peak allocation with tracemalloc (slower)
+        engine: One of ANALYSIS_ENGINES; "fused" computes the same results in
+            two passes over the aligned events, for very large sessions, and
+            "chunked" as a map-reduce over time chunks on a process pool
+        on_step: Optional callback called with each step's name (see
+            ENGINE_STEPS) as soon as the step finishes
+        anomaly_detector: Key of ANOMALY_DETECTORS; "rolling" judges each
+            detection against the speaker's recent emotions (graph engine only)
+        interpreter: Optional MomentInterpreter for critical moments, e.g.
+            LLM-backed; the rule-based stub by default (not for "fused")
+        speaker_baselines: Optional {speaker: emotion} baselines, e.g. from
+            earlier sessions, that anomaly detection uses instead of the
+            speakers' dominant emotions in this session
         
     Returns:
-        Final state with interpretation and report
+        Final state with interpretation, report and per-node metrics
     """
-    agent = create_interpretation_agent()
-    
     # Prepare initial state
     initial_state = {
         "session_id": session_id,
         "transcription_entries": transcription_entries,
         "emotion_detections": emotion_detections,
+        "trace_memory": trace_memory,
         "steps_completed": []
     }
+    if speaker_baselines:
+        initial_state["speaker_baselines"] = dict(speaker_baselines)
     
     # Run the agent
-    final_state = agent.invoke(initial_state)
+    return _run(initial_state, engine, trace_memory, on_step, anomaly_detector=anomaly_detector, interpreter=interpreter)
+
+
+def run_interpretation_on_records(
+    transcription_records,
+    emotion_records,
+    session_id=None,
+    trace_memory=False,
+    engine="graph",
+    on_step=None,
+    checkpointer=None,
+    anomaly_detector="dominant",
+    interpreter=None,
+    speaker_baselines=None,
+    checkpoint_durability=None
+):
+    """
+    Run the interpretation agent on integer-millisecond records.
     
-    return final_state
+    Accepts the TranscriptionEntry and EmotionDetection ORM rows (or dicts
+    with the same millisecond fields) directly, so timestamps loaded from the
+    database are never formatted to strings and parsed again.
+    
+    Args:
+        transcription_records: Records with start_time_ms, end_time_ms, speaker, transcript
+        emotion_records: Records with timestamp_ms, emotion, confidence
+        session_id: Optional session ID for tracking
+        trace_memory: Record each node's peak allocation with tracemalloc (slower)
+        engine: One of ANALYSIS_ENGINES (see run_interpretation)
+        on_step: Optional per-step progress callback (see run_interpretation)
+        checkpointer: Optional LangGraph checkpoint saver; the run is then
+            checkpointed under session_id after every node, so a failed run
+            can be continued with resume_interpretation. Records must be
+            serializable by the saver (e.g. dicts, not ORM rows). Runs of
+            one session in this process wait for each other.
+        anomaly_detector: Key of ANOMALY_DETECTORS (see run_interpretation)
+        interpreter: Optional MomentInterpreter (see run_interpretation)
+        speaker_baselines: Optional historical baselines (see run_interpretation)
+        checkpoint_durability: LangGraph durability of the checkpoints;
+            "sync" writes each one before the next node starts, so a crash
+            never loses a finished node, at the cost of waiting for the
+            database; LangGraph's default ("async") by default
+        
+    Returns:
+        Final state with interpretation, report and per-node metrics
+    """
+    # Prepare initial state
+    initial_state = {
+        "session_id": session_id,
+        "transcription_entries": transcription_records,
+        "emotion_detections": emotion_records,
+        "input_format": "ms",
+        "trace_memory": trace_memory,
+        "steps_completed": []
+    }
+    if speaker_baselines:
+        initial_state["speaker_baselines"] = dict(speaker_baselines)
+    
+    # Run the agent
+    return _run(
+        initial_state, engine, trace_memory, on_step, checkpointer, anomaly_detector, interpreter, checkpoint_durability
+    )
@@ -0,0 +1,263 @@
+"""Streaming anomaly detection against a rolling per-speaker baseline.
+
+detect_anomalies compares every strong emotion with the speaker's dominant
+emotion over the whole session, which is only known once the session has
+ended and which flags every detection of a long session whose mood drifts.
+The detector here keeps an exponentially decayed emotion distribution per
+speaker instead and scores each detection by its surprise, -log2 of the
+probability the distribution assigned to it just before it was seen.
+
+Decay is applied lazily: each speaker keeps undecayed weights and one scale
+factor, so an update multiplies the scale and touches a single weight, and
+the rolling dominant emotion is maintained incrementally (decay preserves
+the order of the weights, so only the updated emotion can overtake it).
+Every detection therefore costs O(1) regardless of vocabulary size and
+session length.
+"""
+
+from math import log2
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Set
+
+from src.core.agent.nodes import HIGH_SEVERITY_MASK, STRONG_EMOTIONS_MASK, _emotion_codes
+from src.core.agent.state import AgentState
+from src.core.alignment import CANONICAL_EMOTIONS, EMOTION_VOCABULARY, EmotionVocabulary
+
+# Once the scale factor drops below this, weights are folded back into it so
+# the undecayed weights cannot overflow
+_RESCALE_BELOW = 1e-100
+
+
+class _SpeakerBaseline:
+    """Decayed emotion weights of one speaker; weight of e is weights[e] * scale."""
+
+    __slots__ = ("weights", "scale", "total", "count", "dominant")
+
+    def __init__(self):
+        self.weights: Dict[int, float] = {}
+        self.scale = 1.0
+        self.total = 0.0
+        self.count = 0
+        self.dominant: Optional[int] = None
+
+
+class StreamingAnomalyDetector:
+    """
+    Flag detections that are surprising for the speaker's recent emotions.
+
+    Each speaker's baseline is an exponentially decayed count of their
+    detections: a detection's weight halves after half_life further
+    detections of the same speaker. A detection is scored against the
+    baseline before it is added, with prior pseudo-counts for every
+    canonical emotion and every other emotion the detector has seen, so
+    unseen emotions have a finite surprise that does not depend on what
+    else the vocabulary holds. A strong
+    emotion (as in detect_anomalies) is an anomaly when the speaker has at
+    least min_history earlier detections, its surprise is at least
+    threshold_bits and it is not the rolling dominant emotion.
+
+    Args:
+        half_life: Detections after which an observation's weight has halved
+        threshold_bits: Minimum surprise, in bits, of an anomaly
+        min_history: Detections of a speaker seen before any of theirs is flagged
+        prior: Pseudo-count added to every emotion when scoring
+        vocabulary: Vocabulary encoding the emotion labels; by default a
+            local copy of EMOTION_VOCABULARY that registers unknown labels
+    """
+
+    def __init__(
+        self,
+        half_life: float = 20.0,
+        threshold_bits: float = 3.0,
+        min_history: int = 5,
+        prior: float = 0.5,
+        vocabulary: Optional[EmotionVocabulary] = None
+    ):
+        if half_life <= 0:
+            raise ValueError("half_life must be positive")
+        if prior <= 0:
+            raise ValueError("prior must be positive")
+        if min_history < 0:
+            raise ValueError("min_history must not be negative")
+        self.half_life = half_life
+        self.threshold_bits = threshold_bits
+        self.min_history = min_history
+        self.prior = prior
+        self.vocabulary = vocabulary if vocabulary is not None else EMOTION_VOCABULARY.local()
+        self.decay = 0.5 ** (1.0 / half_life)
+        self._speakers: Dict[str, _SpeakerBaseline] = {}
+        # Codes outside the canonical emotions seen by this detector
+        self._outside: Set[int] = set()
+
+    def surprise(self, speaker: str, code: int) -> float:
+        """Return the surprise, in bits, of an emotion code for the speaker's current baseline."""
+        baseline = self._speakers.get(speaker)
+        weight, total = 0.0, 0.0
+        if baseline is not None:
+            weight = baseline.weights.get(code, 0.0) * baseline.scale
+            total = baseline.total
+        # The canonical emotions and the others seen so far, including this one
+        outcomes = len(CANONICAL_EMOTIONS) + len(self._outside)
+        if code >= len(CANONICAL_EMOTIONS) and code not in self._outside:
+            outcomes += 1
+        probability = (weight + self.prior) / (total + self.prior * outcomes)
+        return -log2(probability)
+
+    def update(self, speaker: str, code: int):
+        """Add a detection of an emotion code to the speaker's baseline."""
+        if code >= len(CANONICAL_EMOTIONS):
+            self._outside.add(code)
+        baseline = self._speakers.get(speaker)
+        if baseline is None:
+            baseline = self._speakers[speaker] = _SpeakerBaseline()
+
+        baseline.scale *= self.decay
+        if baseline.scale < _RESCALE_BELOW:
+            for other in baseline.weights:
+                baseline.weights[other] *= baseline.scale
+            baseline.scale = 1.0
+        weight = baseline.weights[code] = baseline.weights.get(code, 0.0) + 1.0 / baseline.scale
+        baseline.total = baseline.total * self.decay + 1.0
+        baseline.count += 1
+
+        dominant = baseline.dominant
+        if dominant is None or (dominant != code and weight > baseline.weights[dominant]):
+            baseline.dominant = code
+
+    def observe(self, speaker: str, emotion: str) -> Dict[str, Any]:
+        """
+        Score a detection, then add it to the speaker's baseline.
+
+        Returns:
+            Dictionary with emotion, baseline (rolling dominant emotion
+            before the detection, or None), surprise in bits, and anomalous
+        """
+        code = self.vocabulary.code(emotion)
+        return self._observe(speaker, code)
+
+    def _observe(self, speaker: str, code: int) -> Dict[str, Any]:
+        """observe() on an emotion code."""
+        baseline = self._speakers.get(speaker)
+        dominant = baseline.dominant if baseline is not None else None
+        history = baseline.count if baseline is not None else 0
+        surprise = self.surprise(speaker, code)
+        self.update(speaker, code)
+        return {
+            "emotion": self.vocabulary.label(code),
+            "baseline": self.vocabulary.label(dominant) if dominant is not None else None,
+            "surprise": surprise,
+            "anomalous": bool(
+                STRONG_EMOTIONS_MASK >> code & 1
+                and code != dominant
+                and history >= self.min_history
+                and surprise >= self.threshold_bits
+            ),
+        }
+
+    def process_event(self, event: Dict[str, Any], index: int, codes: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Observe every matched emotion of an aligned event, in order.
+
+        Args:
+            event: Aligned event dict (align_records format)
+            index: Event index reported with its anomalies
+            codes: Vocabulary codes of the event's emotions, if already encoded
+
+        Returns:
+            The event's anomalies, with the keys of detect_anomalies plus surprise
+        """
+        emotions = event["emotions"]
+        if codes is None:
+            codes = [self.vocabulary.code(emotion["emotion"]) for emotion in emotions]
+        speaker = event["speaker"]
+
+        anomalies = []
+        for emotion, code in zip(emotions, codes):
+            scored = self._observe(speaker, code)
+            if scored["anomalous"]:
+                anomalies.append({
+                    "timestamp_ms": emotion["timestamp_ms"],
+                    "event_index": index,
+                    "speaker": speaker,
+                    "emotion": scored["emotion"],
+                    "baseline": scored["baseline"],
+                    "transcript": event["transcript"],
+                    "severity": "high" if HIGH_SEVERITY_MASK >> code & 1 else "medium",
+                    "surprise": round(scored["surprise"], 3),
+                })
+        return anomalies
+
+    def baseline(self, speaker: str) -> Dict[str, float]:
+        """Return the speaker's current decayed emotion distribution (empty if unseen)."""
+        baseline = self._speakers.get(speaker)
+        if baseline is None or not baseline.total:
+            return {}
+        return {
+            self.vocabulary.label(code): weight * baseline.scale / baseline.total
+            for code, weight in baseline.weights.items()
+        }
+
+    def dominant_emotion(self, speaker: str) -> Optional[str]:
+        """Return the speaker's rolling dominant emotion, or None if unseen."""
+        baseline = self._speakers.get(speaker)
+        if baseline is None or baseline.dominant is None:
+            return None
+        return self.vocabulary.label(baseline.dominant)
+
+
+def stream_anomalies(
+    events: Iterable[Dict[str, Any]],
+    detector: Optional[StreamingAnomalyDetector] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield anomalies of a stream of aligned events as soon as each event arrives.
+
+    Designed for the output of stream_align; event_index is the position of
+    the event in the stream.
+
+    Args:
+        events: Aligned events, e.g. from stream_align
+        detector: Detector to use (and keep updating); a default one if None
+    """
+    if detector is None:
+        detector = StreamingAnomalyDetector()
+    for index, event in enumerate(events):
+        yield from detector.process_event(event, index)
+
+
+async def astream_anomalies(
+    events: AsyncIterable[Dict[str, Any]],
+    detector: Optional[StreamingAnomalyDetector] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """stream_anomalies over an asynchronous stream, e.g. from astream_align."""
+    if detector is None:
+        detector = StreamingAnomalyDetector()
+    index = 0
+    async for event in events:
+        for anomaly in detector.process_event(event, index):
+            yield anomaly
+        index += 1
+
+
+def detect_anomalies_rolling(state: AgentState) -> Dict[str, Any]:
+    """
+    Node 3 (rolling variant): Detect anomalies against each speaker's recent emotions.
+
+    A drop-in alternative to detect_anomalies: same anomaly fields (baseline
+    is the rolling dominant emotion when the detection arrived) plus
+    surprise. Events are processed in conversation order, so the result is
+    what stream_anomalies reports live.
+    """
+    aligned_events = state.get("aligned_events", [])
+    codes, offsets, vocabulary = _emotion_codes(aligned_events)
+    detector = StreamingAnomalyDetector(vocabulary=vocabulary)
+
+    anomalies = []
+    for index, event in enumerate(aligned_events):
+        start, stop = offsets[index], offsets[index + 1]
+        if start != stop:
+            anomalies.extend(detector.process_event(event, index, codes[start:stop]))
+
+    return {
+        "anomalies": anomalies,
+        "steps_completed": ["anomaly_detection"]
+    }
@@ -0,0 +1,107 @@
+"""Per-speaker statistics that add up across sessions.
+
+speaker_statistics summarizes each speaker's aligned events into counts
+and sums (utterances, emotions per label, confidence sums per label).
+Statistics of several sessions combine by plain addition, and those of a
+session can be taken out again by subtraction, so a store can keep one
+running aggregate per speaker, update it as analyses complete and read a
+speaker's long-term profile or baseline emotion without rescanning any
+session. Emotion labels are canonical vocabulary spellings, so synonyms
+from different sessions count together.
+"""
+
+from typing import Any, Dict, Mapping, Optional
+
+from src.core.alignment import AlignedEvents, EMOTION_VOCABULARY
+
+
+def empty_statistics() -> Dict[str, Any]:
+    """Return the statistics of a speaker without events."""
+    return {"utterances": 0, "emotions": 0, "emotion_counts": {}, "confidence_sums": {}, "confidence_counts": {}}
+
+
+def speaker_statistics(aligned_events) -> Dict[str, Dict[str, Any]]:
+    """
+    Summarize the aligned events of a session per speaker.
+
+    Args:
+        aligned_events: AlignedEvents container or list of event dicts
+
+    Returns:
+        Per speaker: utterances (events), emotions (matched detections),
+        emotion_counts, confidence_sums and confidence_counts by label;
+        detections without a confidence are left out of the last two
+    """
+    if not isinstance(aligned_events, AlignedEvents):
+        aligned_events = AlignedEvents.from_events(aligned_events)
+    labels = [EMOTION_VOCABULARY.normalize(label) for label in aligned_events.labels]
+    offsets = aligned_events.emotion_offsets
+    codes = aligned_events.emotion_codes
+    confidences = aligned_events.confidences
+
+    statistics: Dict[str, Dict[str, Any]] = {}
+    for index, speaker_code in enumerate(aligned_events.speaker_codes):
+        speaker = aligned_events.speakers[speaker_code]
+        entry = statistics.get(speaker)
+        if entry is None:
+            entry = statistics[speaker] = empty_statistics()
+        entry["utterances"] += 1
+        entry["emotions"] += offsets[index + 1] - offsets[index]
+        counts, sums, confidence_counts = entry["emotion_counts"], entry["confidence_sums"], entry["confidence_counts"]
+        for position in range(offsets[index], offsets[index + 1]):
+            label = labels[codes[position]]
+            counts[label] = counts.get(label, 0) + 1
+            confidence = confidences[position]
+            if confidence == confidence:  # NaN when missing
+                sums[label] = sums.get(label, 0.0) + confidence
+                confidence_counts[label] = confidence_counts.get(label, 0) + 1
+    return statistics
+
+
+def combine_statistics(left: Mapping[str, Any], right: Mapping[str, Any], sign: int = 1) -> Dict[str, Any]:
+    """
+    Add (sign=1) or subtract (sign=-1) one speaker's statistics.
+
+    Labels whose count drops to zero are removed, so taking out a
+    session's statistics leaves exactly those of the other sessions.
+    """
+    combined = {
+        "utterances": left["utterances"] + sign * right["utterances"],
+        "emotions": left["emotions"] + sign * right["emotions"],
+        "emotion_counts": dict(left["emotion_counts"]),
+        "confidence_sums": dict(left["confidence_sums"]),
+        "confidence_counts": dict(left["confidence_counts"]),
+    }
+    for key in ("emotion_counts", "confidence_counts", "confidence_sums"):
+        for label, value in right[key].items():
+            combined[key][label] = combined[key].get(label, 0) + sign * value
+    for label in [label for label, count in combined["emotion_counts"].items() if count <= 0]:
+        del combined["emotion_counts"][label]
+    for label in [label for label, count in combined["confidence_counts"].items() if count <= 0]:
+        del combined["confidence_counts"][label]
+        combined["confidence_sums"].pop(label, None)
+    return combined
+
+
+def baseline_emotion(statistics: Mapping[str, Any]) -> Optional[str]:
+    """Return the speaker's most frequent emotion, or None without emotions."""
+    counts = statistics["emotion_counts"]
+    return max(counts, key=counts.get) if counts else None
+
+
+def statistics_profile(statistics: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Describe a speaker's statistics: baseline emotion, emotion distribution
+    (share of detections per label) and average confidence per label.
+    """
+    total = statistics["emotions"]
+    return {
+        "baseline_emotion": baseline_emotion(statistics),
+        "emotion_distribution": {
+            label: count / total for label, count in statistics["emotion_counts"].items()
+        } if total else {},
+        "average_confidence": {
+            label: statistics["confidence_sums"][label] / count
+            for label, count in statistics["confidence_counts"].items()
+        },
+    }
@@ -0,0 +1,108 @@
+"""Content-addressed cache of analysis results."""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from src.core.alignment import EMOTION_VOCABULARY
+from src.core.alignment.temporal_alignment import _field
+
+# Bump whenever a node change alters the results for unchanged input, so
+# results cached by an older version are not served again
+ANALYSIS_VERSION = 2
+
+
+def analysis_cache_key(
+    transcription_records: Iterable[Any],
+    emotion_records: Iterable[Any],
+    window_ms: int,
+    engine: str = "graph",
+    scope: Any = None,
+    speaker_baselines: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Return a stable SHA-256 key for analyzing integer-millisecond records.
+
+    The key covers every field the analysis reads, with emotion labels
+    normalized to the canonical vocabulary, plus the alignment window, the
+    engine and ANALYSIS_VERSION. scope (e.g. a session id) keeps identical
+    input in different owners apart, and speaker_baselines (historical
+    baselines the analysis is anchored to) keeps runs against different
+    baselines apart.
+    """
+    digest = hashlib.sha256()
+    header = {"version": ANALYSIS_VERSION, "engine": engine, "window_ms": window_ms, "scope": scope}
+    if speaker_baselines:
+        header["speaker_baselines"] = speaker_baselines
+    digest.update(json.dumps(header, sort_keys=True).encode())
+    for record in transcription_records:
+        row = ("t", _field(record, "start_time_ms"), _field(record, "end_time_ms"),
+               _field(record, "speaker"), _field(record, "transcript"))
+        digest.update(json.dumps(row).encode())
+    for record in emotion_records:
+        row = ("e", _field(record, "timestamp_ms"), EMOTION_VOCABULARY.normalize(_field(record, "emotion")),
+               _field(record, "confidence", None))
+        digest.update(json.dumps(row).encode())
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Thread-safe LRU cache of analysis results with size and age eviction.
+
+    Args:
+        max_entries: Most entries kept; the least recently used go first
+        max_age_s: Seconds an entry stays valid after it was stored (None: forever)
+    """
+
+    def __init__(self, max_entries: int = 256, max_age_s: Optional[float] = 3600):
+        self.max_entries = max_entries
+        self.max_age_s = max_age_s
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value stored under key, or None when missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: Any):
+        """Store value under key, evicting expired and least recently used entries."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while self._entries and self._expired(next(iter(self._entries.values()))[0]):
+                self._entries.popitem(last=False)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str):
+        """Drop the entry stored under key, if any."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.max_age_s is not None and time.monotonic() - stored_at > self.max_age_s
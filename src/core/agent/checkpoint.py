@@ -0,0 +1,304 @@
+"""Database-backed LangGraph checkpointer for resumable analyses."""
+
+import random
+import threading
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from sqlalchemy import Column, Integer, LargeBinary, String, Table, and_, delete, or_, select
+from sqlalchemy.engine import Engine
+
+from src.core.alignment import AlignedEvents
+from src.models.database import Base
+
+# Checkpoint tables, part of the application schema (init_db creates them);
+# a saver on another database creates them on first use
+checkpoints_table = Table(
+    "analysis_checkpoints",
+    Base.metadata,
+    Column("thread_id", String(255), primary_key=True),
+    Column("checkpoint_ns", String(255), primary_key=True),
+    Column("checkpoint_id", String(64), primary_key=True),
+    Column("parent_checkpoint_id", String(64), nullable=True),
+    Column("checkpoint_type", String(32), nullable=False),
+    Column("checkpoint", LargeBinary, nullable=False),
+    Column("metadata_type", String(32), nullable=False),
+    Column("metadata", LargeBinary, nullable=False),
+)
+
+# Channel values by version, so a value is stored once rather than with
+# every checkpoint that still holds it (aligned events, the input records)
+blobs_table = Table(
+    "analysis_checkpoint_blobs",
+    Base.metadata,
+    Column("thread_id", String(255), primary_key=True),
+    Column("checkpoint_ns", String(255), primary_key=True),
+    Column("channel", String(255), primary_key=True),
+    Column("version", String(64), primary_key=True),
+    Column("value_type", String(32), nullable=False),
+    Column("value", LargeBinary, nullable=True),
+)
+
+writes_table = Table(
+    "analysis_checkpoint_writes",
+    Base.metadata,
+    Column("thread_id", String(255), primary_key=True),
+    Column("checkpoint_ns", String(255), primary_key=True),
+    Column("checkpoint_id", String(64), primary_key=True),
+    Column("task_id", String(64), primary_key=True),
+    Column("idx", Integer, primary_key=True),
+    Column("channel", String(255), nullable=False),
+    Column("value_type", String(32), nullable=False),
+    Column("value", LargeBinary, nullable=True),
+    Column("task_path", String(255), nullable=False, default=""),
+)
+
+CHECKPOINT_TABLES = (checkpoints_table, blobs_table, writes_table)
+
+
+class AnalysisSerializer(JsonPlusSerializer):
+    """JsonPlusSerializer that stores AlignedEvents in their compact byte form."""
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        if isinstance(obj, AlignedEvents):
+            return "aligned_events", obj.to_bytes()
+        return super().dumps_typed(obj)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        if data[0] == "aligned_events":
+            return AlignedEvents.from_bytes(data[1])
+        return super().loads_typed(data)
+
+
+class SQLCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    LangGraph checkpoint saver storing checkpoints in a SQLAlchemy database.
+
+    Checkpoints are kept per thread (the analyses use the session id), so
+    a failed run can be resumed from its last completed node by invoking
+    the graph again with no input. Channel values are stored per version
+    like the in-memory saver's blobs, and pending writes of the nodes that
+    succeeded in a failed step are kept so they are not run again.
+
+    Args:
+        engine: SQLAlchemy engine of the database to store checkpoints in
+    """
+
+    def __init__(self, engine: Engine):
+        super().__init__(serde=AnalysisSerializer())
+        self.engine = engine
+        self._is_setup = False
+        self._setup_lock = threading.Lock()
+
+    def setup(self):
+        """Create the checkpoint tables if they do not exist yet."""
+        if self._is_setup:
+            return
+        with self._setup_lock:
+            if not self._is_setup:
+                Base.metadata.create_all(self.engine, tables=CHECKPOINT_TABLES)
+                self._is_setup = True
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Return the checkpoint in config, or the thread's latest one."""
+        return next(self.list(config, limit=1), None)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints, newest first, matching config, filter and before."""
+        self.setup()
+        query = select(checkpoints_table).order_by(checkpoints_table.c.checkpoint_id.desc())
+        if config:
+            configurable = config["configurable"]
+            query = query.where(checkpoints_table.c.thread_id == str(configurable["thread_id"]))
+            if configurable.get("checkpoint_ns") is not None:
+                query = query.where(checkpoints_table.c.checkpoint_ns == configurable["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                query = query.where(checkpoints_table.c.checkpoint_id == checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            query = query.where(checkpoints_table.c.checkpoint_id < before_id)
+        # A metadata filter can only be applied to deserialized rows
+        if limit is not None and not filter:
+            query = query.limit(limit)
+
+        # Read everything up front so no connection stays open between yields
+        checkpoints = []
+        with self.engine.connect() as connection:
+            for row in connection.execute(query).all():
+                if limit is not None and len(checkpoints) >= limit:
+                    break
+                metadata = self.serde.loads_typed((row.metadata_type, row.metadata))
+                if filter and not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+                checkpoints.append(self._checkpoint_tuple(connection, row, metadata))
+        yield from checkpoints
+
+    def _checkpoint_tuple(self, connection, row, metadata: CheckpointMetadata) -> CheckpointTuple:
+        """Assemble a checkpoint tuple with its channel values and pending writes."""
+        checkpoint = self.serde.loads_typed((row.checkpoint_type, row.checkpoint))
+        versions = checkpoint["channel_versions"]
+        channel_values = {}
+        if versions:
+            blobs = connection.execute(select(blobs_table).where(
+                blobs_table.c.thread_id == row.thread_id,
+                blobs_table.c.checkpoint_ns == row.checkpoint_ns,
+                or_(*(
+                    and_(blobs_table.c.channel == channel, blobs_table.c.version == str(version))
+                    for channel, version in versions.items()
+                )),
+            )).all()
+            for blob in blobs:
+                if blob.value_type != "empty":
+                    channel_values[blob.channel] = self.serde.loads_typed((blob.value_type, blob.value))
+
+        writes = connection.execute(select(writes_table).where(
+            writes_table.c.thread_id == row.thread_id,
+            writes_table.c.checkpoint_ns == row.checkpoint_ns,
+            writes_table.c.checkpoint_id == row.checkpoint_id,
+        ).order_by(writes_table.c.task_path, writes_table.c.task_id, writes_table.c.idx)).all()
+
+        def thread_config(checkpoint_id):
+            return {"configurable": {
+                "thread_id": row.thread_id,
+                "checkpoint_ns": row.checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+            }}
+
+        return CheckpointTuple(
+            config=thread_config(row.checkpoint_id),
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=metadata,
+            parent_config=thread_config(row.parent_checkpoint_id) if row.parent_checkpoint_id else None,
+            pending_writes=[
+                (write.task_id, write.channel, self.serde.loads_typed((write.value_type, write.value)))
+                for write in writes
+            ],
+        )
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """Store a checkpoint and the channel values that changed with it."""
+        self.setup()
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        checkpoint = checkpoint.copy()
+        values = checkpoint.pop("channel_values")
+        checkpoint_type, checkpoint_data = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_data = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        blob_rows = []
+        for channel, version in new_versions.items():
+            value_type, value = self.serde.dumps_typed(values[channel]) if channel in values else ("empty", None)
+            blob_rows.append({
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "channel": channel,
+                "version": str(version),
+                "value_type": value_type,
+                "value": value,
+            })
+
+        with self.engine.begin() as connection:
+            if blob_rows:
+                connection.execute(delete(blobs_table).where(
+                    blobs_table.c.thread_id == thread_id,
+                    blobs_table.c.checkpoint_ns == checkpoint_ns,
+                    blobs_table.c.channel.in_([row["channel"] for row in blob_rows]),
+                    blobs_table.c.version.in_([row["version"] for row in blob_rows]),
+                ))
+                connection.execute(blobs_table.insert(), blob_rows)
+            connection.execute(delete(checkpoints_table).where(
+                checkpoints_table.c.thread_id == thread_id,
+                checkpoints_table.c.checkpoint_ns == checkpoint_ns,
+                checkpoints_table.c.checkpoint_id == checkpoint["id"],
+            ))
+            connection.execute(checkpoints_table.insert().values(
+                thread_id=thread_id,
+                checkpoint_ns=checkpoint_ns,
+                checkpoint_id=checkpoint["id"],
+                parent_checkpoint_id=config["configurable"].get("checkpoint_id"),
+                checkpoint_type=checkpoint_type,
+                checkpoint=checkpoint_data,
+                metadata_type=metadata_type,
+                metadata=metadata_data,
+            ))
+
+        return {"configurable": {
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": checkpoint["id"],
+        }}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        """Store the writes of a task that finished within a step."""
+        self.setup()
+        key = {
+            "thread_id": str(config["configurable"]["thread_id"]),
+            "checkpoint_ns": config["configurable"].get("checkpoint_ns", ""),
+            "checkpoint_id": config["configurable"]["checkpoint_id"],
+            "task_id": task_id,
+        }
+        with self.engine.begin() as connection:
+            existing = set(connection.execute(select(writes_table.c.idx).where(
+                *(writes_table.c[name] == key_value for name, key_value in key.items())
+            )).scalars())
+            for idx, (channel, value) in enumerate(writes):
+                idx = WRITES_IDX_MAP.get(channel, idx)
+                if idx in existing:
+                    # Regular writes are kept from the first attempt; special
+                    # (negative index) writes replace earlier ones
+                    if idx >= 0:
+                        continue
+                    connection.execute(delete(writes_table).where(
+                        *(writes_table.c[name] == key_value for name, key_value in key.items()),
+                        writes_table.c.idx == idx,
+                    ))
+                value_type, value_data = self.serde.dumps_typed(value)
+                connection.execute(writes_table.insert().values(
+                    **key, idx=idx, channel=channel, value_type=value_type, value=value_data, task_path=task_path
+                ))
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete every checkpoint, value and write of a thread."""
+        self.setup()
+        with self.engine.begin() as connection:
+            for table in CHECKPOINT_TABLES:
+                connection.execute(delete(table).where(table.c.thread_id == str(thread_id)))
+
+    def get_next_version(self, current: Optional[str], channel: None = None) -> str:
+        """Return a version that sorts after current, like the in-memory saver's."""
+        if current is None:
+            current_version = 0
+        elif isinstance(current, int):
+            current_version = current
+        else:
+            current_version = int(current.split(".")[0])
+        return f"{current_version + 1:032}.{random.random():016}"
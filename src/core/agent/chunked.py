@@ -0,0 +1,390 @@
+"""Chunked engine: map-reduce analysis of multi-hour sessions on a process pool.
+
+The transcription is split into runs of consecutive segments covering about
+chunk_ms each, cut where the speaker changes. Every chunk is aligned with
+the detections inside its segments' windows (so neighbouring chunks overlap
+by the window) and summarized in a worker process:
+- its AlignedEvents, in their compact byte form
+- its speaker index (event indices, emotion counts and sequences)
+- its emotion transitions between consecutive events
+- its transition counts (see transition_counts)
+- its anomaly candidates: every strong emotion, to be checked against the
+  speaker's baseline once the whole session has been counted
+
+Summaries of consecutive chunks are merged with merge_summaries, which is
+associative, and the merged summary is finalized with the session-wide
+baselines. Alignment only depends on the detections in a segment's window
+and every merge accounts for what spans the chunk boundary, so the result
+equals the single-pass graph's. Moment interpretation, speaker profiling and
+report synthesis then run on the merged state as in the graph.
+"""
+
+import multiprocessing
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial, reduce
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.core.alignment import (
+    AlignedEvents,
+    EmotionVocabulary,
+    codes_mask,
+    matrices_from_counts,
+    merge_transition_counts,
+    parse_timestamp_fields,
+    parse_timestamps,
+    transition_counts,
+)
+from src.core.alignment.temporal_alignment import _field
+from src.core.agent.fused import run_stages
+from src.core.agent.nodes import (
+    ALIGNMENT_WINDOW_MS,
+    HIGH_SEVERITY_MASK,
+    STRONG_EMOTIONS_MASK,
+    create_speaker_profiles,
+    interpret_moments,
+    synthesize_report,
+)
+from src.core.agent.state import AgentState
+
+# Target time span of a chunk; a chunk is cut at the first speaker change
+# after it, or regardless of speakers at twice the span
+DEFAULT_CHUNK_MS = 10 * 60 * 1000
+
+# Worker pools by size, started on first use and shared by every run
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(max_workers: int) -> ProcessPoolExecutor:
+    """Return the shared process pool with max_workers workers."""
+    pool = _pools.get(max_workers)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(max_workers)
+            if pool is None:
+                # Spawned workers do not inherit the server's threads and locks
+                pool = _pools[max_workers] = ProcessPoolExecutor(
+                    max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+    return pool
+
+
+def plan_chunks(
+    start_times: Sequence[int],
+    speakers: Sequence[str],
+    chunk_ms: int = DEFAULT_CHUNK_MS
+) -> List[Tuple[int, int]]:
+    """
+    Split segments into runs of about chunk_ms, cut at speaker turns.
+
+    Args:
+        start_times: Segment start times in input order
+        speakers: Segment speakers in input order
+        chunk_ms: Target time span of a chunk
+
+    Returns:
+        (first, stop) segment index ranges covering every segment in order
+    """
+    if chunk_ms < 1:
+        raise ValueError("chunk_ms must be at least 1")
+    chunks = []
+    first = 0
+    for index in range(1, len(start_times)):
+        span = start_times[index] - start_times[first]
+        if span >= 2 * chunk_ms or (span >= chunk_ms and speakers[index] != speakers[index - 1]):
+            chunks.append((first, index))
+            first = index
+    if start_times:
+        chunks.append((first, len(start_times)))
+    return chunks
+
+
+def summarize_chunk(
+    segments: List[Tuple[int, int]],
+    speakers: List[str],
+    transcripts: List[str],
+    detection_times: List[int],
+    emotions: List[str],
+    confidences: List[Optional[float]],
+    window_ms: int
+) -> Dict[str, Any]:
+    """
+    Align one chunk and summarize it (the map step, run in a worker).
+
+    Detections must be in their input order. Event indices in the summary
+    are local to the chunk.
+    """
+    events = AlignedEvents._from_matches(
+        segments, speakers, transcripts, detection_times, emotions, confidences, window_ms
+    )
+    vocabulary = events.vocabulary()
+    codes = events.vocabulary_codes(vocabulary)
+    offsets = events.emotion_offsets
+
+    speaker_index = {}
+    transitions = []
+    candidates = []
+    prev_mask = 0
+    for index in range(len(events)):
+        speaker = events.speakers[events.speaker_codes[index]]
+        entry = speaker_index.get(speaker)
+        if entry is None:
+            entry = speaker_index[speaker] = {
+                "event_indices": [],
+                "pattern": {"totalEmotions": 0, "dominantEmotion": None, "emotionCounts": {}, "emotionSequence": []}
+            }
+        entry["event_indices"].append(index)
+
+        counts = entry["pattern"]["emotionCounts"]
+        sequence = entry["pattern"]["emotionSequence"]
+        start, stop = offsets[index], offsets[index + 1]
+        for position in range(start, stop):
+            emotion = events.labels[events.emotion_codes[position]]
+            counts[emotion] = counts.get(emotion, 0) + 1
+            sequence.append({"timestamp_ms": events.emotion_times[position], "emotion": emotion})
+            code = codes[position]
+            if STRONG_EMOTIONS_MASK >> code & 1:
+                candidates.append((index, events.emotion_times[position], vocabulary.label(code)))
+
+        mask = codes_mask(codes[start:stop])
+        if index and prev_mask and mask and not prev_mask & mask:
+            transitions.append(_transition(events, vocabulary, index, prev_mask, mask))
+        prev_mask = mask
+
+    return {
+        "events": events.to_bytes(),
+        "speaker_index": speaker_index,
+        "transitions": transitions,
+        "transition_counts": transition_counts(events),
+        "candidates": candidates,
+    }
+
+
+def _transition(
+    events: AlignedEvents,
+    vocabulary: EmotionVocabulary,
+    index: int,
+    prev_mask: int,
+    mask: int
+) -> Dict[str, Any]:
+    """Build the transition into event index, as analyze_emotion_patterns does."""
+    return {
+        "from_time_ms": events.end_times[index - 1],
+        "to_time_ms": events.start_times[index],
+        "speaker": events.speakers[events.speaker_codes[index]],
+        "from_emotions": vocabulary.labels(prev_mask),
+        "to_emotions": vocabulary.labels(mask),
+    }
+
+
+def _event_mask(events: AlignedEvents, vocabulary: EmotionVocabulary, index: int) -> int:
+    """Return the bitmask, in vocabulary's codes, of an event's emotions."""
+    offsets = events.emotion_offsets
+    return codes_mask(
+        vocabulary.code(events.labels[code])
+        for code in events.emotion_codes[offsets[index]:offsets[index + 1]]
+    )
+
+
+def merge_summaries(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge the summaries of two consecutive runs of events (the reduce step).
+
+    Associative: any grouping of consecutive summaries merges to the same
+    result. The left summary is extended in place and returned.
+    """
+    events = left["events"]
+    offset = len(events)
+    events.extend(right["events"])
+    vocabulary = events.vocabulary()
+
+    # The emotion transition across the boundary belongs before the right run's own
+    if offset and offset < len(events):
+        prev_mask = _event_mask(events, vocabulary, offset - 1)
+        mask = _event_mask(events, vocabulary, offset)
+        if prev_mask and mask and not prev_mask & mask:
+            left["transitions"].append(_transition(events, vocabulary, offset, prev_mask, mask))
+    # The right run numbered labels outside the canonical vocabulary on its own
+    for transition in right["transitions"]:
+        transition["from_emotions"].sort(key=vocabulary.code)
+        transition["to_emotions"].sort(key=vocabulary.code)
+    left["transitions"].extend(right["transitions"])
+
+    for speaker, entry in right["speaker_index"].items():
+        merged = left["speaker_index"].get(speaker)
+        if merged is None:
+            merged = left["speaker_index"][speaker] = {
+                "event_indices": [],
+                "pattern": {"totalEmotions": 0, "dominantEmotion": None, "emotionCounts": {}, "emotionSequence": []}
+            }
+        merged["event_indices"].extend(index + offset for index in entry["event_indices"])
+        counts = merged["pattern"]["emotionCounts"]
+        for emotion, count in entry["pattern"]["emotionCounts"].items():
+            counts[emotion] = counts.get(emotion, 0) + count
+        merged["pattern"]["emotionSequence"].extend(entry["pattern"]["emotionSequence"])
+
+    left["transition_counts"] = merge_transition_counts(left["transition_counts"], right["transition_counts"])
+    left["candidates"].extend((index + offset, timestamp_ms, emotion) for index, timestamp_ms, emotion in right["candidates"])
+    return left
+
+
+def _empty_summary() -> Dict[str, Any]:
+    """Return the summary of no events, the identity of merge_summaries."""
+    return {
+        "events": AlignedEvents(),
+        "speaker_index": {},
+        "transitions": [],
+        "transition_counts": transition_counts(AlignedEvents()),
+        "candidates": [],
+    }
+
+
+def finalize_summary(summary: Dict[str, Any], historical: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Turn the merged summary into the state update of the analysis nodes.
+
+    historical maps speakers to baseline emotions that replace their session
+    baselines (see detect_anomalies).
+    """
+    events = summary["events"]
+    vocabulary = events.vocabulary()
+    speaker_index = summary["speaker_index"]
+    baselines = {}
+    for speaker, entry in speaker_index.items():
+        pattern = entry["pattern"]
+        pattern["totalEmotions"] = len(pattern["emotionSequence"])
+        if pattern["emotionCounts"]:
+            pattern["dominantEmotion"] = max(pattern["emotionCounts"], key=pattern["emotionCounts"].get)
+        dominant = pattern["dominantEmotion"]
+        baselines[speaker] = vocabulary.code(dominant) if dominant is not None else None
+    baselines.update({speaker: vocabulary.code(emotion) for speaker, emotion in (historical or {}).items()})
+
+    anomalies = []
+    for index, timestamp_ms, emotion in summary["candidates"]:
+        speaker = events.speakers[events.speaker_codes[index]]
+        code = vocabulary.code(emotion)
+        baseline = baselines[speaker]
+        if code != baseline:
+            anomalies.append({
+                "timestamp_ms": timestamp_ms,
+                "event_index": index,
+                "speaker": speaker,
+                "emotion": emotion,
+                "baseline": vocabulary.label(baseline) if baseline is not None else None,
+                "transcript": events.transcripts[index],
+                "severity": "high" if HIGH_SEVERITY_MASK >> code & 1 else "medium"
+            })
+
+    return {
+        "aligned_events": events,
+        "speaker_index": speaker_index,
+        "emotion_patterns": {
+            "by_speaker": {speaker: entry["pattern"] for speaker, entry in speaker_index.items()},
+            "transitions": summary["transitions"],
+            "transition_matrices": matrices_from_counts(summary["transition_counts"]),
+        },
+        "anomalies": anomalies,
+    }
+
+
+def _input_columns(state: AgentState):
+    """Return the input as segment and detection columns in milliseconds."""
+    transcription = state.get("transcription_entries", [])
+    detections = state.get("emotion_detections", [])
+    if state.get("input_format") == "ms":
+        segments = [(_field(r, "start_time_ms"), _field(r, "end_time_ms")) for r in transcription]
+        speakers = [_field(r, "speaker") for r in transcription]
+        transcripts = [_field(r, "transcript") for r in transcription]
+        times = [_field(r, "timestamp_ms") for r in detections]
+        emotions = [_field(r, "emotion") for r in detections]
+        confidences = [_field(r, "confidence", None) for r in detections]
+    elif transcription:
+        bounds = parse_timestamp_fields(transcription, ("startTime", "endTime"))
+        segments = list(zip(bounds["startTime"], bounds["endTime"]))
+        speakers = [entry["speaker"] for entry in transcription]
+        transcripts = [entry["transcript"] for entry in transcription]
+        times = parse_timestamps([d["timestamp"] for d in detections], field="timestamp")
+        emotions = [d["emotion"] for d in detections]
+        confidences = [d.get("confidence") for d in detections]
+    else:
+        segments, speakers, transcripts, times, emotions, confidences = [], [], [], [], [], []
+    return segments, speakers, transcripts, times, emotions, confidences
+
+
+def chunked_analysis(
+    state: AgentState,
+    chunk_ms: int = DEFAULT_CHUNK_MS,
+    max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Temporal alignment, speaker indexing, pattern analysis and anomaly
+    detection as a map-reduce over time chunks.
+
+    Chunks are summarized on a shared process pool of max_workers workers
+    (default: one per CPU); a session of a single chunk, or max_workers=1,
+    is summarized in this process.
+    """
+    segments, speakers, transcripts, times, emotions, confidences = _input_columns(state)
+    window_ms = ALIGNMENT_WINDOW_MS
+    chunks = plan_chunks([start for start, _ in segments], speakers, chunk_ms)
+
+    # Each chunk gets the detections in its segments' windows, in input order
+    order = sorted(range(len(times)), key=times.__getitem__)
+    sorted_times = [times[i] for i in order]
+    tasks = []
+    for first, stop in chunks:
+        low = min(start for start, _ in segments[first:stop]) - window_ms
+        high = max(end for _, end in segments[first:stop]) + window_ms
+        selected = sorted(order[bisect_left(sorted_times, low):bisect_right(sorted_times, high)])
+        tasks.append((
+            segments[first:stop], speakers[first:stop], transcripts[first:stop],
+            [times[i] for i in selected], [emotions[i] for i in selected], [confidences[i] for i in selected],
+            window_ms,
+        ))
+
+    workers = max_workers or os.cpu_count() or 1
+    if len(tasks) > 1 and workers > 1:
+        summaries = list(_pool(workers).map(summarize_chunk, *zip(*tasks)))
+    else:
+        summaries = [summarize_chunk(*task) for task in tasks]
+    for summary in summaries:
+        summary["events"] = AlignedEvents.from_bytes(summary["events"])
+
+    update = finalize_summary(reduce(merge_summaries, summaries, _empty_summary()), state.get("speaker_baselines"))
+    update["steps_completed"] = ["chunked_analysis"]
+    update["metrics"] = {"chunked_analysis": {"chunks": len(tasks), "workers": min(workers, len(tasks))}}
+    return update
+
+
+def chunked_stages(chunk_ms: int = DEFAULT_CHUNK_MS, max_workers: Optional[int] = None, interpreter=None):
+    """Return the stages of the chunked engine, run in order."""
+    interpret = interpret_moments if interpreter is None else partial(interpret_moments, interpreter=interpreter)
+    return (
+        ("chunked_analysis", partial(chunked_analysis, chunk_ms=chunk_ms, max_workers=max_workers)),
+        ("moment_interpretation", interpret),
+        ("speaker_profiling", create_speaker_profiles),
+        ("report_synthesis", synthesize_report),
+    )
+
+
+# Stage names of the chunked engine
+CHUNKED_STAGES = tuple(name for name, _ in chunked_stages())
+
+
+def run_chunked(
+    initial_state: AgentState,
+    on_step: Optional[Callable[[str], None]] = None,
+    interpreter=None,
+    chunk_ms: int = DEFAULT_CHUNK_MS,
+    max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Run the chunked engine on an initial agent state.
+
+    Returns the final state in the same shape as the graph agent's, with
+    the chunked stages in steps_completed, node_timings and metrics.
+    """
+    return run_stages(chunked_stages(chunk_ms, max_workers, interpreter), initial_state, on_step)
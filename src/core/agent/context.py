@@ -0,0 +1,163 @@
+"""Bounded prompt context around critical moments.
+
+An LLM interpreting a critical moment needs the conversation around it, but
+a multi-hour session does not fit in a prompt. ContextBuilder picks the
+nearest events around each moment until a token budget is spent, writes
+each event as one line with runs of repeated emotions collapsed
+("Neutral x4, Fear"), and formats every event once even when the contexts
+of several moments overlap. Prompt size is therefore bounded per moment,
+independent of session length, and backends that interpret a batch of
+moments can show the overlapping lines once (see ChatModelBackend).
+
+Token counts are estimated locally, without a model tokenizer: every word
+costs one token per four characters (rounded up) and every punctuation
+mark one token, which errs on the high side for English text.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+_TOKEN_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in a text."""
+    return sum((len(piece) + 3) // 4 for piece in _TOKEN_PIECES.findall(text))
+
+
+def compress_emotions(emotions: Sequence[str], max_runs: Optional[int] = None) -> str:
+    """
+    Run-length encode a sequence of emotion labels, e.g. "Neutral x3, Fear".
+
+    With max_runs, runs after the first max_runs are replaced by "...".
+    """
+    runs: List[List[Any]] = []
+    for emotion in emotions:
+        if runs and runs[-1][0] == emotion:
+            runs[-1][1] += 1
+        else:
+            runs.append([emotion, 1])
+    parts = [emotion if count == 1 else f"{emotion} x{count}" for emotion, count in runs[:max_runs]]
+    if max_runs is not None and len(runs) > max_runs:
+        parts.append("...")
+    return ", ".join(parts)
+
+
+def _cut_words(text: str, max_tokens: int) -> str:
+    """Return the leading words of text that fit into max_tokens."""
+    kept, tokens = [], 0
+    for word in text.split():
+        tokens += estimate_tokens(word)
+        if tokens > max_tokens:
+            break
+        kept.append(word)
+    return " ".join(kept)
+
+
+class ContextBuilder:
+    """
+    Build token-bounded conversation context for critical moments.
+
+    A moment's context starts with its own event and grows outward, one
+    event before and one after in turn, up to window_events on each side
+    and while the lines fit into max_tokens. Transcripts longer than
+    max_transcript_tokens are cut short, emotions after max_emotion_runs
+    runs are left out, and a line that alone exceeds max_tokens is cut
+    to fit, so no context is larger than max_tokens.
+
+    Args:
+        window_events: Events considered on each side of the moment
+        max_tokens: Token budget of one moment's context
+        max_transcript_tokens: Token limit of a single transcript
+        max_emotion_runs: Runs of repeated emotions shown per event
+    """
+
+    def __init__(
+        self,
+        window_events: int = 3,
+        max_tokens: int = 200,
+        max_transcript_tokens: int = 60,
+        max_emotion_runs: int = 8,
+    ):
+        if window_events < 0:
+            raise ValueError("window_events must not be negative")
+        if max_tokens < 1 or max_transcript_tokens < 1 or max_emotion_runs < 1:
+            raise ValueError("max_tokens, max_transcript_tokens and max_emotion_runs must be at least 1")
+        self.window_events = window_events
+        self.max_tokens = max_tokens
+        self.max_transcript_tokens = max_transcript_tokens
+        self.max_emotion_runs = max_emotion_runs
+
+    def event_line(self, event: Dict[str, Any]) -> str:
+        """Format one event as a context line."""
+        transcript = event["transcript"]
+        if estimate_tokens(transcript) > self.max_transcript_tokens:
+            transcript = _cut_words(transcript, self.max_transcript_tokens) + " ..."
+        line = f"{event['speaker']}: {transcript}"
+        emotions = event.get("emotions")
+        if emotions:
+            line += f" [{compress_emotions([emotion['emotion'] for emotion in emotions], self.max_emotion_runs)}]"
+        if estimate_tokens(line) > self.max_tokens:
+            # A moment's own line is always in its context, so it must fit alone
+            marker = " ..." if self.max_tokens > estimate_tokens(" ...") else ""
+            line = _cut_words(line, self.max_tokens - estimate_tokens(marker)) + marker
+        return line
+
+    def build(self, aligned_events: Sequence[Any], event_indices: Sequence[int]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """
+        Build the context of moments at the given event indices.
+
+        Args:
+            aligned_events: AlignedEvents container or list of event dicts
+            event_indices: Index of each moment's event
+
+        Returns:
+            (contexts, stats): per moment, {"context": the lines as text,
+            "context_lines": [(event index, line)] in event order}; stats
+            with events (distinct events used), tokens (their tokens, each
+            counted once), tokens_per_moment (sum over moments, counting
+            shared lines again) and max_moment_tokens
+        """
+        lines: Dict[int, Tuple[str, int]] = {}
+
+        def line(index: int) -> Tuple[str, int]:
+            # Events shared by several moments are formatted and counted once
+            cached = lines.get(index)
+            if cached is None:
+                text = self.event_line(aligned_events[index])
+                cached = lines[index] = (text, estimate_tokens(text))
+            return cached
+
+        contexts = []
+        tokens_per_moment = max_moment_tokens = 0
+        for index in event_indices:
+            selected = [index]
+            budget = self.max_tokens - line(index)[1]
+            for distance in range(1, self.window_events + 1):
+                grew = False
+                for neighbour in (index - distance, index + distance):
+                    if 0 <= neighbour < len(aligned_events) and line(neighbour)[1] <= budget:
+                        selected.append(neighbour)
+                        budget -= line(neighbour)[1]
+                        grew = True
+                if not grew:
+                    break
+            selected.sort()
+
+            context_lines = [(i, line(i)[0]) for i in selected]
+            moment_tokens = sum(line(i)[1] for i in selected)
+            tokens_per_moment += moment_tokens
+            max_moment_tokens = max(max_moment_tokens, moment_tokens)
+            contexts.append({
+                "context": "\n".join(text for _, text in context_lines),
+                "context_lines": context_lines,
+            })
+
+        used = {i for context in contexts for i, _ in context["context_lines"]}
+        stats = {
+            "events": len(used),
+            "tokens": sum(lines[i][1] for i in used),
+            "tokens_per_moment": tokens_per_moment,
+            "max_moment_tokens": max_moment_tokens,
+        }
+        return contexts, stats
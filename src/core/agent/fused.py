@@ -0,0 +1,195 @@
+"""Fused analysis engine: the analysis nodes in two passes over aligned events."""
+
+from typing import Any, Callable, Dict, Optional
+
+from src.core.alignment import AlignedEvents, transition_matrices
+from src.core.agent.state import AgentState
+from src.core.agent.instrumentation import instrument_node
+from src.core.agent.nodes import (
+    HIGH_SEVERITY_MASK,
+    STRONG_EMOTIONS_MASK,
+    _critical_moment,
+    _historical_baselines,
+    _speaker_profile,
+    perform_temporal_alignment,
+    synthesize_report,
+)
+
+
+def fused_analysis(state: AgentState) -> Dict[str, Any]:
+    """
+    Speaker indexing, pattern analysis, anomaly detection, moment
+    interpretation and speaker profiling in two passes over the events.
+
+    Works on the AlignedEvents columns directly instead of per-event views:
+    - Pass 1 groups events and emotions by speaker (speaker index and
+      patterns) and detects transitions from per-event emotion bitmasks.
+    - Pass 2 checks every emotion against its speaker's baseline and turns
+      high-severity anomalies into critical moments on the spot.
+    Profiles are then read off the speaker index, and the transition
+    matrices are counted over the emotion codes column.
+
+    The results are identical to running the nodes one by one.
+    """
+    aligned_events = state.get("aligned_events", [])
+    if not isinstance(aligned_events, AlignedEvents):
+        aligned_events = AlignedEvents.from_events(aligned_events)
+
+    speakers = aligned_events.speakers
+    speaker_codes = aligned_events.speaker_codes
+    start_times = aligned_events.start_times
+    end_times = aligned_events.end_times
+    transcripts = aligned_events.transcripts
+    offsets = aligned_events.emotion_offsets
+    emotion_times = aligned_events.emotion_times
+    emotion_codes = aligned_events.emotion_codes
+    labels = aligned_events.labels
+    # Container label code -> vocabulary code and bit
+    vocabulary = aligned_events.vocabulary()
+    vocabulary_codes = [vocabulary.code(label) for label in labels]
+    vocabulary_bits = [1 << code for code in vocabulary_codes]
+
+    # Pass 1: speaker index, patterns and transitions
+    entries = [None] * len(speakers)
+    transitions = []
+    prev_mask = 0
+    for index in range(len(aligned_events)):
+        speaker_code = speaker_codes[index]
+        entry = entries[speaker_code]
+        if entry is None:
+            entry = entries[speaker_code] = {
+                "event_indices": [],
+                "pattern": {
+                    "totalEmotions": 0,
+                    "dominantEmotion": None,
+                    "emotionCounts": {},
+                    "emotionSequence": []
+                }
+            }
+        entry["event_indices"].append(index)
+
+        counts = entry["pattern"]["emotionCounts"]
+        sequence = entry["pattern"]["emotionSequence"]
+        mask = 0
+        for position in range(offsets[index], offsets[index + 1]):
+            code = emotion_codes[position]
+            emotion = labels[code]
+            counts[emotion] = counts.get(emotion, 0) + 1
+            sequence.append({"timestamp_ms": emotion_times[position], "emotion": emotion})
+            mask |= vocabulary_bits[code]
+
+        if index and prev_mask and mask and not prev_mask & mask:
+            transitions.append({
+                "from_time_ms": end_times[index - 1],
+                "to_time_ms": start_times[index],
+                "speaker": speakers[speaker_code],
+                "from_emotions": vocabulary.labels(prev_mask),
+                "to_emotions": vocabulary.labels(mask)
+            })
+        prev_mask = mask
+
+    speaker_index = {}
+    baselines = []
+    historical = _historical_baselines(state, vocabulary)
+    for speaker, entry in zip(speakers, entries):
+        pattern = entry["pattern"]
+        pattern["totalEmotions"] = len(pattern["emotionSequence"])
+        if pattern["emotionCounts"]:
+            pattern["dominantEmotion"] = max(pattern["emotionCounts"], key=pattern["emotionCounts"].get)
+        speaker_index[speaker] = entry
+        dominant = pattern["dominantEmotion"]
+        if speaker in historical:
+            baselines.append(historical[speaker])
+        else:
+            baselines.append(vocabulary.code(dominant) if dominant is not None else None)
+
+    # Pass 2: anomalies against the speaker baselines, and their critical moments
+    anomalies = []
+    critical_moments = []
+    for index in range(len(aligned_events)):
+        start, stop = offsets[index], offsets[index + 1]
+        if start == stop:
+            continue
+        speaker_code = speaker_codes[index]
+        baseline = baselines[speaker_code]
+        for position in range(start, stop):
+            code = vocabulary_codes[emotion_codes[position]]
+            if STRONG_EMOTIONS_MASK >> code & 1 and code != baseline:
+                anomaly = {
+                    "timestamp_ms": emotion_times[position],
+                    "event_index": index,
+                    "speaker": speakers[speaker_code],
+                    "emotion": vocabulary.label(code),
+                    "baseline": vocabulary.label(baseline) if baseline is not None else None,
+                    "transcript": transcripts[index],
+                    "severity": "high" if HIGH_SEVERITY_MASK >> code & 1 else "medium"
+                }
+                anomalies.append(anomaly)
+                if anomaly["severity"] == "high":
+                    critical_moments.append(_critical_moment(anomaly, transcripts[index]))
+
+    emotion_patterns = {speaker: entry["pattern"] for speaker, entry in speaker_index.items()}
+    speaker_profiles = {
+        speaker: _speaker_profile(speaker, entry["pattern"], len(entry["event_indices"]))
+        for speaker, entry in speaker_index.items()
+    }
+
+    return {
+        "aligned_events": aligned_events,
+        "speaker_index": speaker_index,
+        "emotion_patterns": {
+            "by_speaker": emotion_patterns,
+            "transitions": transitions,
+            "transition_matrices": transition_matrices(aligned_events, vocabulary)
+        },
+        "anomalies": anomalies,
+        "critical_moments": critical_moments,
+        "speaker_profiles": speaker_profiles,
+        "steps_completed": ["fused_analysis"]
+    }
+
+
+# Stages of the fused engine, run in order
+FUSED_STAGES = (
+    ("temporal_alignment", perform_temporal_alignment),
+    ("fused_analysis", fused_analysis),
+    ("report_synthesis", synthesize_report),
+)
+
+# Keys combined across stages like the graph's state reducers
+_LIST_KEYS = ("steps_completed",)
+_DICT_KEYS = ("node_timings", "metrics")
+
+
+def run_stages(stages, initial_state: AgentState, on_step: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """
+    Run (name, node) stages in order on an initial agent state.
+
+    Each stage is instrumented like a graph node, and its update is applied
+    with the graph's reducers. on_step, if given, is called with each
+    stage's name once it finishes.
+    """
+    state = dict(initial_state)
+    for name, stage in stages:
+        update = instrument_node(name, stage)(state)
+        for key, value in update.items():
+            if key in _LIST_KEYS:
+                state[key] = state.get(key, []) + value
+            elif key in _DICT_KEYS:
+                state[key] = {**state.get(key, {}), **value}
+            else:
+                state[key] = value
+        if on_step is not None:
+            on_step(name)
+    return state
+
+
+def run_fused(initial_state: AgentState, on_step: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """
+    Run the fused engine on an initial agent state.
+
+    Returns the final state in the same shape as the graph agent's, with
+    steps_completed, node_timings and metrics listing the fused stages.
+    on_step, if given, is called with each stage's name once it finishes.
+    """
+    return run_stages(FUSED_STAGES, initial_state, on_step)
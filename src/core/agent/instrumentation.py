@@ -0,0 +1,93 @@
+"""Per-node instrumentation for the interpretation agent."""
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+from src.core.agent.state import AgentState
+
+# State keys whose sizes each node reports: (input keys, output keys).
+# Dotted keys reach into nested dicts, e.g. the transitions in emotion_patterns.
+NODE_CARDINALITIES: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    "temporal_alignment": (("transcription_entries", "emotion_detections"), ("aligned_events",)),
+    "speaker_indexing": (("aligned_events",), ("speaker_index",)),
+    "pattern_analysis": (("aligned_events", "speaker_index"), ("emotion_patterns.by_speaker", "emotion_patterns.transitions")),
+    "anomaly_detection": (("aligned_events",), ("anomalies",)),
+    "moment_interpretation": (("anomalies",), ("critical_moments",)),
+    "speaker_profiling": (("speaker_index",), ("speaker_profiles",)),
+    "report_synthesis": (("critical_moments", "anomalies", "speaker_profiles"), ("report.critical_moments",)),
+    "fused_analysis": (("aligned_events",), ("emotion_patterns.transitions", "anomalies", "critical_moments", "speaker_profiles")),
+}
+
+
+def _size(values: Dict[str, Any], key: str):
+    """Return len() of a (dotted) key's value, or None when it is absent or unsized."""
+    value = values
+    for part in key.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+def instrument_node(name: str, node: Callable[[AgentState], Dict[str, Any]]) -> Callable[[AgentState], Dict[str, Any]]:
+    """
+    Wrap a node so its update reports what the node cost.
+
+    The update gains node_timings[name] (wall time in ms) and metrics[name]:
+    - wall_ms, cpu_ms: Wall time and CPU time of the calling thread
+    - peak_alloc_kb: Peak traced allocation above the start level, only
+      when the run asked for trace_memory (see tracing_memory)
+    - inputs, outputs: Sizes of the node's state keys in NODE_CARDINALITIES
+    Metrics the node reports itself under metrics[name] are kept alongside.
+
+    CPU time is per thread, so parallel branches do not count each other.
+    tracemalloc peaks are process-wide, so nodes that overlap in time
+    (parallel branches, concurrent runs) share one peak.
+    """
+    input_keys, output_keys = NODE_CARDINALITIES.get(name, ((), ()))
+
+    @wraps(node)
+    def instrumented_node(state: AgentState) -> Dict[str, Any]:
+        trace = state.get("trace_memory") and tracemalloc.is_tracing()
+        if trace:
+            start_alloc = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        started_cpu = time.thread_time()
+        started = time.perf_counter()
+
+        update = node(state)
+
+        wall_ms = (time.perf_counter() - started) * 1000
+        node_metrics = {
+            "wall_ms": wall_ms,
+            "cpu_ms": (time.thread_time() - started_cpu) * 1000,
+            "inputs": {key: _size(state, key) for key in input_keys},
+            "outputs": {key: _size(update, key) for key in output_keys},
+        }
+        if trace:
+            node_metrics["peak_alloc_kb"] = max(0, tracemalloc.get_traced_memory()[1] - start_alloc) / 1024
+
+        update["node_timings"] = {name: wall_ms}
+        update["metrics"] = {name: {**update.get("metrics", {}).get(name, {}), **node_metrics}}
+        return update
+
+    return instrumented_node
+
+
+@contextmanager
+def tracing_memory(enabled: bool) -> Iterator[None]:
+    """Start tracemalloc for the duration of a run when enabled and not already tracing."""
+    started = enabled and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        yield
+    finally:
+        if started:
+            tracemalloc.stop()
@@ -0,0 +1,391 @@
+"""Pluggable, batched and cached interpretation of critical moments.
+
+interpret_moments hands its critical moments to a MomentInterpreter, which
+asks an InterpretationBackend to interpret them. Backends are called with
+batches of moments, so one call covers many moments; batches run
+concurrently on a shared background event loop, limited by a semaphore per
+interpreter and bounded by a timeout per call. Responses are cached by
+moment (speaker, emotion, transcript and a hash of the prompt context), so
+identical moments are interpreted once, within a run and, with the SQL
+cache, across runs and processes.
+
+StubInterpretationBackend is deterministic and local: it produces the
+rule-based interpretations the analysis always had, and stands in for an
+LLM in tests and offline use. ChatModelBackend adapts any LangChain chat
+model. An interpreter with a ContextBuilder gives every moment a bounded
+context of the conversation around it.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Column, DateTime, String, Table, Text, select
+from sqlalchemy.engine import Engine
+
+from src.core.agent.context import ContextBuilder
+from src.models.database import Base
+
+# Rule-based explanation appended per emotion by the stub backend
+_EMOTION_EXPLANATIONS = {
+    "Surprise": " - This unexpected emotional response may indicate they were caught off guard or revealed hidden knowledge.",
+    "Fear": " - This fear response suggests anxiety about the topic or potential deception.",
+    "Anxiety": " - This anxiety indicates internal conflict or stress related to their statement.",
+}
+
+
+def describe_moment(speaker: str, emotion: str, transcript: str) -> str:
+    """Return the rule-based interpretation of a moment."""
+    return f"{speaker} showed {emotion} when saying: '{transcript}'" + _EMOTION_EXPLANATIONS.get(emotion, "")
+
+
+def moment_cache_key(backend: str, moment: Dict[str, Any]) -> str:
+    """
+    Return the cache key of a moment's interpretation by a backend.
+
+    The key covers the backend name, speaker, emotion, transcript and the
+    SHA-256 of the moment's prompt context.
+    """
+    context_hash = hashlib.sha256(moment.get("context", "").encode("utf-8")).hexdigest()
+    payload = json.dumps([backend, moment["speaker"], moment["emotion"], moment["transcript"], context_hash])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class InterpretationBackend:
+    """
+    Interface of interpretation backends.
+
+    A moment is a dict with speaker, emotion, transcript and context (the
+    prompt context around it, possibly empty); moments with context also
+    carry event_index and context_lines, the (event index, line) pairs of
+    the context (see ContextBuilder). Backends interpret a batch
+    of moments per call and return one interpretation per moment, in
+    order. Subclasses implement interpret_batch, and ainterpret_batch too
+    when they have a native async client (the default runs interpret_batch
+    in a worker thread, which a timeout cannot interrupt).
+
+    name identifies the backend in cache keys: change it whenever the
+    backend's answers change (model, prompt).
+    """
+
+    name = "backend"
+
+    def interpret_batch(self, moments: List[Dict[str, Any]]) -> List[str]:
+        """Return one interpretation per moment."""
+        raise NotImplementedError
+
+    async def ainterpret_batch(self, moments: List[Dict[str, Any]]) -> List[str]:
+        """Async interpret_batch."""
+        return await asyncio.to_thread(self.interpret_batch, moments)
+
+
+class StubInterpretationBackend(InterpretationBackend):
+    """Deterministic local backend returning the rule-based interpretations."""
+
+    name = "stub"
+
+    def interpret_batch(self, moments: List[Dict[str, Any]]) -> List[str]:
+        return [describe_moment(m["speaker"], m["emotion"], m["transcript"]) for m in moments]
+
+    async def ainterpret_batch(self, moments: List[Dict[str, Any]]) -> List[str]:
+        return self.interpret_batch(moments)
+
+
+class ChatModelBackend(InterpretationBackend):
+    """
+    Backend asking a LangChain chat model to interpret a batch of moments.
+
+    The model gets every moment of the batch in one prompt and must answer
+    with a JSON array holding one interpretation string per moment. Context
+    lines are listed once per prompt, however many moments of the batch
+    share them, and each moment refers to its range of lines.
+
+    Args:
+        model: LangChain chat model (anything with invoke/ainvoke)
+        name: Backend name for cache keys; defaults to the model's class name
+    """
+
+    PROMPT = (
+        "You analyze emotionally significant moments of an interview. For each numbered moment, "
+        "explain in one or two sentences what the speaker's emotion may reveal, using the context "
+        "where given. Answer with only a JSON array of strings, one per moment, in order.\n\n{moments}"
+    )
+
+    def __init__(self, model, name: Optional[str] = None):
+        self.model = model
+        self.name = name or f"chat:{type(model).__name__}"
+
+    def prompt(self, moments: List[Dict[str, Any]]) -> str:
+        """Build the prompt for a batch of moments."""
+        excerpts = {}
+        for moment in moments:
+            excerpts.update(moment.get("context_lines", ()))
+        lines = []
+        if excerpts:
+            lines.append("Conversation excerpts:")
+            lines.extend(f"[{index}] {line}" for index, line in sorted(excerpts.items()))
+            lines.append("")
+        for number, moment in enumerate(moments, 1):
+            lines.append(f"{number}. {moment['speaker']} showed {moment['emotion']} when saying: '{moment['transcript']}'")
+            if moment.get("context_lines"):
+                first, last = moment["context_lines"][0][0], moment["context_lines"][-1][0]
+                lines.append(f"   Context: excerpts [{first}]-[{last}], the moment is [{moment['event_index']}]")
+            elif moment.get("context"):
+                lines.append(f"   Context: {moment['context']}")
+        return self.PROMPT.format(moments="\n".join(lines))
+
+    def parse(self, content: Any, count: int) -> List[str]:
+        """Parse the model's answer; raises ValueError unless it holds count strings."""
+        text = content if isinstance(content, str) else str(content)
+        start, end = text.find("["), text.rfind("]")
+        if start < 0 or end < start:
+            raise ValueError("Model answer holds no JSON array")
+        answers = json.loads(text[start:end + 1])
+        if len(answers) != count or not all(isinstance(answer, str) for answer in answers):
+            raise ValueError(f"Expected {count} interpretations, got {answers!r}")
+        return answers
+
+    def interpret_batch(self, moments: List[Dict[str, Any]]) -> List[str]:
+        return self.parse(self.model.invoke(self.prompt(moments)).content, len(moments))
+
+    async def ainterpret_batch(self, moments: List[Dict[str, Any]]) -> List[str]:
+        return self.parse((await self.model.ainvoke(self.prompt(moments))).content, len(moments))
+
+
+class InterpretationCache:
+    """
+    Thread-safe in-memory LRU of interpretations by moment_cache_key.
+
+    Args:
+        max_entries: Entries kept before the least recently used are evicted
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Return the cached interpretations among keys."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+        return found
+
+    def put_many(self, interpretations: Dict[str, str]):
+        """Store interpretations by key."""
+        with self._lock:
+            for key, interpretation in interpretations.items():
+                self._entries[key] = interpretation
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Interpretation cache table, part of the application schema (init_db creates
+# it); a cache on another database creates it on first use
+interpretations_table = Table(
+    "interpretation_cache",
+    Base.metadata,
+    Column("key", String(64), primary_key=True),
+    Column("interpretation", Text, nullable=False),
+    Column("created_at", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+
+class SQLInterpretationCache:
+    """
+    Persistent interpretation cache in a SQLAlchemy database.
+
+    Entries never expire: a key only matches the same backend, moment and
+    context, whose answer is not expected to change.
+
+    Args:
+        engine: SQLAlchemy engine of the database to store interpretations in
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._is_setup = False
+        self._setup_lock = threading.Lock()
+
+    def setup(self):
+        """Create the cache table if it does not exist yet."""
+        if self._is_setup:
+            return
+        with self._setup_lock:
+            if not self._is_setup:
+                Base.metadata.create_all(self.engine, tables=[interpretations_table])
+                self._is_setup = True
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Return the cached interpretations among keys."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        self.setup()
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                select(interpretations_table.c.key, interpretations_table.c.interpretation)
+                .where(interpretations_table.c.key.in_(keys))
+            ).all()
+        return {row.key: row.interpretation for row in rows}
+
+    def put_many(self, interpretations: Dict[str, str]):
+        """Store interpretations by key, keeping entries that already exist."""
+        if not interpretations:
+            return
+        self.setup()
+        with self.engine.begin() as connection:
+            existing = set(connection.execute(
+                select(interpretations_table.c.key).where(interpretations_table.c.key.in_(list(interpretations)))
+            ).scalars())
+            rows = [
+                {"key": key, "interpretation": interpretation, "created_at": datetime.utcnow()}
+                for key, interpretation in interpretations.items()
+                if key not in existing
+            ]
+            if rows:
+                connection.execute(interpretations_table.insert(), rows)
+
+
+# One background event loop runs the backend calls of every interpreter, so
+# synchronous graph nodes can await async clients with real timeouts
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared background event loop, starting it on first use."""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="interpretation-loop", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+class MomentInterpreter:
+    """
+    Interpret critical moments with a backend, in cached concurrent batches.
+
+    Moments are looked up in the cache first; identical moments are
+    interpreted once. The rest go to the backend batch_size at a time, with
+    at most max_concurrency calls of this interpreter in flight across all
+    concurrent analyses. A call that fails or exceeds timeout_s falls back
+    to the rule-based interpretation for its moments, which is not cached.
+
+    interpret_moments gives the moments context from context_builder, if
+    set; without one, moments have no context.
+
+    Args:
+        backend: Interpretation backend
+        cache: InterpretationCache, SQLInterpretationCache, or None for no caching
+        batch_size: Moments per backend call
+        max_concurrency: Backend calls in flight at once
+        timeout_s: Time limit of one backend call in seconds
+        context_builder: Optional ContextBuilder for the moments' context
+    """
+
+    def __init__(
+        self,
+        backend: InterpretationBackend,
+        cache=None,
+        batch_size: int = 8,
+        max_concurrency: int = 4,
+        timeout_s: float = 30.0,
+        context_builder: Optional[ContextBuilder] = None
+    ):
+        if batch_size < 1 or max_concurrency < 1:
+            raise ValueError("batch_size and max_concurrency must be at least 1")
+        if timeout_s <= 0:
+            raise ValueError("timeout_s must be positive")
+        self.backend = backend
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.timeout_s = timeout_s
+        self.context_builder = context_builder
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def interpret(self, moments: List[Dict[str, Any]]) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Interpret moments.
+
+        Args:
+            moments: Dicts with speaker, emotion, transcript and optional context
+
+        Returns:
+            (one interpretation per moment, stats) where stats counts moments,
+            cache_hits, backend calls, timeouts and failures (failed calls)
+        """
+        stats = {"moments": len(moments), "cache_hits": 0, "calls": 0, "timeouts": 0, "failures": 0}
+        keys = [moment_cache_key(self.backend.name, moment) for moment in moments]
+
+        # One request per distinct moment
+        unique: Dict[str, Dict[str, Any]] = {}
+        for key, moment in zip(keys, moments):
+            unique.setdefault(key, moment)
+
+        interpretations = self.cache.get_many(unique) if self.cache is not None and unique else {}
+        stats["cache_hits"] = sum(1 for key in keys if key in interpretations)
+
+        missing = [key for key in unique if key not in interpretations]
+        batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+        if batches:
+            future = asyncio.run_coroutine_threadsafe(
+                self._interpret_batches([[unique[key] for key in batch] for batch in batches]),
+                _background_loop(),
+            )
+            fresh = {}
+            for batch, (status, answers) in zip(batches, future.result()):
+                stats["calls"] += 1
+                if status == "ok":
+                    fresh.update(zip(batch, answers))
+                    continue
+                stats["timeouts" if status == "timeout" else "failures"] += 1
+                for key in batch:
+                    moment = unique[key]
+                    interpretations[key] = describe_moment(moment["speaker"], moment["emotion"], moment["transcript"])
+            if self.cache is not None:
+                self.cache.put_many(fresh)
+            interpretations.update(fresh)
+
+        return [interpretations[key] for key in keys], stats
+
+    async def _interpret_batches(self, batches: List[List[Dict[str, Any]]]) -> List[Tuple[str, Optional[List[str]]]]:
+        """Run every batch on the background loop; return (status, answers) per batch."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return await asyncio.gather(*(self._interpret_batch(batch) for batch in batches))
+
+    async def _interpret_batch(self, batch: List[Dict[str, Any]]) -> Tuple[str, Optional[List[str]]]:
+        """Run one backend call under the semaphore and timeout."""
+        async with self._semaphore:
+            try:
+                answers = await asyncio.wait_for(self.backend.ainterpret_batch(batch), self.timeout_s)
+            except asyncio.TimeoutError:
+                return "timeout", None
+            except Exception:
+                return "failed", None
+        if len(answers) != len(batch):
+            return "failed", None
+        return "ok", list(answers)
+
+
+# Interpreter used by interpret_moments unless the graph is given another
+DEFAULT_INTERPRETER = MomentInterpreter(StubInterpretationBackend())
@@ -1,8 +1,62 @@
 """Agent nodes for the emotion interpretation agent."""
 
-from typing import Dict, Any
-from src.core.alignment import align_emotion_with_transcript, compute_emotion_pattern
+from array import array
+from typing import Dict, Any, Optional, Sequence, Tuple
+from src.core.alignment import (
+    AlignedEvents,
+    EMOTION_VOCABULARY,
+    EmotionVocabulary,
+    codes_mask,
+    ms_to_timestamp,
+    transition_matrices,
+)
 from src.core.agent.state import AgentState
+from src.core.agent.interpretation import DEFAULT_INTERPRETER, MomentInterpreter, describe_moment
+
+# Strong emotional signals flagged by detect_anomalies, and those rated high severity
+STRONG_EMOTIONS_MASK = EMOTION_VOCABULARY.mask(["Surprise", "Fear", "Anxiety", "Anger", "Disgust", "Sadness"])
+HIGH_SEVERITY_MASK = EMOTION_VOCABULARY.mask(["Fear", "Surprise", "Anxiety"])
+NEUTRAL_CODE = EMOTION_VOCABULARY.code("Neutral")
+
+# Tolerance window of the agent's temporal alignment
+ALIGNMENT_WINDOW_MS = 100
+
+
+def _emotion_codes(aligned_events) -> Tuple[array, Sequence[int], EmotionVocabulary]:
+    """
+    Return the vocabulary code of every matched emotion, per-event offsets
+    and the local vocabulary that decodes them.
+    
+    Event i owns codes[offsets[i]:offsets[i + 1]]. AlignedEvents already
+    hold encoded labels; plain event dicts are encoded here.
+    """
+    if isinstance(aligned_events, AlignedEvents):
+        vocabulary = aligned_events.vocabulary()
+        return aligned_events.vocabulary_codes(vocabulary), aligned_events.emotion_offsets, vocabulary
+    vocabulary = EMOTION_VOCABULARY.local()
+    codes = array("i")
+    offsets = [0]
+    for event in aligned_events:
+        codes.extend(vocabulary.code(e["emotion"]) for e in event["emotions"])
+        offsets.append(len(codes))
+    return codes, offsets, vocabulary
+
+
+def _first_event_by_timestamp(aligned_events) -> Dict[int, int]:
+    """Map each emotion timestamp to the index of the first event containing it."""
+    index = {}
+    for event_index, event in enumerate(aligned_events):
+        for emotion in event.get("emotions", []):
+            index.setdefault(emotion["timestamp_ms"], event_index)
+    return index
+
+
+def _speaker_index(state: AgentState) -> Dict[str, Dict[str, Any]]:
+    """Return the run's speaker index, building it when the indexing node has not run."""
+    speaker_index = state.get("speaker_index")
+    if speaker_index is None:
+        speaker_index = build_speaker_index(state)["speaker_index"]
+    return speaker_index
 
 
 def perform_temporal_alignment(state: AgentState) -> Dict[str, Any]:
@@ -10,19 +64,73 @@ def perform_temporal_alignment(state: AgentState) -> Dict[str, Any]:
     Node 1: Perform temporal alignment of emotions with transcription.
     
     Uses the alignment algorithm from Phase 1 to match emotions with transcript segments.
+    Integer-millisecond records (input_format "ms") are aligned without parsing.
+    Events are kept in a compact AlignedEvents container whose items read
+    like the aligned event dicts.
     """
     transcription = state.get("transcription_entries", [])
     emotions = state.get("emotion_detections", [])
     
     # Perform alignment using the algorithm from Phase 1
-    aligned_events = align_emotion_with_transcript(transcription, emotions, window_ms=100)
-    
-    steps = state.get("steps_completed", [])
-    steps.append("temporal_alignment")
+    if state.get("input_format") == "ms":
+        aligned_events = AlignedEvents.from_records(transcription, emotions, window_ms=ALIGNMENT_WINDOW_MS)
+    else:
+        aligned_events = AlignedEvents.from_entries(transcription, emotions, window_ms=ALIGNMENT_WINDOW_MS)
     
     return {
         "aligned_events": aligned_events,
-        "steps_completed": steps
+        "steps_completed": ["temporal_alignment"]
+    }
+
+
+def build_speaker_index(state: AgentState) -> Dict[str, Any]:
+    """
+    Node 1b: Group aligned events and emotions by speaker in one pass.
+    
+    For every speaker, in order of first appearance, the index holds:
+    - event_indices: Positions of the speaker's events in aligned_events
+    - pattern: The speaker's emotion pattern, as compute_emotion_pattern
+      would build it over all of their emotions, except that sequence
+      entries keep their time as timestamp_ms; synthesize_report formats
+      them for the report
+    
+    Pattern analysis, anomaly detection (through the patterns) and speaker
+    profiling all read this index instead of regrouping the events.
+    """
+    aligned_events = state.get("aligned_events", [])
+    
+    speaker_index = {}
+    for index, event in enumerate(aligned_events):
+        speaker = event["speaker"]
+        entry = speaker_index.get(speaker)
+        if entry is None:
+            entry = speaker_index[speaker] = {
+                "event_indices": [],
+                "pattern": {
+                    "totalEmotions": 0,
+                    "dominantEmotion": None,
+                    "emotionCounts": {},
+                    "emotionSequence": []
+                }
+            }
+        entry["event_indices"].append(index)
+        
+        counts = entry["pattern"]["emotionCounts"]
+        sequence = entry["pattern"]["emotionSequence"]
+        for e in event.get("emotions", ()):
+            emotion = e["emotion"]
+            counts[emotion] = counts.get(emotion, 0) + 1
+            sequence.append({"timestamp_ms": e["timestamp_ms"], "emotion": emotion})
+    
+    for entry in speaker_index.values():
+        pattern = entry["pattern"]
+        pattern["totalEmotions"] = len(pattern["emotionSequence"])
+        if pattern["emotionCounts"]:
+            pattern["dominantEmotion"] = max(pattern["emotionCounts"], key=pattern["emotionCounts"].get)
+    
+    return {
+        "speaker_index": speaker_index,
+        "steps_completed": ["speaker_indexing"]
     }
 
 
@@ -34,59 +142,43 @@ def analyze_emotion_patterns(state: AgentState) -> Dict[str, Any]:
     - Dominant emotions per speaker
     - Emotional transitions
     - Emotion consistency/inconsistency
+    - First-order emotion transition matrices, overall and per speaker
     """
     aligned_events = state.get("aligned_events", [])
     
-    # Group events by speaker
-    speaker_emotions = {}
-    for event in aligned_events:
-        speaker = event["speaker"]
-        if speaker not in speaker_emotions:
-            speaker_emotions[speaker] = []
-        speaker_emotions[speaker].extend(event["emotions"])
-    
-    # Compute patterns for each speaker
-    emotion_patterns = {}
-    for speaker, emotions in speaker_emotions.items():
-        # Add timestamp if missing (for backward compatibility)
-        emotions_with_timestamps = []
-        for e in emotions:
-            if "timestamp" not in e:
-                e["timestamp"] = f"{e['timestamp_ms'] // 60000:02d}:{(e['timestamp_ms'] % 60000) // 1000:02d}.{e['timestamp_ms'] % 1000:03d}"
-            emotions_with_timestamps.append(e)
-        
-        pattern = compute_emotion_pattern(emotions_with_timestamps)
-        emotion_patterns[speaker] = pattern
+    # Per-speaker patterns come straight from the shared speaker index
+    emotion_patterns = {
+        speaker: entry["pattern"]
+        for speaker, entry in _speaker_index(state).items()
+    }
     
-    # Detect emotional transitions (shifts between segments)
+    # Detect emotional transitions (shifts between segments) on emotion bitmasks
+    codes, offsets, vocabulary = _emotion_codes(aligned_events)
+    masks = [codes_mask(codes[offsets[i]:offsets[i + 1]]) for i in range(len(aligned_events))]
     transitions = []
     for i in range(1, len(aligned_events)):
-        prev_event = aligned_events[i-1]
-        curr_event = aligned_events[i]
+        prev_mask = masks[i-1]
+        curr_mask = masks[i]
         
-        if prev_event["emotions"] and curr_event["emotions"]:
-            prev_emotions = set(e["emotion"] for e in prev_event["emotions"])
-            curr_emotions = set(e["emotion"] for e in curr_event["emotions"])
-            
-            # If emotions changed significantly
-            if not prev_emotions.intersection(curr_emotions):
-                transitions.append({
-                    "from_time_ms": prev_event["end_time_ms"],
-                    "to_time_ms": curr_event["start_time_ms"],
-                    "speaker": curr_event["speaker"],
-                    "from_emotions": list(prev_emotions),
-                    "to_emotions": list(curr_emotions)
-                })
-    
-    steps = state.get("steps_completed", [])
-    steps.append("emotion_pattern_analysis")
+        # If emotions changed significantly (no emotion in common)
+        if prev_mask and curr_mask and not prev_mask & curr_mask:
+            prev_event = aligned_events[i-1]
+            curr_event = aligned_events[i]
+            transitions.append({
+                "from_time_ms": prev_event["end_time_ms"],
+                "to_time_ms": curr_event["start_time_ms"],
+                "speaker": curr_event["speaker"],
+                "from_emotions": vocabulary.labels(prev_mask),
+                "to_emotions": vocabulary.labels(curr_mask)
+            })
     
     return {
         "emotion_patterns": {
             "by_speaker": emotion_patterns,
-            "transitions": transitions
+            "transitions": transitions,
+            "transition_matrices": transition_matrices(aligned_events, vocabulary)
         },
-        "steps_completed": steps
+        "steps_completed": ["emotion_pattern_analysis"]
     }
 
 
@@ -98,105 +190,168 @@ def detect_anomalies(state: AgentState) -> Dict[str, Any]:
     - Emotion doesn't match content (e.g., fear during casual statement)
     - Unexpected emotional spikes
     - Suppressed or absent emotions where expected
+    
+    A speaker's baseline is their dominant emotion in the session, unless
+    the state carries a historical baseline for them in speaker_baselines
+    (e.g. from earlier sessions, see speaker_statistics).
     """
     aligned_events = state.get("aligned_events", [])
     emotion_patterns = state.get("emotion_patterns", {})
     
     anomalies = []
+    codes, offsets, vocabulary = _emotion_codes(aligned_events)
     
-    # Get baseline emotions for each speaker
+    # Get baseline emotion codes for each speaker
     speaker_baselines = {}
     if "by_speaker" in emotion_patterns:
         for speaker, pattern in emotion_patterns["by_speaker"].items():
-            speaker_baselines[speaker] = pattern.get("dominantEmotion", "Neutral")
-    
-    # Detect anomalies
-    for event in aligned_events:
-        speaker = event["speaker"]
-        emotions = event["emotions"]
-        
-        if not emotions:
+            dominant = pattern.get("dominantEmotion", "Neutral")
+            speaker_baselines[speaker] = vocabulary.code(dominant) if dominant is not None else None
+    speaker_baselines.update(_historical_baselines(state, vocabulary))
+    
+    # Detect anomalies on emotion codes; labels are decoded only for reported anomalies
+    for index, event in enumerate(aligned_events):
+        start, stop = offsets[index], offsets[index + 1]
+        if start == stop:
             continue
         
-        # Look for strong emotional signals (Surprise, Fear, Anxiety, Anger)
-        strong_emotions = ["Surprise", "Fear", "Anxiety", "Anger", "Disgust", "Sadness"]
+        speaker = event["speaker"]
+        emotions = event["emotions"]
+        baseline = speaker_baselines.get(speaker, NEUTRAL_CODE)
         
-        for emotion_data in emotions:
-            emotion = emotion_data["emotion"]
+        for position in range(start, stop):
+            code = codes[position]
             
-            # Check if this is a strong emotion
-            if emotion in strong_emotions:
-                # Check if it deviates from speaker's baseline
-                baseline = speaker_baselines.get(speaker, "Neutral")
-                if emotion != baseline:
-                    anomalies.append({
-                        "timestamp_ms": emotion_data["timestamp_ms"],
-                        "speaker": speaker,
-                        "emotion": emotion,
-                        "baseline": baseline,
-                        "transcript": event["transcript"],
-                        "severity": "high" if emotion in ["Fear", "Surprise", "Anxiety"] else "medium"
-                    })
-    
-    steps = state.get("steps_completed", [])
-    steps.append("anomaly_detection")
+            # Strong emotional signal (Surprise, Fear, Anxiety, Anger, ...) that deviates from the speaker's baseline
+            if STRONG_EMOTIONS_MASK >> code & 1 and code != baseline:
+                anomalies.append({
+                    "timestamp_ms": emotions[position - start]["timestamp_ms"],
+                    "event_index": index,
+                    "speaker": speaker,
+                    "emotion": vocabulary.label(code),
+                    "baseline": vocabulary.label(baseline) if baseline is not None else None,
+                    "transcript": event["transcript"],
+                    "severity": "high" if HIGH_SEVERITY_MASK >> code & 1 else "medium"
+                })
     
     return {
         "anomalies": anomalies,
-        "steps_completed": steps
+        "steps_completed": ["anomaly_detection"]
+    }
+
+
+def _historical_baselines(state: AgentState, vocabulary: EmotionVocabulary) -> Dict[str, int]:
+    """Return the codes, in a run's local vocabulary, of the state's historical speaker baselines."""
+    return {speaker: vocabulary.code(emotion) for speaker, emotion in (state.get("speaker_baselines") or {}).items()}
+
+
+def _report_patterns(emotion_patterns: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of emotion_patterns whose sequences have MM:SS.mmm timestamps."""
+    if "by_speaker" not in emotion_patterns:
+        return emotion_patterns
+    return {
+        **emotion_patterns,
+        "by_speaker": {
+            speaker: {
+                **pattern,
+                "emotionSequence": [
+                    {"timestamp": ms_to_timestamp(entry["timestamp_ms"]), "emotion": entry["emotion"]}
+                    for entry in pattern["emotionSequence"]
+                ]
+            }
+            for speaker, pattern in emotion_patterns["by_speaker"].items()
+        }
     }
 
 
-def interpret_moments(state: AgentState) -> Dict[str, Any]:
+def _critical_moment(anomaly: Dict[str, Any], transcript: str, interpretation: Optional[str] = None) -> Dict[str, Any]:
+    """Build the critical moment for a high-severity anomaly and its transcript."""
+    if interpretation is None:
+        # Simple interpretation based on emotion type
+        interpretation = describe_moment(anomaly["speaker"], anomaly["emotion"], transcript)
+    
+    return {
+        "timestamp_ms": anomaly["timestamp_ms"],
+        "speaker": anomaly["speaker"],
+        "emotion": anomaly["emotion"],
+        "transcript": transcript,
+        "interpretation": interpretation,
+        "significance": "high"
+    }
+
+
+def interpret_moments(state: AgentState, interpreter: Optional[MomentInterpreter] = None) -> Dict[str, Any]:
     """
     Node 4: Create interpretations for critical moments.
     
-    This is a simplified version that creates basic interpretations.
-    In full implementation with LLM, this would use Claude 3.5 to generate
-    detailed natural language interpretations.
+    The interpretations come from a MomentInterpreter: by default the
+    deterministic rule-based stub, or an LLM-backed one passed in through
+    the graph's interpreter option. Backend calls are batched, cached and
+    run concurrently; their counts are reported in the node's metrics.
+    With a context builder, each moment gets a token-bounded context of
+    the events around it, whose token counts are reported too.
     """
     anomalies = state.get("anomalies", [])
     aligned_events = state.get("aligned_events", [])
     
-    # Identify critical moments (anomalies + key transitions)
-    critical_moments = []
+    # Identify critical moments (anomalies + key transitions) with their transcripts
+    sources = []
+    
+    # Anomalies from detect_anomalies point at their source event; others are
+    # looked up by timestamp in an index built once
+    events_by_timestamp = None
     
     # Convert anomalies to critical moments
     for anomaly in anomalies:
         if anomaly["severity"] == "high":
             # Find the full event context
-            event = next(
-                (e for e in aligned_events 
-                 if any(em["timestamp_ms"] == anomaly["timestamp_ms"] for em in e.get("emotions", []))),
-                None
-            )
+            event_index = anomaly.get("event_index")
+            if event_index is None:
+                if events_by_timestamp is None:
+                    events_by_timestamp = _first_event_by_timestamp(aligned_events)
+                event_index = events_by_timestamp.get(anomaly["timestamp_ms"])
             
-            if event:
-                # Simple interpretation based on emotion type
-                interpretation = f"{anomaly['speaker']} showed {anomaly['emotion']} when saying: '{event['transcript']}'"
-                
-                if anomaly["emotion"] == "Surprise":
-                    interpretation += " - This unexpected emotional response may indicate they were caught off guard or revealed hidden knowledge."
-                elif anomaly["emotion"] == "Fear":
-                    interpretation += " - This fear response suggests anxiety about the topic or potential deception."
-                elif anomaly["emotion"] == "Anxiety":
-                    interpretation += " - This anxiety indicates internal conflict or stress related to their statement."
-                
-                critical_moments.append({
-                    "timestamp_ms": anomaly["timestamp_ms"],
-                    "speaker": anomaly["speaker"],
-                    "emotion": anomaly["emotion"],
-                    "transcript": event["transcript"],
-                    "interpretation": interpretation,
-                    "significance": "high"
-                })
+            if event_index is not None:
+                sources.append((anomaly, event_index, aligned_events[event_index]["transcript"]))
+    
+    if interpreter is None:
+        interpreter = DEFAULT_INTERPRETER
+    moments = [
+        {"speaker": anomaly["speaker"], "emotion": anomaly["emotion"], "transcript": transcript,
+         "event_index": event_index, "context": ""}
+        for anomaly, event_index, transcript in sources
+    ]
+    node_metrics = {}
+    if interpreter.context_builder is not None:
+        contexts, node_metrics["context"] = interpreter.context_builder.build(
+            aligned_events, [moment["event_index"] for moment in moments]
+        )
+        for moment, context in zip(moments, contexts):
+            moment.update(context)
     
-    steps = state.get("steps_completed", [])
-    steps.append("moment_interpretation")
+    # Interpret every moment in one batched request to the interpreter
+    interpretations, node_metrics["interpretation"] = interpreter.interpret(moments)
+    critical_moments = [
+        _critical_moment(anomaly, transcript, interpretation)
+        for (anomaly, _, transcript), interpretation in zip(sources, interpretations)
+    ]
     
     return {
         "critical_moments": critical_moments,
-        "steps_completed": steps
+        "steps_completed": ["moment_interpretation"],
+        "metrics": {"moment_interpretation": node_metrics}
+    }
+
+
+def _speaker_profile(speaker: str, pattern: Dict[str, Any], utterances: int) -> Dict[str, Any]:
+    """Build a speaker profile from the speaker's emotion pattern."""
+    return {
+        "name": speaker,
+        "baseline_emotion": pattern.get("dominantEmotion", "Unknown"),
+        "total_emotion_detections": pattern.get("totalEmotions", 0),
+        "emotion_distribution": pattern.get("emotionCounts", {}),
+        "total_utterances": utterances,
+        "emotional_range": len(pattern.get("emotionCounts", {}))
     }
 
 
@@ -210,32 +365,21 @@ def create_speaker_profiles(state: AgentState) -> Dict[str, Any]:
     - Consistency metrics
     """
     emotion_patterns = state.get("emotion_patterns", {})
-    aligned_events = state.get("aligned_events", [])
     
     speaker_profiles = {}
     
     if "by_speaker" in emotion_patterns:
+        speaker_index = _speaker_index(state)
         for speaker, pattern in emotion_patterns["by_speaker"].items():
-            # Get all transcripts for this speaker
-            speaker_events = [e for e in aligned_events if e["speaker"] == speaker]
+            # Utterances per speaker come from the shared speaker index
+            entry = speaker_index.get(speaker)
+            utterances = len(entry["event_indices"]) if entry else 0
             
-            profile = {
-                "name": speaker,
-                "baseline_emotion": pattern.get("dominantEmotion", "Unknown"),
-                "total_emotion_detections": pattern.get("totalEmotions", 0),
-                "emotion_distribution": pattern.get("emotionCounts", {}),
-                "total_utterances": len(speaker_events),
-                "emotional_range": len(pattern.get("emotionCounts", {}))
-            }
-            
-            speaker_profiles[speaker] = profile
-    
-    steps = state.get("steps_completed", [])
-    steps.append("speaker_profiling")
+            speaker_profiles[speaker] = _speaker_profile(speaker, pattern, utterances)
     
     return {
         "speaker_profiles": speaker_profiles,
-        "steps_completed": steps
+        "steps_completed": ["speaker_profiling"]
     }
 
 
@@ -243,7 +387,9 @@ def synthesize_report(state: AgentState) -> Dict[str, Any]:
     """
     Node 6: Synthesize final interpretation report.
     
-    Combines all analysis into a comprehensive report.
+    Combines all analysis into a comprehensive report. Emotion sequence
+    times are formatted as MM:SS.mmm here, once, rather than for every
+    emotion while indexing.
     """
     critical_moments = state.get("critical_moments", [])
     speaker_profiles = state.get("speaker_profiles", {})
@@ -283,16 +429,13 @@ def synthesize_report(state: AgentState) -> Dict[str, Any]:
         "summary": summary,
         "critical_moments": critical_moments,
         "speaker_profiles": speaker_profiles,
-        "emotion_patterns": emotion_patterns,
+        "emotion_patterns": _report_patterns(emotion_patterns),
         "anomaly_count": len(anomalies),
         "high_severity_anomalies": len([a for a in anomalies if a.get("severity") == "high"])
     }
     
-    steps = state.get("steps_completed", [])
-    steps.append("report_synthesis")
-    
     return {
         "interpretation": interpretation,
         "report": report,
-        "steps_completed": steps
+        "steps_completed": ["report_synthesis"]
     }
@@ -1,6 +1,12 @@
 """Agent state definition for LangGraph."""
 
-from typing import List, Dict, Any, Optional, TypedDict
+import operator
+from typing import Annotated, List, Dict, Any, Mapping, Optional, Sequence, TypedDict
+
+
+def merge_dicts(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """State reducer that merges dict updates from parallel branches."""
+    return {**(left or {}), **(right or {})}
 
 
 class AgentState(TypedDict, total=False):
@@ -10,9 +16,13 @@ class AgentState(TypedDict, total=False):
     session_id: int
     transcription_entries: List[Dict[str, Any]]
     emotion_detections: List[Dict[str, Any]]
+    input_format: str  # "timestamp" (MM:SS.mmm strings, default) or "ms" (integer-ms records)
+    trace_memory: bool  # record per-node peak allocation in metrics
+    speaker_baselines: Dict[str, str]  # historical baseline emotion per speaker, used by anomaly detection
     
     # Alignment results
-    aligned_events: List[Dict[str, Any]]
+    aligned_events: Sequence[Mapping[str, Any]]  # AlignedEvents or a list of event dicts
+    speaker_index: Dict[str, Dict[str, Any]]  # per speaker: event_indices and emotion pattern
     
     # Analysis results
     emotion_patterns: Dict[str, Any]
@@ -26,4 +36,7 @@ class AgentState(TypedDict, total=False):
     
     # Metadata
     error: Optional[str]
-    steps_completed: List[str]
+    # Nodes return only their own entries; reducers combine updates from parallel branches
+    steps_completed: Annotated[List[str], operator.add]
+    node_timings: Annotated[Dict[str, float], merge_dicts]  # wall time per node in ms
+    metrics: Annotated[Dict[str, Dict[str, Any]], merge_dicts]  # per node: times, cardinalities, peak allocation
@@ -1,19 +1,75 @@
 """Initialize alignment package."""
 
 from src.core.alignment.temporal_alignment import (
+    ALIGNMENT_ENGINES,
+    TimestampParseError,
     timestamp_to_ms,
+    parse_timestamps,
+    parse_timestamp_fields,
     ms_to_timestamp,
     align_emotion_with_transcript,
+    align_records,
     find_event_at_time,
     get_emotion_sequence,
     compute_emotion_pattern,
 )
+from src.core.alignment.interval_index import IntervalIndex
+from src.core.alignment.incremental import align_increment, delta_time_range
+from src.core.alignment.multi_window import DEFAULT_WINDOWS_MS, align_multi_window
+from src.core.alignment.columnar import (
+    COLUMNAR_BACKENDS,
+    EmotionColumns,
+    ColumnarAlignment,
+    align_columnar,
+)
+from src.core.alignment.vocabulary import (
+    CANONICAL_EMOTIONS,
+    EMOTION_SYNONYMS,
+    EMOTION_VOCABULARY,
+    EmotionVocabulary,
+    codes_mask,
+)
+from src.core.alignment.compact import AlignedEvents
+from src.core.alignment.streaming import StreamingAligner, stream_align, astream_align
+from src.core.alignment.transitions import (
+    transition_matrices,
+    transition_counts,
+    merge_transition_counts,
+    matrices_from_counts,
+)
 
 __all__ = [
+    "ALIGNMENT_ENGINES",
+    "TimestampParseError",
     "timestamp_to_ms",
+    "parse_timestamps",
+    "parse_timestamp_fields",
     "ms_to_timestamp",
     "align_emotion_with_transcript",
+    "align_records",
     "find_event_at_time",
     "get_emotion_sequence",
     "compute_emotion_pattern",
+    "IntervalIndex",
+    "align_increment",
+    "delta_time_range",
+    "DEFAULT_WINDOWS_MS",
+    "align_multi_window",
+    "COLUMNAR_BACKENDS",
+    "EmotionColumns",
+    "ColumnarAlignment",
+    "align_columnar",
+    "CANONICAL_EMOTIONS",
+    "EMOTION_SYNONYMS",
+    "EMOTION_VOCABULARY",
+    "EmotionVocabulary",
+    "codes_mask",
+    "transition_matrices",
+    "transition_counts",
+    "merge_transition_counts",
+    "matrices_from_counts",
+    "AlignedEvents",
+    "StreamingAligner",
+    "stream_align",
+    "astream_align",
 ]
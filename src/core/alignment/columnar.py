@@ -0,0 +1,261 @@
+"""Columnar alignment backend for bulk re-processing.
+
+Emotion detections are held as parallel columns (int64 timestamps,
+dictionary-encoded emotion codes, float32 confidences) sorted by time, and
+each transcript segment is reduced to a slice of those columns. Per-segment
+statistics are computed over the slices; aligned event dicts are only built
+when asked for.
+
+NumPy is optional. The "numpy" backend finds every slice with
+np.searchsorted; the "python" backend uses the same layout on top of the
+array module and bisect, and is used automatically when NumPy is missing.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Any, Optional, Tuple
+
+from src.core.alignment.temporal_alignment import _field
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when NumPy is not installed
+    np = None
+
+# Backends accepted by align_columnar
+COLUMNAR_BACKENDS = ("auto", "numpy", "python")
+
+
+def _resolve_backend(backend: str) -> str:
+    """Resolve "auto" to a concrete backend and validate the choice."""
+    if backend not in COLUMNAR_BACKENDS:
+        raise ValueError(f"Unknown columnar backend: {backend}. Expected one of {COLUMNAR_BACKENDS}")
+    if backend == "auto":
+        return "numpy" if np is not None else "python"
+    if backend == "numpy" and np is None:
+        raise ImportError("The numpy columnar backend requires NumPy: pip install numpy")
+    return backend
+
+
+class EmotionColumns:
+    """
+    Emotion detections as parallel columns sorted by timestamp.
+
+    Attributes:
+        timestamps: Detection times in milliseconds (int64)
+        codes: Index into labels for each detection
+        confidences: Confidence per detection (float32, NaN when missing)
+        labels: Emotion label for each code, in order of first appearance
+        backend: "numpy" or "python"
+    """
+
+    def __init__(self, timestamps, codes, confidences, labels: List[str], backend: str):
+        self.timestamps = timestamps
+        self.codes = codes
+        self.confidences = confidences
+        self.labels = labels
+        self.backend = backend
+
+    @classmethod
+    def from_records(cls, emotion_records: List[Any], backend: str = "auto") -> "EmotionColumns":
+        """
+        Build columns from emotion records (dicts or rows with timestamp_ms, emotion, confidence).
+
+        Records are sorted by timestamp; ties keep their input order.
+        """
+        backend = _resolve_backend(backend)
+
+        label_codes: Dict[str, int] = {}
+        timestamps = []
+        codes = []
+        confidences = []
+        for record in emotion_records:
+            emotion = _field(record, "emotion")
+            code = label_codes.get(emotion)
+            if code is None:
+                code = label_codes[emotion] = len(label_codes)
+            confidence = _field(record, "confidence", None)
+            timestamps.append(_field(record, "timestamp_ms"))
+            codes.append(code)
+            confidences.append(float("nan") if confidence is None else confidence)
+        labels = list(label_codes)
+
+        if backend == "numpy":
+            timestamps = np.asarray(timestamps, dtype=np.int64)
+            order = np.argsort(timestamps, kind="stable")
+            return cls(
+                timestamps[order],
+                np.asarray(codes, dtype=np.int32)[order],
+                np.asarray(confidences, dtype=np.float32)[order],
+                labels,
+                backend,
+            )
+
+        order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+        return cls(
+            array("q", (timestamps[i] for i in order)),
+            array("i", (codes[i] for i in order)),
+            array("f", (confidences[i] for i in order)),
+            labels,
+            backend,
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def confidence_at(self, index: int) -> Optional[float]:
+        """Return the confidence of one detection, or None when it was missing."""
+        confidence = float(self.confidences[index])
+        return None if confidence != confidence else confidence
+
+
+class ColumnarAlignment:
+    """
+    Alignment result as per-segment slice offsets into EmotionColumns.
+
+    Segment i matches detections emotions[lower[i]:upper[i]], in time order.
+    """
+
+    def __init__(self, transcription_records: List[Any], emotions: EmotionColumns, lower, upper):
+        self.transcription_records = transcription_records
+        self.emotions = emotions
+        self.lower = lower
+        self.upper = upper
+
+    def __len__(self) -> int:
+        return len(self.transcription_records)
+
+    def slice(self, index: int) -> Tuple[int, int]:
+        """Return the (lower, upper) offsets of the detections matching segment index."""
+        return int(self.lower[index]), int(self.upper[index])
+
+    def match_counts(self):
+        """Return the number of matched detections per segment."""
+        if self.emotions.backend == "numpy":
+            return self.upper - self.lower
+        return array("q", (high - low for low, high in zip(self.lower, self.upper)))
+
+    def emotion_code_counts(self, index: int):
+        """Return per-code detection counts for one segment (length len(labels))."""
+        low, high = self.slice(index)
+        size = len(self.emotions.labels)
+        if self.emotions.backend == "numpy":
+            return np.bincount(self.emotions.codes[low:high], minlength=size)
+        counts = [0] * size
+        for code in self.emotions.codes[low:high]:
+            counts[code] += 1
+        return counts
+
+    def emotion_counts(self, index: int) -> Dict[str, int]:
+        """Return {emotion: count} for one segment, in order of first appearance in it."""
+        counts = self.emotion_code_counts(index)
+        low, high = self.slice(index)
+        result = {}
+        for code in self.emotions.codes[low:high]:
+            label = self.emotions.labels[code]
+            if label not in result:
+                result[label] = int(counts[code])
+        return result
+
+    def dominant_emotion(self, index: int) -> Optional[str]:
+        """
+        Return the most frequent emotion of one segment, or None if it has none.
+
+        Ties go to the emotion seen first in the segment, as in compute_emotion_pattern.
+        """
+        low, high = self.slice(index)
+        if low == high:
+            return None
+        counts = self.emotion_code_counts(index)
+        top = max(counts)
+        for code in self.emotions.codes[low:high]:
+            if counts[code] == top:
+                return self.emotions.labels[code]
+
+    def count_matrix(self):
+        """
+        Return a (segments x labels) matrix of detection counts.
+
+        With NumPy this is one bincount over segment-major codes; the python
+        backend returns a list of lists.
+        """
+        size = len(self.emotions.labels)
+        if self.emotions.backend == "numpy":
+            lengths = self.upper - self.lower
+            segment_ids = np.repeat(np.arange(len(self), dtype=np.int64), lengths)
+            # Position of every matched detection: running index shifted to each slice start
+            shifts = np.repeat(self.lower - (np.cumsum(lengths) - lengths), lengths)
+            positions = np.arange(int(lengths.sum()), dtype=np.int64) + shifts
+            flat = segment_ids * size + self.emotions.codes[positions]
+            return np.bincount(flat, minlength=len(self) * size).reshape(len(self), size)
+        return [self.emotion_code_counts(i) for i in range(len(self))]
+
+    def event(self, index: int) -> Dict[str, Any]:
+        """Build the aligned event dict for one segment, in the align_records format."""
+        record = self.transcription_records[index]
+        low, high = self.slice(index)
+        emotions = self.emotions
+        return {
+            "start_time_ms": _field(record, "start_time_ms"),
+            "end_time_ms": _field(record, "end_time_ms"),
+            "speaker": _field(record, "speaker"),
+            "transcript": _field(record, "transcript"),
+            "emotions": [
+                {
+                    "timestamp_ms": int(emotions.timestamps[i]),
+                    "emotion": emotions.labels[emotions.codes[i]],
+                    "confidence": emotions.confidence_at(i)
+                }
+                for i in range(low, high)
+            ]
+        }
+
+    def to_aligned_events(self) -> List[Dict[str, Any]]:
+        """Build aligned event dicts for every segment."""
+        return [self.event(i) for i in range(len(self))]
+
+
+def align_columnar(
+    transcription_records: List[Any],
+    emotion_records: List[Any],
+    window_ms: int = 100,
+    backend: str = "auto"
+) -> ColumnarAlignment:
+    """
+    Align integer-millisecond records into a columnar result.
+
+    Matching follows align_records: a detection belongs to every segment
+    whose [start - window_ms, end + window_ms] range contains it. Matched
+    detections are reported in time order, and confidences have float32
+    precision.
+
+    Args:
+        transcription_records: Records with start_time_ms, end_time_ms, speaker, transcript
+        emotion_records: Records with timestamp_ms, emotion, confidence, or prebuilt EmotionColumns
+        window_ms: Tolerance window in milliseconds for matching (default: 100)
+        backend: One of COLUMNAR_BACKENDS; "auto" uses NumPy when it is installed
+
+    Returns:
+        ColumnarAlignment with per-segment slice offsets
+    """
+    if isinstance(emotion_records, EmotionColumns):
+        emotions = emotion_records
+    else:
+        emotions = EmotionColumns.from_records(emotion_records, backend)
+
+    starts = [_field(record, "start_time_ms") for record in transcription_records]
+    ends = [_field(record, "end_time_ms") for record in transcription_records]
+
+    if emotions.backend == "numpy":
+        lower = np.searchsorted(emotions.timestamps, np.asarray(starts, dtype=np.int64) - window_ms, side="left")
+        upper = np.searchsorted(emotions.timestamps, np.asarray(ends, dtype=np.int64) + window_ms, side="right")
+        # Segments that end before they start match nothing
+        upper = np.maximum(lower, upper)
+    else:
+        timestamps = emotions.timestamps
+        lower = array("q", (bisect_left(timestamps, start - window_ms) for start in starts))
+        upper = array("q", (
+            max(low, bisect_right(timestamps, end + window_ms)) for low, end in zip(lower, ends)
+        ))
+
+    return ColumnarAlignment(transcription_records, emotions, lower, upper)
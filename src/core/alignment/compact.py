@@ -0,0 +1,393 @@
+"""Compact array-backed container for aligned events."""
+
+import json
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import List, Dict, Any, Optional
+
+from src.core.alignment.temporal_alignment import (
+    _field,
+    _sweep_matches,
+    ms_to_timestamp,
+    parse_timestamp_fields,
+    parse_timestamps,
+)
+from src.core.alignment.vocabulary import EMOTION_VOCABULARY, EmotionVocabulary
+
+_EVENT_KEYS = ("start_time_ms", "end_time_ms", "speaker", "transcript", "emotions")
+_ARRAY_COLUMNS = (
+    "start_times", "end_times", "speaker_codes", "emotion_offsets", "emotion_times", "emotion_codes", "confidences",
+)
+_EMOTION_KEYS = ("timestamp_ms", "timestamp", "emotion", "confidence")
+
+
+class AlignedEvents(Sequence):
+    """
+    Aligned events stored as columns instead of one dict per event and emotion.
+
+    Segment fields live in parallel arrays; the matched emotions of all
+    segments live in one set of emotion columns, and segment i owns the
+    emotion rows emotion_offsets[i]:emotion_offsets[i + 1]. Speakers and
+    emotion labels are dictionary-encoded, with labels normalized through
+    the emotion vocabulary. The "MM:SS.mmm" timestamp string is not stored;
+    it is formatted from timestamp_ms when read.
+
+    Indexing returns read-only dict-compatible views, so code written for
+    lists of aligned event dicts (event["speaker"], event.get("emotions"),
+    emotion["timestamp_ms"], ...) keeps working. Use to_list() to get plain
+    dicts, e.g. for JSON.
+    """
+
+    __slots__ = (
+        "start_times", "end_times", "speaker_codes", "speakers", "transcripts",
+        "emotion_offsets", "emotion_times", "emotion_codes", "confidences", "labels",
+    )
+
+    def __init__(self):
+        self.start_times = array("q")
+        self.end_times = array("q")
+        self.speaker_codes = array("i")
+        self.speakers: List[str] = []
+        self.transcripts: List[str] = []
+        self.emotion_offsets = array("q", [0])
+        self.emotion_times = array("q")
+        self.emotion_codes = array("i")
+        self.confidences = array("d")  # NaN when missing
+        self.labels: List[str] = []
+
+    @classmethod
+    def from_events(cls, events: List[Any]) -> "AlignedEvents":
+        """Build the container from aligned event dicts (or views)."""
+        container = cls()
+        speaker_codes: Dict[str, int] = {}
+        label_codes: Dict[str, int] = {}
+        for event in events:
+            container._append_segment(
+                event["start_time_ms"], event["end_time_ms"], event["speaker"], event["transcript"], speaker_codes
+            )
+            for emotion in event["emotions"]:
+                container._append_emotion(
+                    emotion["timestamp_ms"], emotion["emotion"], emotion.get("confidence"), label_codes
+                )
+            container.emotion_offsets.append(len(container.emotion_times))
+        return container
+
+    @classmethod
+    def from_records(
+        cls,
+        transcription_records: List[Any],
+        emotion_records: List[Any],
+        window_ms: int = 100
+    ) -> "AlignedEvents":
+        """
+        Align integer-millisecond records straight into the container.
+
+        Matching is identical to align_records; no per-event dicts are built.
+        """
+        segments = [
+            (_field(record, "start_time_ms"), _field(record, "end_time_ms"))
+            for record in transcription_records
+        ]
+        detection_times = [_field(record, "timestamp_ms") for record in emotion_records]
+        return cls._from_matches(
+            segments,
+            [_field(record, "speaker") for record in transcription_records],
+            [_field(record, "transcript") for record in transcription_records],
+            detection_times,
+            [_field(record, "emotion") for record in emotion_records],
+            [_field(record, "confidence", None) for record in emotion_records],
+            window_ms,
+        )
+
+    @classmethod
+    def from_entries(
+        cls,
+        transcription_entries: List[Dict[str, Any]],
+        emotion_detections: List[Dict[str, Any]],
+        window_ms: int = 100
+    ) -> "AlignedEvents":
+        """
+        Align timestamp-string input straight into the container.
+
+        Matching is identical to align_emotion_with_transcript.
+        """
+        if not transcription_entries:
+            return cls()
+        bounds = parse_timestamp_fields(transcription_entries, ("startTime", "endTime"))
+        return cls._from_matches(
+            list(zip(bounds["startTime"], bounds["endTime"])),
+            [entry["speaker"] for entry in transcription_entries],
+            [entry["transcript"] for entry in transcription_entries],
+            parse_timestamps([d["timestamp"] for d in emotion_detections], field="timestamp"),
+            [d["emotion"] for d in emotion_detections],
+            [d.get("confidence") for d in emotion_detections],
+            window_ms,
+        )
+
+    @classmethod
+    def _from_matches(cls, segments, speakers, transcripts, detection_times, emotions, confidences, window_ms):
+        """Fill the columns from the sweep-line matches of each segment."""
+        container = cls()
+        speaker_codes: Dict[str, int] = {}
+        label_codes: Dict[str, int] = {}
+        matches = _sweep_matches(segments, detection_times, window_ms)
+        for (start_time_ms, end_time_ms), speaker, transcript, matched in zip(
+            segments, speakers, transcripts, matches
+        ):
+            container._append_segment(start_time_ms, end_time_ms, speaker, transcript, speaker_codes)
+            for i in matched:
+                container._append_emotion(detection_times[i], emotions[i], confidences[i], label_codes)
+            container.emotion_offsets.append(len(container.emotion_times))
+        return container
+
+    def extend(self, other: "AlignedEvents"):
+        """
+        Append the events of another container, in place.
+
+        Speakers and labels new to this container are encoded after its
+        own, in order of first appearance, so concatenating the containers
+        of consecutive segment runs gives the container of the whole run.
+        """
+        speaker_codes = {speaker: code for code, speaker in enumerate(self.speakers)}
+        label_codes = {label: code for code, label in enumerate(self.labels)}
+        speaker_map = []
+        for speaker in other.speakers:
+            if speaker not in speaker_codes:
+                speaker_codes[speaker] = len(self.speakers)
+                self.speakers.append(speaker)
+            speaker_map.append(speaker_codes[speaker])
+        label_map = []
+        for label in other.labels:
+            if label not in label_codes:
+                label_codes[label] = len(self.labels)
+                self.labels.append(label)
+            label_map.append(label_codes[label])
+
+        base = self.emotion_offsets[-1]
+        self.start_times.extend(other.start_times)
+        self.end_times.extend(other.end_times)
+        self.speaker_codes.extend(speaker_map[code] for code in other.speaker_codes)
+        self.transcripts.extend(other.transcripts)
+        self.emotion_offsets.extend(base + offset for offset in other.emotion_offsets[1:])
+        self.emotion_times.extend(other.emotion_times)
+        self.emotion_codes.extend(label_map[code] for code in other.emotion_codes)
+        self.confidences.extend(other.confidences)
+
+    def _append_segment(self, start_time_ms, end_time_ms, speaker, transcript, speaker_codes):
+        code = speaker_codes.get(speaker)
+        if code is None:
+            code = speaker_codes[speaker] = len(self.speakers)
+            self.speakers.append(speaker)
+        self.start_times.append(start_time_ms)
+        self.end_times.append(end_time_ms)
+        self.speaker_codes.append(code)
+        self.transcripts.append(transcript)
+
+    def _append_emotion(self, timestamp_ms, emotion, confidence, label_codes):
+        # label_codes maps raw spellings and normalized labels alike, so every
+        # variant of a label shares the code of its normalized form
+        code = label_codes.get(emotion)
+        if code is None:
+            label = EMOTION_VOCABULARY.normalize(emotion)
+            code = label_codes.get(label)
+            if code is None:
+                code = label_codes[label] = len(self.labels)
+                self.labels.append(label)
+            label_codes[emotion] = code
+        self.emotion_times.append(timestamp_ms)
+        self.emotion_codes.append(code)
+        self.confidences.append(float("nan") if confidence is None else confidence)
+
+    def __len__(self) -> int:
+        return len(self.start_times)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [AlignedEventView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("aligned event index out of range")
+        return AlignedEventView(self, index)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"AlignedEvents({len(self)} events, {len(self.emotion_times)} emotions)"
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the columns, e.g. for checkpoints or other processes.
+
+        The layout is a JSON header (string columns, array type codes and
+        lengths) followed by the raw array buffers in native byte order.
+        """
+        header = json.dumps({
+            "speakers": self.speakers,
+            "transcripts": self.transcripts,
+            "labels": self.labels,
+            "arrays": [[name, getattr(self, name).typecode, len(getattr(self, name))] for name in _ARRAY_COLUMNS],
+        }).encode()
+        buffers = b"".join(getattr(self, name).tobytes() for name in _ARRAY_COLUMNS)
+        return len(header).to_bytes(8, "little") + header + buffers
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "AlignedEvents":
+        """Rebuild a container serialized by to_bytes."""
+        header_size = int.from_bytes(data[:8], "little")
+        header = json.loads(data[8:8 + header_size])
+        container = cls()
+        container.speakers = header["speakers"]
+        container.transcripts = header["transcripts"]
+        container.labels = header["labels"]
+        position = 8 + header_size
+        for name, typecode, length in header["arrays"]:
+            column = array(typecode)
+            size = length * column.itemsize
+            column.frombytes(data[position:position + size])
+            position += size
+            setattr(container, name, column)
+        return container
+
+    def vocabulary(self) -> EmotionVocabulary:
+        """
+        Return a local vocabulary covering the container's labels.
+
+        Canonical labels keep their EMOTION_VOCABULARY codes; the others are
+        numbered after them in order of first appearance, so the codes only
+        depend on the container's own events.
+        """
+        return EMOTION_VOCABULARY.local(self.labels)
+
+    def vocabulary_codes(self, vocabulary: Optional[EmotionVocabulary] = None) -> array:
+        """
+        Return the vocabulary code of every matched emotion.
+
+        Event i owns codes emotion_offsets[i]:emotion_offsets[i + 1]. The
+        codes are those of vocabulary, by default of self.vocabulary().
+        """
+        if vocabulary is None:
+            vocabulary = self.vocabulary()
+        translation = [vocabulary.code(label) for label in self.labels]
+        return array("i", (translation[code] for code in self.emotion_codes))
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Materialize every event as a plain dict with plain emotion dicts."""
+        return [view.to_dict() for view in self]
+
+
+class AlignedEventView(Mapping):
+    """Read-only dict view of one event in an AlignedEvents container."""
+
+    __slots__ = ("_events", "_index")
+
+    def __init__(self, events: AlignedEvents, index: int):
+        self._events = events
+        self._index = index
+
+    def __getitem__(self, key):
+        events = self._events
+        index = self._index
+        if key == "emotions":
+            return EmotionsView(events, events.emotion_offsets[index], events.emotion_offsets[index + 1])
+        if key == "speaker":
+            return events.speakers[events.speaker_codes[index]]
+        if key == "start_time_ms":
+            return events.start_times[index]
+        if key == "end_time_ms":
+            return events.end_times[index]
+        if key == "transcript":
+            return events.transcripts[index]
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return key in _EVENT_KEYS
+
+    def __iter__(self):
+        return iter(_EVENT_KEYS)
+
+    def __len__(self) -> int:
+        return len(_EVENT_KEYS)
+
+    def __repr__(self) -> str:
+        return f"AlignedEventView({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the event as a plain dict."""
+        event = dict(self)
+        event["emotions"] = [dict(emotion) for emotion in event["emotions"]]
+        return event
+
+
+class EmotionsView(Sequence):
+    """Read-only list view of the emotions matched to one event."""
+
+    __slots__ = ("_events", "_start", "_stop")
+
+    def __init__(self, events: AlignedEvents, start: int, stop: int):
+        self._events = events
+        self._start = start
+        self._stop = stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [EmotionView(self._events, self._start + i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("emotion index out of range")
+        return EmotionView(self._events, self._start + index)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr([dict(emotion) for emotion in self])
+
+
+class EmotionView(Mapping):
+    """Read-only dict view of one matched emotion."""
+
+    __slots__ = ("_events", "_position")
+
+    def __init__(self, events: AlignedEvents, position: int):
+        self._events = events
+        self._position = position
+
+    def __getitem__(self, key):
+        events = self._events
+        position = self._position
+        if key == "emotion":
+            return events.labels[events.emotion_codes[position]]
+        if key == "timestamp_ms":
+            return events.emotion_times[position]
+        if key == "confidence":
+            confidence = events.confidences[position]
+            return None if confidence != confidence else confidence
+        if key == "timestamp":
+            return ms_to_timestamp(events.emotion_times[position])
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return key in _EMOTION_KEYS
+
+    def __iter__(self):
+        return iter(_EMOTION_KEYS)
+
+    def __len__(self) -> int:
+        return len(_EMOTION_KEYS)
+
+    def __repr__(self) -> str:
+        return f"EmotionView({dict(self)!r})"
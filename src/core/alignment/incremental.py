@@ -0,0 +1,88 @@
+"""Incremental alignment of data appended since the last alignment."""
+
+from typing import List, Dict, Any, Optional, Tuple
+
+from src.core.alignment.temporal_alignment import _field, _sweep_matches, align_records
+
+
+def delta_time_range(
+    new_transcription_records: List[Any],
+    new_emotion_records: List[Any],
+    window_ms: int
+) -> Optional[Tuple[int, int]]:
+    """
+    Return the (from_ms, to_ms) range that appended records can affect.
+
+    Existing aligned events outside this range cannot gain a detection, and
+    detections outside it cannot match a new transcript segment.
+
+    Returns:
+        The widened range, or None when there is nothing new
+    """
+    times = [_field(record, "timestamp_ms") for record in new_emotion_records]
+    for record in new_transcription_records:
+        times.append(_field(record, "start_time_ms"))
+        times.append(_field(record, "end_time_ms"))
+    if not times:
+        return None
+    return min(times) - window_ms, max(times) + window_ms
+
+
+def align_increment(
+    existing_events: List[Any],
+    new_transcription_records: List[Any],
+    new_emotion_records: List[Any],
+    context_emotion_records: List[Any],
+    window_ms: int = 100
+) -> Tuple[List[Tuple[Any, List[Dict[str, Any]]]], List[Dict[str, Any]]]:
+    """
+    Align only what was appended since the last alignment.
+
+    Existing events gain the new detections that fall in their window; new
+    transcript segments are aligned against every detection around them.
+    The result equals a full re-alignment of all records (with detections in
+    timestamp order), but the work is proportional to the appended data and
+    the events it touches.
+
+    Args:
+        existing_events: Previously aligned events (dicts or AlignedEvent rows)
+            that may overlap the delta, e.g. selected by delta_time_range
+        new_transcription_records: Transcription records added since the last alignment
+        new_emotion_records: Emotion records added since the last alignment
+        context_emotion_records: All emotion records (old and new) within the
+            delta range, in timestamp order, used to align the new segments
+        window_ms: Tolerance window in milliseconds; must match the window
+            used for existing_events
+
+    Returns:
+        (updates, new_events): updates pairs each existing event that gained
+        detections with its full new emotions list; new_events are aligned
+        events for the new transcription records, in input order
+    """
+    updates = []
+    if existing_events and new_emotion_records:
+        segments = [
+            (_field(event, "start_time_ms"), _field(event, "end_time_ms"))
+            for event in existing_events
+        ]
+        added = [
+            {
+                "timestamp_ms": _field(record, "timestamp_ms"),
+                "emotion": _field(record, "emotion"),
+                "confidence": _field(record, "confidence", None)
+            }
+            for record in new_emotion_records
+        ]
+        detection_times = [emotion["timestamp_ms"] for emotion in added]
+
+        for event, matched in zip(existing_events, _sweep_matches(segments, detection_times, window_ms)):
+            if not matched:
+                continue
+            # Stable sort: earlier detections keep their place ahead of new ones at equal times
+            emotions = list(_field(event, "emotions")) + [dict(added[i]) for i in matched]
+            emotions.sort(key=lambda emotion: emotion["timestamp_ms"])
+            updates.append((event, emotions))
+
+    new_events = align_records(new_transcription_records, context_emotion_records, window_ms)
+
+    return updates, new_events
@@ -0,0 +1,110 @@
+"""Interval index for time-point and time-range lookups over aligned events."""
+
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional
+
+
+class IntervalIndex:
+    """
+    Static interval index over aligned events.
+
+    Events are sorted by start time and form an implicit balanced search
+    tree: the node of the index range [lo, hi) is its middle event, with
+    the middle's left and right halves as children. Every node is
+    augmented with the latest end time in its subtree. A lookup binary
+    searches the last event starting in range, then walks the tree in
+    order and skips every subtree whose latest end is before the range.
+    Each visited subtree either holds a match or lies on the search path,
+    so a lookup with k matches costs O((k + 1) log n). A single long
+    segment is one match; it does not make the events after it candidates.
+
+    All queries return every matching event, so overlapping segments are
+    never hidden behind the first match. Results are in start order, with
+    ties kept in input order.
+    """
+
+    def __init__(
+        self,
+        events: List[Dict[str, Any]],
+        start_key: str = "start_time_ms",
+        end_key: str = "end_time_ms"
+    ):
+        """
+        Build the index.
+
+        Args:
+            events: Aligned events (dicts with start and end times in milliseconds)
+            start_key: Key of the start time in each event
+            end_key: Key of the end time in each event
+        """
+        self.events = sorted(events, key=lambda event: event[start_key])
+        self.starts = [event[start_key] for event in self.events]
+        self.ends = [event[end_key] for event in self.events]
+
+        # Latest end time in the subtree of each node
+        self.subtree_max_ends = list(self.ends)
+        if self.events:
+            self._build(0, len(self.events))
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def _build(self, lo: int, hi: int):
+        """Fill in the latest end times of the subtree of [lo, hi) and return its own."""
+        mid = (lo + hi) // 2
+        latest = self.ends[mid]
+        if lo < mid:
+            latest = max(latest, self._build(lo, mid))
+        if mid + 1 < hi:
+            latest = max(latest, self._build(mid + 1, hi))
+        self.subtree_max_ends[mid] = latest
+        return latest
+
+    def _collect(self, lo: int, hi: int, from_ms: int, high: int, matches: List[Dict[str, Any]]):
+        """Append the events of [lo, hi) before index high that end at or after from_ms, in order."""
+        if lo >= hi or lo >= high:
+            return
+        mid = (lo + hi) // 2
+        if self.subtree_max_ends[mid] < from_ms:
+            return
+        self._collect(lo, mid, from_ms, high, matches)
+        if mid < high and self.ends[mid] >= from_ms:
+            matches.append(self.events[mid])
+        self._collect(mid + 1, hi, from_ms, high, matches)
+
+    def at(self, time_ms: int) -> List[Dict[str, Any]]:
+        """
+        Return every event whose [start, end] contains time_ms.
+
+        Args:
+            time_ms: Query time in milliseconds
+
+        Returns:
+            Matching events in start order
+        """
+        return self.overlapping(time_ms, time_ms)
+
+    def first_at(self, time_ms: int) -> Optional[Dict[str, Any]]:
+        """Return the earliest-starting event containing time_ms, or None."""
+        matches = self.at(time_ms)
+        return matches[0] if matches else None
+
+    def overlapping(self, from_ms: int, to_ms: int) -> List[Dict[str, Any]]:
+        """
+        Return every event that overlaps the closed range [from_ms, to_ms].
+
+        Args:
+            from_ms: Range start in milliseconds
+            to_ms: Range end in milliseconds
+
+        Returns:
+            Matching events in start order
+        """
+        if from_ms > to_ms:
+            raise ValueError(f"Invalid range: from {from_ms} is after to {to_ms}")
+
+        # Events from `high` on start after to_ms
+        high = bisect_right(self.starts, to_ms)
+        matches = []
+        self._collect(0, len(self.events), from_ms, high, matches)
+        return matches
@@ -0,0 +1,136 @@
+"""Alignment for several tolerance windows in a single sorted pass."""
+
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Any
+
+from src.core.alignment.temporal_alignment import _field
+
+# Windows compared when none are given
+DEFAULT_WINDOWS_MS = (0, 50, 100, 250, 500)
+
+
+def align_multi_window(
+    transcription_records: List[Any],
+    emotion_records: List[Any],
+    windows_ms: List[int] = DEFAULT_WINDOWS_MS,
+    include_events: bool = True
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Align integer-millisecond records for several tolerance windows at once.
+
+    Detections are sorted once and segments are visited once. A wider window
+    only adds detections on either side of a narrower one's match range, so
+    each window's bounds are found by binary search starting from the
+    previous window's bounds, and its matches are the previous matches plus
+    those extra detections. Emotion dicts are built once per detection and
+    shared by every window's events, and a window that adds nothing to a
+    segment shares the narrower window's emotions list.
+
+    For every window the aligned events equal align_records(..., window_ms).
+
+    Args:
+        transcription_records: Records with start_time_ms, end_time_ms, speaker, transcript
+        emotion_records: Records with timestamp_ms, emotion, confidence
+        windows_ms: Tolerance windows in milliseconds
+        include_events: Build aligned events; False returns only the statistics
+
+    Returns:
+        {window_ms: result} in ascending window order, where result holds:
+        - match_count: (segment, detection) matches
+        - matched_segments: segments with at least one detection
+        - unmatched_detections: detections outside every segment's window
+        - aligned_events: the aligned events (only with include_events)
+    """
+    windows = sorted(set(windows_ms))
+    if any(window < 0 for window in windows):
+        raise ValueError("Alignment windows must not be negative")
+
+    detection_times = [_field(record, "timestamp_ms") for record in emotion_records]
+    order = sorted(range(len(detection_times)), key=detection_times.__getitem__)
+    sorted_times = [detection_times[i] for i in order]
+    presorted = all(i == position for position, i in enumerate(order))
+    total = len(sorted_times)
+
+    emotion_dicts: Dict[int, Dict[str, Any]] = {}
+
+    def emotion_dict(detection_index: int) -> Dict[str, Any]:
+        emotion = emotion_dicts.get(detection_index)
+        if emotion is None:
+            record = emotion_records[detection_index]
+            emotion = emotion_dicts[detection_index] = {
+                "timestamp_ms": detection_times[detection_index],
+                "emotion": _field(record, "emotion"),
+                "confidence": _field(record, "confidence", None)
+            }
+        return emotion
+
+    results = {
+        window: {
+            "match_count": 0,
+            "matched_segments": 0,
+            "unmatched_detections": 0,
+            "aligned_events": [None] * len(transcription_records) if include_events else None
+        }
+        for window in windows
+    }
+    # Highest sorted detection index covered so far, per window, for the union of match ranges
+    covered_upto = {window: 0 for window in windows}
+    covered = {window: 0 for window in windows}
+
+    segments = [
+        (_field(record, "start_time_ms"), _field(record, "end_time_ms"))
+        for record in transcription_records
+    ]
+
+    for segment_index in sorted(range(len(segments)), key=lambda i: segments[i][0]):
+        start_time_ms, end_time_ms = segments[segment_index]
+        record = transcription_records[segment_index]
+        speaker = _field(record, "speaker")
+        transcript = _field(record, "transcript")
+
+        # Widening only moves the raw bounds outwards, so each search starts
+        # from the previous window's bound
+        low = total
+        raw_high = 0
+        previous_low = previous_high = 0
+        matched: List[int] = []
+        emotions: List[Dict[str, Any]] = []
+        for window in windows:
+            low = bisect_left(sorted_times, start_time_ms - window, 0, low)
+            raw_high = bisect_right(sorted_times, end_time_ms + window, raw_high, total)
+            # Segments that end before they start can have an empty range
+            high = max(low, raw_high)
+            unchanged = low == previous_low and high == previous_high
+            if unchanged:
+                pass
+            elif previous_low == previous_high:
+                matched = order[low:high]
+            else:
+                matched = order[low:previous_low] + matched + order[previous_high:high]
+            previous_low, previous_high = low, high
+
+            result = results[window]
+            result["match_count"] += high - low
+            if high > low:
+                result["matched_segments"] += 1
+                # Segments are visited in start order, so `low` never decreases
+                covered[window] += max(0, high - max(low, covered_upto[window]))
+                covered_upto[window] = max(covered_upto[window], high)
+
+            if include_events:
+                if not unchanged or window == windows[0]:
+                    indices = matched if presorted else sorted(matched)
+                    emotions = [emotion_dict(i) for i in indices]
+                # Windows that add nothing for this segment share its emotions list
+                result["aligned_events"][segment_index] = {
+                    "start_time_ms": start_time_ms,
+                    "end_time_ms": end_time_ms,
+                    "speaker": speaker,
+                    "transcript": transcript,
+                    "emotions": emotions
+                }
+
+    for window in windows:
+        results[window]["unmatched_detections"] = total - covered[window]
+
+    return results
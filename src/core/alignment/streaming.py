@@ -0,0 +1,302 @@
+"""Streaming alignment of live transcription and emotion feeds."""
+
+import asyncio
+import heapq
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Any, Iterable, Iterator, AsyncIterable, AsyncIterator, Union
+
+from src.core.alignment.temporal_alignment import _field
+
+_NEVER = float("-inf")
+
+
+class StreamingAligner:
+    """
+    Push-based aligner that emits events once they can no longer change.
+
+    Segments and detections may arrive in any order, but at most
+    allowed_lateness_ms behind the latest time seen on their own feed. The
+    detection watermark is the latest detection time minus that lateness:
+    no on-time detection can arrive before it, so a segment whose window
+    [start - window_ms, end + window_ms] ends before the watermark is final.
+
+    Pending segments collect matching detections as they arrive, and new
+    segments are matched against a time-sorted buffer of recent detections.
+    Detections are evicted once they are older than the segment watermark
+    minus window_ms, so the buffer only spans the lateness and window, not
+    the session. max_buffer caps both buffers for feeds that stall: beyond
+    it, the oldest detections are dropped and the earliest-closing segments
+    are finalized early (both counted in stats).
+
+    Finalized events use the align_records format, with matched emotions in
+    arrival order. With on-time data every event equals align_records over
+    the detections in arrival order.
+    """
+
+    def __init__(self, window_ms: int = 100, allowed_lateness_ms: int = 1000, max_buffer: int = 10000):
+        """
+        Create the aligner.
+
+        Args:
+            window_ms: Tolerance window in milliseconds for matching
+            allowed_lateness_ms: How far behind its feed's latest time a record may arrive
+            max_buffer: Maximum number of buffered detections and of pending segments
+        """
+        if window_ms < 0 or allowed_lateness_ms < 0:
+            raise ValueError("window_ms and allowed_lateness_ms must not be negative")
+        if max_buffer < 1:
+            raise ValueError("max_buffer must be at least 1")
+        self.window_ms = window_ms
+        self.allowed_lateness_ms = allowed_lateness_ms
+        self.max_buffer = max_buffer
+
+        self._latest_detection = _NEVER
+        self._latest_segment_start = _NEVER
+        self._sequence = 0
+
+        # Detection buffer sorted by time: parallel time and (sequence, emotion) lists
+        self._times: List[int] = []
+        self._detections: List[tuple] = []
+
+        # Pending segments: heap of (close time, sequence) plus their state by sequence
+        self._closing: List[tuple] = []
+        self._pending: Dict[int, Dict[str, Any]] = {}
+
+        self.stats = {
+            "segments": 0,
+            "detections": 0,
+            "emitted": 0,
+            "late_segments": 0,
+            "late_detections": 0,
+            "dropped_detections": 0,
+            "forced_segments": 0,
+        }
+
+    @property
+    def watermark(self) -> float:
+        """Time before which no more on-time detections can arrive."""
+        return self._latest_detection - self.allowed_lateness_ms
+
+    @property
+    def pending_segments(self) -> int:
+        return len(self._pending)
+
+    @property
+    def buffered_detections(self) -> int:
+        return len(self._times)
+
+    def add_segment(self, record: Any) -> List[Dict[str, Any]]:
+        """
+        Add one transcription record (start_time_ms, end_time_ms, speaker, transcript).
+
+        Returns:
+            Events finalized by this call
+        """
+        start_time_ms = _field(record, "start_time_ms")
+        end_time_ms = _field(record, "end_time_ms")
+        self.stats["segments"] += 1
+        if start_time_ms < self._latest_segment_start - self.allowed_lateness_ms:
+            # Detections it needed may already be evicted
+            self.stats["late_segments"] += 1
+        self._latest_segment_start = max(self._latest_segment_start, start_time_ms)
+
+        low = bisect_left(self._times, start_time_ms - self.window_ms)
+        high = bisect_right(self._times, end_time_ms + self.window_ms)
+
+        sequence = self._next_sequence()
+        self._pending[sequence] = {
+            "event": {
+                "start_time_ms": start_time_ms,
+                "end_time_ms": end_time_ms,
+                "speaker": _field(record, "speaker"),
+                "transcript": _field(record, "transcript"),
+            },
+            "matched": self._detections[low:high],
+        }
+        heapq.heappush(self._closing, (end_time_ms + self.window_ms, sequence))
+
+        self._evict_detections()
+        finalized = self._finalize_closed()
+        while len(self._pending) > self.max_buffer:
+            self.stats["forced_segments"] += 1
+            finalized.append(self._finalize_next())
+        return finalized
+
+    def add_detection(self, record: Any) -> List[Dict[str, Any]]:
+        """
+        Add one emotion record (timestamp_ms, emotion, confidence).
+
+        Returns:
+            Events finalized by this call
+        """
+        timestamp_ms = _field(record, "timestamp_ms")
+        self.stats["detections"] += 1
+        if timestamp_ms < self.watermark:
+            # Segments that already closed will not see it
+            self.stats["late_detections"] += 1
+
+        entry = (self._next_sequence(), {
+            "timestamp_ms": timestamp_ms,
+            "emotion": _field(record, "emotion"),
+            "confidence": _field(record, "confidence", None)
+        })
+        for pending in self._pending.values():
+            event = pending["event"]
+            if event["start_time_ms"] - self.window_ms <= timestamp_ms <= event["end_time_ms"] + self.window_ms:
+                pending["matched"].append(entry)
+
+        position = bisect_right(self._times, timestamp_ms)
+        self._times.insert(position, timestamp_ms)
+        self._detections.insert(position, entry)
+
+        return self.advance(timestamp_ms)
+
+    def advance(self, time_ms: int) -> List[Dict[str, Any]]:
+        """
+        Mark the detection feed as complete up to time_ms (minus the allowed lateness).
+
+        Detection calls advance automatically; call it directly as a
+        heartbeat while the detector is idle so segments still close.
+
+        Returns:
+            Events finalized by this call
+        """
+        self._latest_detection = max(self._latest_detection, time_ms)
+        self._evict_detections()
+        return self._finalize_closed()
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Finalize every pending segment, e.g. when both feeds have ended."""
+        finalized = []
+        while self._closing:
+            finalized.append(self._finalize_next())
+        return finalized
+
+    def _next_sequence(self) -> int:
+        self._sequence += 1
+        return self._sequence
+
+    def _evict_detections(self):
+        """Drop detections that neither a pending nor an on-time future segment can match."""
+        horizon = self._latest_segment_start - self.allowed_lateness_ms - self.window_ms
+        count = bisect_left(self._times, horizon) if horizon != _NEVER else 0
+        overflow = len(self._times) - self.max_buffer
+        if overflow > count:
+            self.stats["dropped_detections"] += overflow - count
+            count = overflow
+        if count > 0:
+            del self._times[:count]
+            del self._detections[:count]
+
+    def _finalize_closed(self) -> List[Dict[str, Any]]:
+        finalized = []
+        watermark = self.watermark
+        while self._closing and self._closing[0][0] < watermark:
+            finalized.append(self._finalize_next())
+        return finalized
+
+    def _finalize_next(self) -> Dict[str, Any]:
+        _, sequence = heapq.heappop(self._closing)
+        pending = self._pending.pop(sequence)
+        event = pending["event"]
+        event["emotions"] = [dict(emotion) for _, emotion in sorted(pending["matched"], key=lambda entry: entry[0])]
+        self.stats["emitted"] += 1
+        return event
+
+
+def stream_align(
+    transcription_records: Iterable[Any],
+    emotion_records: Iterable[Any],
+    window_ms: int = 100,
+    allowed_lateness_ms: int = 1000,
+    max_buffer: int = 10000
+) -> Iterator[Dict[str, Any]]:
+    """
+    Align two synchronous feeds, yielding each event as soon as it is final.
+
+    The feeds are merged by time: whichever feed's next record is earlier
+    (segment start vs detection time) is consumed first, which keeps the
+    buffers small when one feed runs ahead of the other.
+
+    Args:
+        transcription_records: Iterable of transcription records
+        emotion_records: Iterable of emotion records
+        window_ms: Tolerance window in milliseconds for matching
+        allowed_lateness_ms: How far out of order records may arrive
+        max_buffer: Maximum number of buffered detections and of pending segments
+
+    Yields:
+        Aligned events in the align_records format, in order of finalization
+    """
+    aligner = StreamingAligner(window_ms, allowed_lateness_ms, max_buffer)
+    segments = iter(transcription_records)
+    detections = iter(emotion_records)
+    segment = next(segments, None)
+    detection = next(detections, None)
+
+    while segment is not None or detection is not None:
+        if detection is None or (
+            segment is not None and _field(segment, "start_time_ms") < _field(detection, "timestamp_ms")
+        ):
+            yield from aligner.add_segment(segment)
+            segment = next(segments, None)
+        else:
+            yield from aligner.add_detection(detection)
+            detection = next(detections, None)
+
+    yield from aligner.flush()
+
+
+async def astream_align(
+    transcription_records: Union[AsyncIterable[Any], Iterable[Any]],
+    emotion_records: Union[AsyncIterable[Any], Iterable[Any]],
+    window_ms: int = 100,
+    allowed_lateness_ms: int = 1000,
+    max_buffer: int = 10000
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Align two asynchronous feeds, yielding each event as soon as it is final.
+
+    Records are processed in arrival order: both feeds are awaited at once
+    and whichever delivers first is added. Synchronous iterables are
+    accepted too.
+
+    Args and yields are as for stream_align.
+    """
+    aligner = StreamingAligner(window_ms, allowed_lateness_ms, max_buffer)
+    feeds = {
+        "segment": (_aiter(transcription_records), aligner.add_segment),
+        "detection": (_aiter(emotion_records), aligner.add_detection),
+    }
+    waiting = {asyncio.ensure_future(feed.__anext__()): kind for kind, (feed, _) in feeds.items()}
+
+    try:
+        while waiting:
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            # Handle simultaneous arrivals in a fixed order: segments first
+            for task in sorted(done, key=lambda task: waiting[task] != "segment"):
+                kind = waiting.pop(task)
+                try:
+                    record = task.result()
+                except StopAsyncIteration:
+                    continue
+                feed, add = feeds[kind]
+                for event in add(record):
+                    yield event
+                waiting[asyncio.ensure_future(feed.__anext__())] = kind
+    finally:
+        for task in waiting:
+            task.cancel()
+
+    for event in aligner.flush():
+        yield event
+
+
+async def _aiter(records: Union[AsyncIterable[Any], Iterable[Any]]) -> AsyncIterator[Any]:
+    """Iterate a sync or async iterable asynchronously."""
+    if hasattr(records, "__aiter__"):
+        async for record in records:
+            yield record
+    else:
+        for record in records:
+            yield record
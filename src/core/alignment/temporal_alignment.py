@@ -1,32 +1,156 @@
 """Temporal alignment algorithm for matching emotions with transcription."""
 
-from typing import List, Dict, Any, Tuple
-import re
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, Tuple
+
+# Alignment engines accepted by align_emotion_with_transcript
+ALIGNMENT_ENGINES = ("sweep", "nested")
+
+
+class TimestampParseError(ValueError):
+    """
+    Raised when one or more timestamps in a batch cannot be parsed.
+    
+    Attributes:
+        errors: One dict per bad value with "row", "field", "value" and "error"
+    """
+    
+    def __init__(self, errors: List[Dict[str, Any]]):
+        self.errors = errors
+        first = errors[0]
+        location = f"row {first['row']}" + (f" ({first['field']})" if first.get("field") else "")
+        more = f" (and {len(errors) - 1} more)" if len(errors) > 1 else ""
+        super().__init__(f"Invalid timestamp at {location}: {first['error']}{more}")
+
+
+_TIMESTAMP_FORMAT_HINT = "expected MM:SS.mmm or HH:MM:SS.mmm"
+
+
+def _parse_timestamp(timestamp: str) -> int:
+    """
+    Parse one "MM:SS.mmm" / "HH:MM:SS.mmm" timestamp into milliseconds.
+    
+    Hand-rolled rather than a regex per value. The fixed-width "MM:SS.mmm"
+    and "HH:MM:SS.mmm" forms, which are nearly all real input, are checked by
+    position and converted with a single int() call; anything else goes
+    through the general split-based path. The fraction is read as decimal
+    seconds, so ".5" is 500 ms and digits beyond milliseconds are truncated.
+    """
+    length = len(timestamp)
+    if length == 9 and timestamp[2] == ":" and timestamp[5] == ".":
+        digits = timestamp[:2] + timestamp[3:5] + timestamp[6:]
+        if digits.isdigit() and digits.isascii():
+            value = int(digits)  # MMSSmmm
+            seconds_ms = value % 100000
+            if seconds_ms < 60000:
+                return value // 100000 * 60000 + seconds_ms
+    elif length == 12 and timestamp[2] == ":" and timestamp[5] == ":" and timestamp[8] == ".":
+        digits = timestamp[:2] + timestamp[3:5] + timestamp[6:8] + timestamp[9:]
+        if digits.isdigit() and digits.isascii():
+            value = int(digits)  # HHMMSSmmm
+            minutes = value // 100000 % 100
+            seconds_ms = value % 100000
+            if minutes < 60 and seconds_ms < 60000:
+                return value // 10000000 * 3600000 + minutes * 60000 + seconds_ms
+    
+    clock, dot, fraction = timestamp.rpartition(".")
+    parts = clock.split(":")
+    if len(parts) == 2:
+        hours = "0"
+        minutes, seconds = parts
+    elif len(parts) == 3:
+        hours, minutes, seconds = parts
+    else:
+        raise ValueError(f"Invalid timestamp format: {timestamp!r}, {_TIMESTAMP_FORMAT_HINT}")
+    
+    # isdigit alone accepts non-ASCII digits, and int() would accept signs,
+    # spaces and underscores, so validate explicitly
+    if not (
+        dot and timestamp.isascii() and hours.isdigit() and minutes.isdigit()
+        and seconds.isdigit() and fraction.isdigit() and len(seconds) <= 2
+    ):
+        raise ValueError(f"Invalid timestamp format: {timestamp!r}, {_TIMESTAMP_FORMAT_HINT}")
+    
+    seconds_value = int(seconds)
+    minutes_value = int(minutes)
+    if seconds_value >= 60:
+        raise ValueError(f"Invalid timestamp {timestamp!r}: seconds must be below 60")
+    if len(parts) == 3 and minutes_value >= 60:
+        raise ValueError(f"Invalid timestamp {timestamp!r}: minutes must be below 60 when hours are given")
+    
+    milliseconds = int(fraction[:3].ljust(3, "0"))
+    return ((int(hours) * 60 + minutes_value) * 60 + seconds_value) * 1000 + milliseconds
 
 
 def timestamp_to_ms(timestamp: str) -> int:
     """
-    Convert timestamp string (MM:SS.mmm) to milliseconds.
+    Convert timestamp string (MM:SS.mmm or HH:MM:SS.mmm) to milliseconds.
     
     Args:
-        timestamp: Time string in format "MM:SS.mmm" or "M:SS.mmm"
+        timestamp: Time string in format "MM:SS.mmm", "M:SS.mmm" or "HH:MM:SS.mmm";
+            the fraction is decimal seconds ("00:01.5" is 1500 ms)
         
     Returns:
         Time in milliseconds
     """
-    # Handle format: MM:SS.mmm or M:SS.mmm
-    pattern = r"(\d+):(\d+)\.(\d+)"
-    match = re.match(pattern, timestamp)
+    if not isinstance(timestamp, str):
+        raise ValueError(f"Invalid timestamp format: {timestamp!r}, {_TIMESTAMP_FORMAT_HINT}")
+    return _parse_timestamp(timestamp)
+
+
+def parse_timestamps(values: List[str], field: Optional[str] = None) -> List[int]:
+    """
+    Convert a whole batch of timestamp strings to milliseconds.
+    
+    Every value is checked; if any are invalid, a single TimestampParseError
+    lists all of them by row instead of stopping at the first.
     
-    if not match:
-        raise ValueError(f"Invalid timestamp format: {timestamp}. Expected MM:SS.mmm")
+    Args:
+        values: Timestamp strings, one per row
+        field: Optional field name to report in errors
+        
+    Returns:
+        Times in milliseconds, in input order
+    """
+    parse = _parse_timestamp
+    try:
+        # Fast path: valid input never enters the error bookkeeping below
+        return [parse(value) for value in values]
+    except (ValueError, TypeError, AttributeError):
+        pass
     
-    minutes = int(match.group(1))
-    seconds = int(match.group(2))
-    milliseconds = int(match.group(3))
+    parsed = []
+    errors = []
+    for row, value in enumerate(values):
+        try:
+            parsed.append(timestamp_to_ms(value))
+        except ValueError as e:
+            errors.append({"row": row, "field": field, "value": value, "error": str(e)})
+    raise TimestampParseError(errors)
+
+
+def parse_timestamp_fields(rows: List[Any], fields: Tuple[str, ...]) -> Dict[str, List[int]]:
+    """
+    Parse several timestamp fields of an upload payload in one call.
     
-    total_ms = (minutes * 60 * 1000) + (seconds * 1000) + milliseconds
-    return total_ms
+    Args:
+        rows: Dicts or objects (such as the upload schemas) holding the fields
+        fields: Names of the timestamp fields to parse
+        
+    Returns:
+        {field: times in milliseconds}, in row order
+    """
+    parsed = {}
+    errors = []
+    for field in fields:
+        try:
+            parsed[field] = parse_timestamps([_field(row, field) for row in rows], field=field)
+        except TimestampParseError as e:
+            errors.extend(e.errors)
+    if errors:
+        errors.sort(key=lambda error: error["row"])
+        raise TimestampParseError(errors)
+    return parsed
 
 
 def ms_to_timestamp(ms: int) -> str:
@@ -49,7 +173,8 @@ def ms_to_timestamp(ms: int) -> str:
 def align_emotion_with_transcript(
     transcription_entries: List[Dict[str, Any]],
     emotion_detections: List[Dict[str, Any]],
-    window_ms: int = 100
+    window_ms: int = 100,
+    engine: str = "sweep"
 ) -> List[Dict[str, Any]]:
     """
     Align emotion detections with transcription entries using temporal matching.
@@ -58,14 +183,195 @@ def align_emotion_with_transcript(
     - For each transcription entry, find all emotions within its time range
     - Use a tolerance window (default ±100ms) for matching
     
+    Two engines produce identical output:
+    - "sweep" (default): sorts both streams once and walks them together,
+      O((N + M) log M) plus the size of the output
+    - "nested": the original nested loop, O(N * M); kept as a reference
+    
     Args:
         transcription_entries: List of transcription entries with startTime, endTime, speaker, transcript
         emotion_detections: List of emotion detections with timestamp, emotion
         window_ms: Tolerance window in milliseconds for matching (default: 100)
+        engine: Alignment engine, one of ALIGNMENT_ENGINES (default: "sweep")
+        
+    Returns:
+        List of aligned events combining transcription and emotions
+    """
+    if engine == "sweep":
+        return _align_sweep(transcription_entries, emotion_detections, window_ms)
+    if engine == "nested":
+        return _align_nested(transcription_entries, emotion_detections, window_ms)
+    raise ValueError(f"Unknown alignment engine: {engine}. Expected one of {ALIGNMENT_ENGINES}")
+
+
+def align_records(
+    transcription_records: List[Any],
+    emotion_records: List[Any],
+    window_ms: int = 100
+) -> List[Dict[str, Any]]:
+    """
+    Align integer-millisecond records without any timestamp string round-trip.
+    
+    Records may be dicts or objects such as the TranscriptionEntry and
+    EmotionDetection ORM rows:
+    - transcription records: start_time_ms, end_time_ms, speaker, transcript
+    - emotion records: timestamp_ms, emotion, confidence (optional)
+    
+    Matching is identical to align_emotion_with_transcript. Matched emotions
+    carry timestamp_ms, emotion and confidence; the "MM:SS.mmm" string is
+    left to the API edge.
+    
+    Args:
+        transcription_records: Transcription records with millisecond bounds
+        emotion_records: Emotion records with millisecond timestamps
+        window_ms: Tolerance window in milliseconds for matching (default: 100)
         
     Returns:
         List of aligned events combining transcription and emotions
     """
+    segments = [
+        (_field(record, "start_time_ms"), _field(record, "end_time_ms"))
+        for record in transcription_records
+    ]
+    detection_times = [_field(record, "timestamp_ms") for record in emotion_records]
+    
+    aligned_events = []
+    for record, (start_time_ms, end_time_ms), matched in zip(
+        transcription_records, segments, _sweep_matches(segments, detection_times, window_ms)
+    ):
+        matched_emotions = []
+        for detection_index in matched:
+            detection = emotion_records[detection_index]
+            matched_emotions.append({
+                "timestamp_ms": detection_times[detection_index],
+                "emotion": _field(detection, "emotion"),
+                "confidence": _field(detection, "confidence", None)
+            })
+        
+        aligned_events.append({
+            "start_time_ms": start_time_ms,
+            "end_time_ms": end_time_ms,
+            "speaker": _field(record, "speaker"),
+            "transcript": _field(record, "transcript"),
+            "emotions": matched_emotions
+        })
+    
+    return aligned_events
+
+
+_MISSING = object()
+
+
+def _field(record: Any, name: str, default: Any = _MISSING) -> Any:
+    """Read a field from a dict record or an attribute from an object record."""
+    if isinstance(record, dict):
+        if default is _MISSING:
+            return record[name]
+        return record.get(name, default)
+    if default is _MISSING:
+        return getattr(record, name)
+    return getattr(record, name, default)
+
+
+def _sweep_matches(
+    segments: List[Tuple[int, int]],
+    detection_times: List[int],
+    window_ms: int
+) -> List[List[int]]:
+    """
+    Find the detections matching each segment with a sweep line.
+    
+    Detections are sorted by time (stable, so ties keep input order) and
+    segments are visited in order of start time, which makes the lower match
+    bound a monotonic pointer. The upper bound is found by binary search from
+    that pointer, because overlapping or nested segments do not have
+    monotonic end times.
+    
+    Args:
+        segments: (start_ms, end_ms) per segment, in input order
+        detection_times: Detection timestamps in milliseconds, in input order
+        window_ms: Tolerance window in milliseconds
+        
+    Returns:
+        For each segment in input order, the indices of its matching
+        detections in input order
+    """
+    order = sorted(range(len(detection_times)), key=detection_times.__getitem__)
+    sorted_times = [detection_times[i] for i in order]
+    # Sorting is the identity for the usual (already time-ordered) input
+    presorted = all(i == position for position, i in enumerate(order))
+    
+    matches: List[List[int]] = [None] * len(segments)
+    total = len(sorted_times)
+    low = 0
+    
+    for segment_index in sorted(range(len(segments)), key=lambda i: segments[i][0]):
+        start_time_ms, end_time_ms = segments[segment_index]
+        
+        # Advance the lower pointer past detections before this segment's window
+        lower_bound = start_time_ms - window_ms
+        while low < total and sorted_times[low] < lower_bound:
+            low += 1
+        high = bisect_right(sorted_times, end_time_ms + window_ms, low)
+        
+        matched = order[low:high]
+        if not presorted:
+            matched.sort()
+        matches[segment_index] = matched
+    
+    return matches
+
+
+def _align_sweep(
+    transcription_entries: List[Dict[str, Any]],
+    emotion_detections: List[Dict[str, Any]],
+    window_ms: int
+) -> List[Dict[str, Any]]:
+    """
+    Sweep-line alignment engine for timestamp-string input.
+    
+    Every timestamp is parsed exactly once before the sweep. Events are
+    returned in input order and matched emotions keep the input order of the
+    detections, exactly like the nested engine.
+    """
+    if not transcription_entries:
+        return []
+    
+    detection_times = parse_timestamps([d["timestamp"] for d in emotion_detections], field="timestamp")
+    bounds = parse_timestamp_fields(transcription_entries, ("startTime", "endTime"))
+    segments = list(zip(bounds["startTime"], bounds["endTime"]))
+    
+    aligned_events = []
+    for entry, (start_time_ms, end_time_ms), matched in zip(
+        transcription_entries, segments, _sweep_matches(segments, detection_times, window_ms)
+    ):
+        matched_emotions = []
+        for detection_index in matched:
+            detection = emotion_detections[detection_index]
+            matched_emotions.append({
+                "timestamp_ms": detection_times[detection_index],
+                "timestamp": detection["timestamp"],
+                "emotion": detection["emotion"],
+                "confidence": detection.get("confidence")
+            })
+        
+        aligned_events.append({
+            "start_time_ms": start_time_ms,
+            "end_time_ms": end_time_ms,
+            "speaker": entry["speaker"],
+            "transcript": entry["transcript"],
+            "emotions": matched_emotions
+        })
+    
+    return aligned_events
+
+
+def _align_nested(
+    transcription_entries: List[Dict[str, Any]],
+    emotion_detections: List[Dict[str, Any]],
+    window_ms: int
+) -> List[Dict[str, Any]]:
+    """Reference nested-loop alignment engine, O(N * M)."""
     aligned_events = []
     
     for entry in transcription_entries:
@@ -105,6 +411,9 @@ def find_event_at_time(aligned_events: List[Dict[str, Any]], target_time: str) -
     """
     Find the aligned event at a specific time.
     
+    Scans the events and returns the first match. For repeated lookups, or to
+    get every overlapping event, build an IntervalIndex once instead.
+    
     Args:
         aligned_events: List of aligned events
         target_time: Target timestamp in format "MM:SS.mmm" or "MM:SS"
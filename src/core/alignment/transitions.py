@@ -0,0 +1,252 @@
+"""First-order Markov transition matrices of detected emotions.
+
+The matched emotions of an AlignedEvents container are already dictionary
+encoded, so every transition is a (previous code, next code) pair and a
+matrix is one bincount over the flattened pair index prev * K + next.
+Per-speaker matrices add the speaker code as the leading index of the same
+bincount, so the cost is linear in the number of detections; the only work
+proportional to K * K is producing the output lists.
+
+NumPy is optional, as for the columnar backend: without it the same flat
+counts are built with a single Python loop over the detections.
+
+For chunked analysis, transition_counts summarizes a run of events by
+label-keyed counts plus its first and last emotions (overall and per
+speaker). merge_transition_counts combines the summaries of consecutive
+runs, adding the transitions across their boundary; it is associative, so
+summaries can be merged in any grouping, and matrices_from_counts turns the
+merged summary into exactly what transition_matrices returns for the whole.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from src.core.alignment.compact import AlignedEvents
+from src.core.alignment.vocabulary import EMOTION_VOCABULARY, EmotionVocabulary
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when NumPy is not installed
+    np = None
+
+
+def transition_matrices(
+    aligned_events: Any,
+    vocabulary: Optional[EmotionVocabulary] = None
+) -> Dict[str, Any]:
+    """
+    Count emotion-to-emotion transitions overall and per speaker.
+
+    A transition is a pair of consecutive matched emotions in conversation
+    order (events in order, emotions of an event in time order): across
+    all speakers for "global", and within each speaker's own emotions for
+    "by_speaker".
+
+    Args:
+        aligned_events: AlignedEvents container, or aligned event dicts
+        vocabulary: Vocabulary whose code order sorts the labels (default:
+            the container's, see AlignedEvents.vocabulary)
+
+    Returns:
+        Dictionary with:
+        - labels: Emotions present, in vocabulary order; row and column i of
+          every matrix is labels[i]
+        - global: {"counts", "probabilities", "total"}
+        - by_speaker: The same per speaker, in order of first appearance
+        counts[i][j] is how often labels[j] followed labels[i];
+        probabilities are the counts divided by their row sums (rows
+        without transitions are all zero).
+    """
+    if not isinstance(aligned_events, AlignedEvents):
+        aligned_events = AlignedEvents.from_events(aligned_events)
+    if vocabulary is None:
+        vocabulary = aligned_events.vocabulary()
+
+    # Re-encode the container's label codes in vocabulary order; labels that
+    # share a vocabulary code share a row and column
+    vocabulary_codes = [vocabulary.code(label) for label in aligned_events.labels]
+    distinct = sorted(set(vocabulary_codes))
+    positions = {code: position for position, code in enumerate(distinct)}
+    remap = [positions[code] for code in vocabulary_codes]
+    labels = [vocabulary.label(code) for code in distinct]
+    size = len(labels)
+
+    if np is not None:
+        global_counts, speaker_counts = _count_numpy(aligned_events, remap, size)
+    else:
+        global_counts, speaker_counts = _count_python(aligned_events, remap, size)
+
+    return {
+        "labels": labels,
+        "global": _matrix(global_counts, size),
+        "by_speaker": {
+            speaker: _matrix(speaker_counts[code * size * size:(code + 1) * size * size], size)
+            for code, speaker in enumerate(aligned_events.speakers)
+        },
+    }
+
+
+def _count_numpy(aligned_events: AlignedEvents, remap: List[int], size: int):
+    """Return flat global (K*K) and per-speaker (S*K*K) counts with np.bincount."""
+    speakers = len(aligned_events.speakers)
+    codes = np.asarray(remap, dtype=np.int64)[np.frombuffer(aligned_events.emotion_codes, dtype=np.intc)]
+    offsets = np.frombuffer(aligned_events.emotion_offsets, dtype=np.int64)
+    row_speakers = np.repeat(np.frombuffer(aligned_events.speaker_codes, dtype=np.intc), np.diff(offsets))
+
+    global_counts = np.bincount(codes[:-1] * size + codes[1:], minlength=size * size)
+
+    # Group each speaker's emotions together, keeping their order; a stable
+    # sort on int16 keys is a radix sort, so this stays linear
+    keys = row_speakers.astype(np.int16) if speakers <= np.iinfo(np.int16).max else row_speakers
+    by_speaker = np.argsort(keys, kind="stable")
+    grouped_speakers = row_speakers[by_speaker]
+    grouped_codes = codes[by_speaker]
+    same_speaker = grouped_speakers[1:] == grouped_speakers[:-1]
+    previous_codes = grouped_codes[:-1][same_speaker]
+    next_codes = grouped_codes[1:][same_speaker]
+    pairs = (grouped_speakers[1:][same_speaker] * size + previous_codes) * size + next_codes
+    speaker_counts = np.bincount(pairs, minlength=speakers * size * size)
+
+    return global_counts, speaker_counts
+
+
+def _count_python(aligned_events: AlignedEvents, remap: List[int], size: int):
+    """Return flat global and per-speaker counts with one loop over the detections."""
+    global_counts = [0] * (size * size)
+    speaker_counts = [0] * (len(aligned_events.speakers) * size * size)
+    previous_by_speaker = {}
+    previous = None
+    offsets = aligned_events.emotion_offsets
+    for index, speaker_code in enumerate(aligned_events.speaker_codes):
+        for position in range(offsets[index], offsets[index + 1]):
+            code = remap[aligned_events.emotion_codes[position]]
+            if previous is not None:
+                global_counts[previous * size + code] += 1
+            speaker_previous = previous_by_speaker.get(speaker_code)
+            if speaker_previous is not None:
+                speaker_counts[(speaker_code * size + speaker_previous) * size + code] += 1
+            previous = previous_by_speaker[speaker_code] = code
+    return global_counts, speaker_counts
+
+
+def transition_counts(aligned_events: AlignedEvents) -> Dict[str, Any]:
+    """
+    Summarize the transitions of a run of events for merge_transition_counts.
+
+    Returns:
+        Dictionary with labels and speakers (in order of first appearance),
+        global and by_speaker ({(from label, to label): count}), and first,
+        last, first_by_speaker and last_by_speaker (emotion labels at the
+        edges of the run, None when it has no emotions)
+    """
+    matrices = transition_matrices(aligned_events)
+    labels = matrices["labels"]
+
+    def pairs(matrix):
+        return {
+            (labels[row], labels[column]): count
+            for row, counts in enumerate(matrix["counts"])
+            for column, count in enumerate(counts)
+            if count
+        }
+
+    first_by_speaker, last_by_speaker = {}, {}
+    offsets = aligned_events.emotion_offsets
+    for index, speaker_code in enumerate(aligned_events.speaker_codes):
+        start, stop = offsets[index], offsets[index + 1]
+        if start != stop:
+            speaker = aligned_events.speakers[speaker_code]
+            first_by_speaker.setdefault(speaker, aligned_events.labels[aligned_events.emotion_codes[start]])
+            last_by_speaker[speaker] = aligned_events.labels[aligned_events.emotion_codes[stop - 1]]
+
+    codes = aligned_events.emotion_codes
+    return {
+        "labels": list(dict.fromkeys(aligned_events.labels)),
+        "speakers": list(aligned_events.speakers),
+        "global": pairs(matrices["global"]),
+        "by_speaker": {speaker: pairs(matrix) for speaker, matrix in matrices["by_speaker"].items()},
+        "first": aligned_events.labels[codes[0]] if codes else None,
+        "last": aligned_events.labels[codes[-1]] if codes else None,
+        "first_by_speaker": first_by_speaker,
+        "last_by_speaker": last_by_speaker,
+    }
+
+
+def _add_pairs(target: Dict[tuple, int], pairs: Dict[tuple, int]):
+    for pair, count in pairs.items():
+        target[pair] = target.get(pair, 0) + count
+
+
+def merge_transition_counts(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine the transition_counts of two consecutive runs into those of both."""
+    by_speaker = {speaker: dict(pairs) for speaker, pairs in left["by_speaker"].items()}
+    for speaker, pairs in right["by_speaker"].items():
+        _add_pairs(by_speaker.setdefault(speaker, {}), pairs)
+    merged_global = dict(left["global"])
+    _add_pairs(merged_global, right["global"])
+
+    # Transitions across the boundary: the left run's last emotion to the right run's first
+    if left["last"] is not None and right["first"] is not None:
+        _add_pairs(merged_global, {(left["last"], right["first"]): 1})
+    for speaker, first in right["first_by_speaker"].items():
+        if speaker in left["last_by_speaker"]:
+            _add_pairs(by_speaker[speaker], {(left["last_by_speaker"][speaker], first): 1})
+
+    return {
+        "labels": list(dict.fromkeys(left["labels"] + right["labels"])),
+        "speakers": list(dict.fromkeys(left["speakers"] + right["speakers"])),
+        "global": merged_global,
+        "by_speaker": by_speaker,
+        "first": left["first"] if left["first"] is not None else right["first"],
+        "last": right["last"] if right["last"] is not None else left["last"],
+        "first_by_speaker": {**right["first_by_speaker"], **left["first_by_speaker"]},
+        "last_by_speaker": {**left["last_by_speaker"], **right["last_by_speaker"]},
+    }
+
+
+def matrices_from_counts(
+    counts: Dict[str, Any],
+    vocabulary: Optional[EmotionVocabulary] = None
+) -> Dict[str, Any]:
+    """
+    Build the transition_matrices result from (merged) transition_counts.
+
+    By default labels outside the canonical vocabulary are ordered by first
+    appearance, as in the container of the whole run.
+    """
+    if vocabulary is None:
+        vocabulary = EMOTION_VOCABULARY.local(counts["labels"])
+    labels = sorted(counts["labels"], key=vocabulary.code)
+    size = len(labels)
+    positions = {label: position for position, label in enumerate(labels)}
+
+    def flat(pairs):
+        flat_counts = [0] * (size * size)
+        for (previous, current), count in pairs.items():
+            flat_counts[positions[previous] * size + positions[current]] = count
+        return flat_counts
+
+    return {
+        "labels": labels,
+        "global": _matrix(flat(counts["global"]), size),
+        "by_speaker": {
+            speaker: _matrix(flat(counts["by_speaker"].get(speaker, {})), size)
+            for speaker in counts["speakers"]
+        },
+    }
+
+
+def _matrix(flat_counts, size: int) -> Dict[str, Any]:
+    """Build the counts/probabilities/total entry from flat row-major counts."""
+    if np is not None:
+        counts = np.asarray(flat_counts, dtype=np.int64).reshape(size, size)
+        row_sums = counts.sum(axis=1, keepdims=True)
+        probabilities = np.divide(counts, row_sums, out=np.zeros((size, size)), where=row_sums > 0)
+        return {"counts": counts.tolist(), "probabilities": probabilities.tolist(), "total": int(counts.sum())}
+
+    counts = [list(flat_counts[row * size:(row + 1) * size]) for row in range(size)]
+    row_sums = [sum(row) for row in counts]
+    probabilities = [
+        [count / row_sum if row_sum else 0.0 for count in row]
+        for row, row_sum in zip(counts, row_sums)
+    ]
+    return {"counts": counts, "probabilities": probabilities, "total": sum(row_sums)}
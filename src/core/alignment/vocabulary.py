@@ -0,0 +1,156 @@
+"""Emotion vocabulary: normalized labels encoded as small integer codes."""
+
+import threading
+from typing import List, Dict, Iterable, Optional
+
+# Canonical labels, registered first so their codes are stable
+CANONICAL_EMOTIONS = (
+    "Neutral", "Joy", "Sadness", "Anger", "Fear", "Surprise", "Disgust", "Anxiety",
+    "Contempt", "Concentration", "Satisfaction", "Amusement", "Confusion", "Interest",
+    "Boredom", "Calmness", "Excitement",
+)
+
+# Alternative spellings mapped to their canonical label (matched case-insensitively)
+EMOTION_SYNONYMS = {
+    "happy": "Joy",
+    "happiness": "Joy",
+    "sad": "Sadness",
+    "angry": "Anger",
+    "afraid": "Fear",
+    "scared": "Fear",
+    "surprised": "Surprise",
+    "disgusted": "Disgust",
+    "anxious": "Anxiety",
+    "nervous": "Anxiety",
+    "contemptuous": "Contempt",
+    "concentrating": "Concentration",
+    "satisfied": "Satisfaction",
+    "amused": "Amusement",
+    "confused": "Confusion",
+    "interested": "Interest",
+    "bored": "Boredom",
+    "calm": "Calmness",
+    "excited": "Excitement",
+}
+
+
+class EmotionVocabulary:
+    """
+    Registry mapping emotion labels to small integer codes.
+
+    Labels are matched after stripping whitespace and case-folding, and
+    synonyms resolve to their canonical label, so "joy", " JOY " and "happy"
+    all share the code of "Joy". Unknown labels are spelled with their
+    first letter upper-cased and the rest lower-cased, and are registered
+    on first use.
+
+    A frozen vocabulary never registers labels: code() raises KeyError for
+    unknown ones. The shared EMOTION_VOCABULARY is frozen, so free-form
+    labels from uploads cannot grow it; analyses encode the labels of a
+    session with a local() copy instead, which keeps the shared codes and
+    numbers the other labels in order of first appearance.
+
+    Codes index bit positions, so a set of emotions is a plain int bitmask:
+    overlap tests are a single AND instead of building string sets.
+    """
+
+    def __init__(
+        self,
+        labels: Iterable[str] = CANONICAL_EMOTIONS,
+        synonyms: Dict[str, str] = EMOTION_SYNONYMS,
+        frozen: bool = False
+    ):
+        self._labels: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.frozen = False
+        for label in labels:
+            self.code(label)
+        for synonym, label in synonyms.items():
+            self._codes[synonym.casefold()] = self.code(label)
+        self.frozen = frozen
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def local(self, labels: Iterable[str] = ()) -> "EmotionVocabulary":
+        """Return an unfrozen copy, with labels registered in order, that leaves this vocabulary unchanged."""
+        vocabulary = EmotionVocabulary((), {})
+        vocabulary._labels = list(self._labels)
+        vocabulary._codes = dict(self._codes)
+        for label in labels:
+            vocabulary.code(label)
+        return vocabulary
+
+    def find(self, label: str) -> Optional[int]:
+        """Return the code of a label, or None if it is not registered."""
+        code = self._codes.get(label)
+        if code is None:
+            code = self._codes.get(label.strip().casefold())
+        return code
+
+    def code(self, label: str) -> int:
+        """Return the code of a label, registering it if it is new (unless frozen)."""
+        code = self._codes.get(label)
+        if code is not None:
+            return code
+        key = label.strip().casefold()
+        if self.frozen:
+            # Raw spellings are not remembered either, so the size stays fixed
+            code = self._codes.get(key)
+            if code is None:
+                raise KeyError(f"Unknown emotion label: {label!r}")
+            return code
+        with self._lock:
+            code = self._codes.get(key)
+            if code is None:
+                code = self._codes[key] = len(self._labels)
+                self._labels.append(_spelling(key))
+            # Remember the exact spelling too, so repeats skip normalization
+            self._codes[label] = code
+        return code
+
+    def label(self, code: int) -> str:
+        """Return the canonical label of a code."""
+        return self._labels[code]
+
+    def normalize(self, label: str) -> str:
+        """Return the canonical spelling of a label, without registering it."""
+        code = self.find(label)
+        return self._labels[code] if code is not None else _spelling(label.strip().casefold())
+
+    def mask(self, labels: Iterable[str]) -> int:
+        """Return the bitmask of a collection of labels."""
+        mask = 0
+        for label in labels:
+            mask |= 1 << self.code(label)
+        return mask
+
+    def labels(self, mask: int) -> List[str]:
+        """Return the labels in a bitmask, in code order."""
+        labels = []
+        code = 0
+        while mask:
+            if mask & 1:
+                labels.append(self._labels[code])
+            mask >>= 1
+            code += 1
+        return labels
+
+
+def _spelling(key: str) -> str:
+    """Spell an unknown label from its case-folded key, e.g. "awe" -> "Awe"."""
+    return key[:1].upper() + key[1:]
+
+
+def codes_mask(codes: Iterable[int]) -> int:
+    """Return the bitmask of a collection of codes."""
+    mask = 0
+    for code in codes:
+        mask |= 1 << code
+    return mask
+
+
+# Process-wide vocabulary of the canonical labels, used at ingest and by the
+# analysis nodes; frozen so it holds the same codes in every process
+EMOTION_VOCABULARY = EmotionVocabulary(frozen=True)
@@ -1,11 +1,16 @@
 """Main FastAPI application."""
 
 import os
-from fastapi import FastAPI, Depends, HTTPException, status
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from fastapi import FastAPI, Depends, HTTPException, Query, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response, JSONResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import json
 
 from src.models import (
@@ -15,6 +20,9 @@ from src.models import (
     EmotionUpload,
     AlignedEventResponse,
     InterpretationReportResponse,
+    AnalysisMetricsResponse,
+    AnalysisJobResponse,
+    SpeakerProfileResponse,
     HealthResponse,
 )
 from src.models.database import (
@@ -23,11 +31,46 @@ from src.models.database import (
     TranscriptionEntry,
     EmotionDetection,
     AlignedEvent,
+    AlignmentWatermark,
     InterpretationReport,
+    JobStatus,
+    AnalysisJob,
+    SpeakerAggregate,
+    SpeakerSessionStatistics,
+)
+from src.utils.database import engine, get_db, get_db_session, init_db
+from src.core.alignment import (
+    DEFAULT_WINDOWS_MS,
+    EMOTION_VOCABULARY,
+    IntervalIndex,
+    TimestampParseError,
+    align_increment,
+    align_multi_window,
+    align_records,
+    delta_time_range,
+    parse_timestamp_fields,
+)
+from src.core.agent import (
+    ALIGNMENT_WINDOW_MS,
+    ENGINE_STEPS,
+    AnalysisCache,
+    ContextBuilder,
+    MomentInterpreter,
+    NoResumableInterpretation,
+    SQLCheckpointSaver,
+    SQLInterpretationCache,
+    StubInterpretationBackend,
+    analysis_cache_key,
+    baseline_emotion,
+    combine_statistics,
+    empty_statistics,
+    get_interpretation_agent,
+    has_resumable_interpretation,
+    resume_interpretation,
+    run_interpretation_on_records,
+    speaker_statistics,
+    statistics_profile,
 )
-from src.utils.database import get_db_session, init_db
-from src.core.alignment import align_emotion_with_transcript, timestamp_to_ms
-from src.core.agent import run_interpretation
 from src.core.reports import generate_json_report, generate_markdown_report
 
 # Initialize FastAPI app
@@ -37,6 +80,65 @@ app = FastAPI(
     version="1.0.0",
 )
 
+# Per-session interval indexes over aligned events, most recently used last.
+# Each entry carries a signature of the session's aligned events (count, last
+# id, last insert time, watermark update time) so a re-alignment is also
+# picked up by other workers.
+EVENT_INDEX_CACHE_SIZE = int(os.getenv("EVENT_INDEX_CACHE_SIZE", "64"))
+_event_index_cache: "OrderedDict[int, tuple]" = OrderedDict()
+
+# Analyze responses by a content hash of the session's input (see
+# analysis_cache_key), so re-analyzing an unchanged session returns the
+# stored report without running the agent or inserting a new report.
+# ANALYSIS_CACHE_MAX_AGE_S=0 keeps entries until they are evicted by size.
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "256"))
+ANALYSIS_CACHE_MAX_AGE_S = float(os.getenv("ANALYSIS_CACHE_MAX_AGE_S", "3600"))
+_analysis_cache = AnalysisCache(ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_MAX_AGE_S or None)
+
+# Background analyses (POST /analyze?async=true) run on a bounded thread
+# pool; at most ANALYSIS_MAX_PENDING_JOBS are queued or running at once and
+# further submissions get 503.
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "2"))
+ANALYSIS_MAX_PENDING_JOBS = int(os.getenv("ANALYSIS_MAX_PENDING_JOBS", "32"))
+_analysis_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analysis")
+_analysis_job_slots = threading.BoundedSemaphore(ANALYSIS_MAX_PENDING_JOBS)
+
+# With ANALYSIS_CHECKPOINTS=async (or sync) analyses are checkpointed after
+# every node in the application database, keyed by session id, so a failed
+# analysis can be resumed; "sync" also waits for each checkpoint to be
+# written before the next node starts. Off by default, since every
+# checkpoint serializes the run's state.
+ANALYSIS_CHECKPOINTS = os.getenv("ANALYSIS_CHECKPOINTS", "off")
+_checkpointer = None if ANALYSIS_CHECKPOINTS == "off" else SQLCheckpointSaver(engine)
+
+# Critical moments go to the interpretation backend INTERPRETATION_BATCH_SIZE
+# at a time, with at most INTERPRETATION_MAX_CONCURRENCY calls in flight and
+# each call limited to INTERPRETATION_TIMEOUT_S. Answers are cached in the
+# application database, so re-analyses never interpret a moment twice.
+# Each moment's context is at most INTERPRETATION_CONTEXT_EVENTS events on
+# either side and INTERPRETATION_CONTEXT_TOKENS estimated tokens.
+INTERPRETATION_BATCH_SIZE = int(os.getenv("INTERPRETATION_BATCH_SIZE", "8"))
+INTERPRETATION_MAX_CONCURRENCY = int(os.getenv("INTERPRETATION_MAX_CONCURRENCY", "4"))
+INTERPRETATION_TIMEOUT_S = float(os.getenv("INTERPRETATION_TIMEOUT_S", "30"))
+INTERPRETATION_CONTEXT_EVENTS = int(os.getenv("INTERPRETATION_CONTEXT_EVENTS", "3"))
+INTERPRETATION_CONTEXT_TOKENS = int(os.getenv("INTERPRETATION_CONTEXT_TOKENS", "200"))
+_moment_interpreter = MomentInterpreter(
+    StubInterpretationBackend(),
+    cache=SQLInterpretationCache(engine),
+    batch_size=INTERPRETATION_BATCH_SIZE,
+    max_concurrency=INTERPRETATION_MAX_CONCURRENCY,
+    timeout_s=INTERPRETATION_TIMEOUT_S,
+    context_builder=ContextBuilder(INTERPRETATION_CONTEXT_EVENTS, INTERPRETATION_CONTEXT_TOKENS),
+)
+
+# Every completed analysis adds its per-speaker statistics to the speakers'
+# running aggregates (replacing the session's earlier contribution), which
+# serve GET /api/speakers/{name}/profile. With SPEAKER_BASELINES=historical
+# anomaly detection judges speakers against their baseline emotion over
+# their other sessions instead of the session's dominant emotion.
+SPEAKER_BASELINES = os.getenv("SPEAKER_BASELINES", "session")
+_speaker_aggregates_lock = threading.Lock()
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -49,8 +151,19 @@ app.add_middleware(
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup."""
+    """Initialize database and compile the interpretation agent on startup."""
     init_db()
+    get_interpretation_agent(**_agent_config())
+    
+    # Jobs run in the process that queued them, so unfinished ones were lost with it
+    with get_db() as db:
+        db.query(AnalysisJob).filter(
+            AnalysisJob.status.in_([JobStatus.QUEUED.value, JobStatus.RUNNING.value])
+        ).update({
+            AnalysisJob.status: JobStatus.FAILED.value,
+            AnalysisJob.error: "Interrupted by a server restart",
+            AnalysisJob.finished_at: datetime.utcnow(),
+        }, synchronize_session=False)
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -95,23 +208,33 @@ async def list_sessions(db: Session = Depends(get_db_session)):
 async def upload_transcription(
     session_id: int,
     data: TranscriptionUpload,
+    append: bool = False,
     db: Session = Depends(get_db_session)
 ):
-    """Upload transcription data for a session."""
+    """Upload transcription data for a session, replacing it unless append=true."""
     # Check if session exists
     session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # Delete existing transcription entries for this session
-    db.query(TranscriptionEntry).filter(TranscriptionEntry.session_id == session_id).delete()
+    # Parse all timestamps up front so bad rows are reported before any write
+    try:
+        times = parse_timestamp_fields(data.entries, ("startTime", "endTime"))
+    except TimestampParseError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+    
+    if not append:
+        # Delete existing transcription entries; aligned events no longer
+        # reflect the data, so the next alignment must be a full one
+        db.query(TranscriptionEntry).filter(TranscriptionEntry.session_id == session_id).delete()
+        db.query(AlignmentWatermark).filter(AlignmentWatermark.session_id == session_id).delete()
     
     # Create new transcription entries
-    for entry in data.entries:
+    for entry, start_time_ms, end_time_ms in zip(data.entries, times["startTime"], times["endTime"]):
         transcription_entry = TranscriptionEntry(
             session_id=session_id,
-            start_time_ms=timestamp_to_ms(entry.startTime),
-            end_time_ms=timestamp_to_ms(entry.endTime),
+            start_time_ms=start_time_ms,
+            end_time_ms=end_time_ms,
             speaker=entry.speaker,
             transcript=entry.transcript,
         )
@@ -129,23 +252,32 @@ async def upload_transcription(
 async def upload_emotions(
     session_id: int,
     data: EmotionUpload,
+    append: bool = False,
     db: Session = Depends(get_db_session)
 ):
-    """Upload emotion detection data for a session."""
+    """Upload emotion detection data for a session, replacing it unless append=true."""
     # Check if session exists
     session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # Delete existing emotion detections for this session
-    db.query(EmotionDetection).filter(EmotionDetection.session_id == session_id).delete()
+    # Parse all timestamps up front so bad rows are reported before any write
+    try:
+        times = parse_timestamp_fields(data.detections, ("timestamp",))
+    except TimestampParseError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+    
+    if not append:
+        # Delete existing emotion detections; the next alignment must be a full one
+        db.query(EmotionDetection).filter(EmotionDetection.session_id == session_id).delete()
+        db.query(AlignmentWatermark).filter(AlignmentWatermark.session_id == session_id).delete()
     
-    # Create new emotion detections
-    for detection in data.detections:
+    # Create new emotion detections, storing labels in their canonical spelling
+    for detection, timestamp_ms in zip(data.detections, times["timestamp"]):
         emotion_detection = EmotionDetection(
             session_id=session_id,
-            timestamp_ms=timestamp_to_ms(detection.timestamp),
-            emotion=detection.emotion,
+            timestamp_ms=timestamp_ms,
+            emotion=EMOTION_VOCABULARY.normalize(detection.emotion),
             confidence=detection.confidence,
         )
         db.add(emotion_detection)
@@ -164,13 +296,33 @@ async def upload_emotions(
 
 
 @app.post("/api/sessions/{session_id}/align", status_code=status.HTTP_201_CREATED)
-async def align_session_data(session_id: int, db: Session = Depends(get_db_session)):
-    """Align transcription and emotion data for a session."""
+async def align_session_data(
+    session_id: int,
+    incremental: bool = False,
+    db: Session = Depends(get_db_session)
+):
+    """
+    Align transcription and emotion data for a session.
+    
+    With incremental=true only rows appended since the last alignment are
+    aligned, and only the aligned events they touch are written. It falls
+    back to a full alignment when there is no usable watermark (first run,
+    replaced uploads or a changed window).
+    """
     # Check if session exists
     session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    window_ms = int(os.getenv("ALIGNMENT_WINDOW_MS", "100"))
+    
+    if incremental:
+        watermark = db.query(AlignmentWatermark).filter(
+            AlignmentWatermark.session_id == session_id
+        ).first()
+        if watermark and watermark.window_ms == window_ms:
+            return _align_incrementally(session, watermark, db)
+    
     # Get transcription entries
     transcription_entries = db.query(TranscriptionEntry).filter(
         TranscriptionEntry.session_id == session_id
@@ -179,45 +331,25 @@ async def align_session_data(session_id: int, db: Session = Depends(get_db_sessi
     if not transcription_entries:
         raise HTTPException(status_code=400, detail="No transcription data found")
     
-    # Get emotion detections
+    # Get emotion detections (ties in id order, as incremental alignment appends them)
     emotion_detections = db.query(EmotionDetection).filter(
         EmotionDetection.session_id == session_id
-    ).order_by(EmotionDetection.timestamp_ms).all()
+    ).order_by(EmotionDetection.timestamp_ms, EmotionDetection.id).all()
     
     if not emotion_detections:
         raise HTTPException(status_code=400, detail="No emotion data found")
     
-    # Convert to format for alignment algorithm
-    transcription_data = [
-        {
-            "startTime": f"{entry.start_time_ms // 60000:02d}:{(entry.start_time_ms % 60000) // 1000:02d}.{entry.start_time_ms % 1000:03d}",
-            "endTime": f"{entry.end_time_ms // 60000:02d}:{(entry.end_time_ms % 60000) // 1000:02d}.{entry.end_time_ms % 1000:03d}",
-            "speaker": entry.speaker,
-            "transcript": entry.transcript,
-        }
-        for entry in transcription_entries
-    ]
-    
-    emotion_data = [
-        {
-            "timestamp": f"{detection.timestamp_ms // 60000:02d}:{(detection.timestamp_ms % 60000) // 1000:02d}.{detection.timestamp_ms % 1000:03d}",
-            "emotion": detection.emotion,
-            "confidence": detection.confidence,
-        }
-        for detection in emotion_detections
-    ]
-    
     # Perform alignment
-    window_ms = int(os.getenv("ALIGNMENT_WINDOW_MS", "100"))
-    aligned_events = align_emotion_with_transcript(transcription_data, emotion_data, window_ms)
+    aligned_events = align_records(transcription_entries, emotion_detections, window_ms)
     
     # Delete existing aligned events
     db.query(AlignedEvent).filter(AlignedEvent.session_id == session_id).delete()
     
     # Save aligned events
-    for event in aligned_events:
+    for entry, event in zip(transcription_entries, aligned_events):
         aligned_event = AlignedEvent(
             session_id=session_id,
+            transcription_entry_id=entry.id,
             start_time_ms=event["start_time_ms"],
             end_time_ms=event["end_time_ms"],
             speaker=event["speaker"],
@@ -226,15 +358,188 @@ async def align_session_data(session_id: int, db: Session = Depends(get_db_sessi
         )
         db.add(aligned_event)
     
+    # Record what this alignment covers
+    db.merge(AlignmentWatermark(
+        session_id=session_id,
+        last_transcription_entry_id=max(entry.id for entry in transcription_entries),
+        last_emotion_detection_id=max(detection.id for detection in emotion_detections),
+        window_ms=window_ms,
+        updated_at=datetime.utcnow(),
+    ))
+    
     # Update session status
     session.status = SessionStatus.READY.value
     
     db.commit()
+    _event_index_cache.pop(session_id, None)
     
     return {
         "message": f"Aligned {len(aligned_events)} events",
         "session_id": session_id,
-        "aligned_events_count": len(aligned_events)
+        "aligned_events_count": len(aligned_events),
+        "mode": "full"
+    }
+
+
+def _align_incrementally(session: SessionModel, watermark: AlignmentWatermark, db: Session):
+    """Align rows appended after the watermark and update only the affected aligned events."""
+    session_id = session.id
+    window_ms = watermark.window_ms
+    
+    # Rows appended since the last alignment
+    new_entries = db.query(TranscriptionEntry).filter(
+        TranscriptionEntry.session_id == session_id,
+        TranscriptionEntry.id > watermark.last_transcription_entry_id
+    ).order_by(TranscriptionEntry.start_time_ms, TranscriptionEntry.id).all()
+    
+    new_detections = db.query(EmotionDetection).filter(
+        EmotionDetection.session_id == session_id,
+        EmotionDetection.id > watermark.last_emotion_detection_id
+    ).order_by(EmotionDetection.timestamp_ms, EmotionDetection.id).all()
+    
+    created = 0
+    updated = 0
+    time_range = delta_time_range(new_entries, new_detections, window_ms)
+    
+    if time_range:
+        from_ms, to_ms = time_range
+        
+        # Only aligned events and detections overlapping the delta can change
+        existing_events = db.query(AlignedEvent).filter(
+            AlignedEvent.session_id == session_id,
+            AlignedEvent.start_time_ms <= to_ms,
+            AlignedEvent.end_time_ms >= from_ms
+        ).order_by(AlignedEvent.start_time_ms).all()
+        
+        context_detections = db.query(EmotionDetection).filter(
+            EmotionDetection.session_id == session_id,
+            EmotionDetection.timestamp_ms >= from_ms,
+            EmotionDetection.timestamp_ms <= to_ms
+        ).order_by(EmotionDetection.timestamp_ms, EmotionDetection.id).all()
+        
+        updates, new_events = align_increment(
+            existing_events, new_entries, new_detections, context_detections, window_ms
+        )
+        
+        for aligned_event, emotions in updates:
+            aligned_event.emotions = emotions
+        updated = len(updates)
+        
+        for entry, event in zip(new_entries, new_events):
+            db.add(AlignedEvent(
+                session_id=session_id,
+                transcription_entry_id=entry.id,
+                start_time_ms=event["start_time_ms"],
+                end_time_ms=event["end_time_ms"],
+                speaker=event["speaker"],
+                transcript=event["transcript"],
+                emotions=event["emotions"],
+            ))
+        created = len(new_events)
+        
+        # Advance the watermark
+        if new_entries:
+            watermark.last_transcription_entry_id = max(entry.id for entry in new_entries)
+        if new_detections:
+            watermark.last_emotion_detection_id = max(detection.id for detection in new_detections)
+        watermark.updated_at = datetime.utcnow()
+        
+        session.status = SessionStatus.READY.value
+        db.commit()
+        _event_index_cache.pop(session_id, None)
+    
+    aligned_count = db.query(AlignedEvent).filter(AlignedEvent.session_id == session_id).count()
+    
+    return {
+        "message": f"Aligned {created} new and updated {updated} existing events",
+        "session_id": session_id,
+        "aligned_events_count": aligned_count,
+        "mode": "incremental",
+        "created": created,
+        "updated": updated
+    }
+
+
+def _align_windows(session_id: int, windows: Optional[List[int]], include_events: bool, db: Session):
+    """Load a session's rows and align them for every requested window in one pass."""
+    # Check if session exists
+    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    windows = windows or list(DEFAULT_WINDOWS_MS)
+    if any(window < 0 for window in windows):
+        raise HTTPException(status_code=400, detail="Alignment windows must not be negative")
+    
+    transcription_entries = db.query(
+        TranscriptionEntry.start_time_ms,
+        TranscriptionEntry.end_time_ms,
+        TranscriptionEntry.speaker,
+        TranscriptionEntry.transcript,
+    ).filter(
+        TranscriptionEntry.session_id == session_id
+    ).order_by(TranscriptionEntry.start_time_ms).all()
+    
+    if not transcription_entries:
+        raise HTTPException(status_code=400, detail="No transcription data found")
+    
+    emotion_detections = db.query(
+        EmotionDetection.timestamp_ms,
+        EmotionDetection.emotion,
+        EmotionDetection.confidence,
+    ).filter(
+        EmotionDetection.session_id == session_id
+    ).order_by(EmotionDetection.timestamp_ms, EmotionDetection.id).all()
+    
+    if not emotion_detections:
+        raise HTTPException(status_code=400, detail="No emotion data found")
+    
+    return align_multi_window(transcription_entries, emotion_detections, windows, include_events)
+
+
+@app.get("/api/sessions/{session_id}/alignment-windows")
+async def align_session_windows(
+    session_id: int,
+    windows: Optional[List[int]] = Query(None, description="Tolerance windows in milliseconds"),
+    db: Session = Depends(get_db_session)
+):
+    """Align a session for several tolerance windows at once without storing the result."""
+    results = _align_windows(session_id, windows, True, db)
+    
+    return {
+        "session_id": session_id,
+        "windows": [
+            {"window_ms": window, **result}
+            for window, result in results.items()
+        ]
+    }
+
+
+@app.get("/api/sessions/{session_id}/alignment-windows/compare")
+async def compare_session_windows(
+    session_id: int,
+    windows: Optional[List[int]] = Query(None, description="Tolerance windows in milliseconds"),
+    db: Session = Depends(get_db_session)
+):
+    """Compare match statistics across tolerance windows, computed in one pass."""
+    results = _align_windows(session_id, windows, False, db)
+    
+    comparison = []
+    previous_matches = None
+    for window, result in results.items():
+        comparison.append({
+            "window_ms": window,
+            "match_count": result["match_count"],
+            "matched_segments": result["matched_segments"],
+            "unmatched_detections": result["unmatched_detections"],
+            "added_matches": None if previous_matches is None else result["match_count"] - previous_matches,
+        })
+        previous_matches = result["match_count"]
+    
+    return {
+        "session_id": session_id,
+        "current_window_ms": int(os.getenv("ALIGNMENT_WINDOW_MS", "100")),
+        "windows": comparison
     }
 
 
@@ -254,85 +559,478 @@ async def get_aligned_events(session_id: int, db: Session = Depends(get_db_sessi
     return aligned_events
 
 
-@app.post("/api/sessions/{session_id}/analyze", status_code=status.HTTP_201_CREATED)
-async def analyze_session(session_id: int, db: Session = Depends(get_db_session)):
-    """Run AI agent analysis on a session."""
+def _get_event_index(session_id: int, db: Session) -> IntervalIndex:
+    """Return the cached interval index for a session, rebuilding it if the aligned events changed."""
+    signature = tuple(db.query(
+        func.count(AlignedEvent.id), func.max(AlignedEvent.id), func.max(AlignedEvent.created_at)
+    ).filter(AlignedEvent.session_id == session_id).one())
+    
+    # Incremental alignment updates rows in place, which only the watermark records
+    signature += (db.query(AlignmentWatermark.updated_at).filter(
+        AlignmentWatermark.session_id == session_id
+    ).scalar(),)
+    
+    cached = _event_index_cache.get(session_id)
+    if cached and cached[0] == signature:
+        _event_index_cache.move_to_end(session_id)
+        return cached[1]
+    
+    aligned_events = db.query(AlignedEvent).filter(
+        AlignedEvent.session_id == session_id
+    ).order_by(AlignedEvent.start_time_ms).all()
+    
+    index = IntervalIndex([
+        {
+            "id": event.id,
+            "start_time_ms": event.start_time_ms,
+            "end_time_ms": event.end_time_ms,
+            "speaker": event.speaker,
+            "transcript": event.transcript,
+            "emotions": event.emotions,
+        }
+        for event in aligned_events
+    ])
+    
+    _event_index_cache[session_id] = (signature, index)
+    _event_index_cache.move_to_end(session_id)
+    while len(_event_index_cache) > EVENT_INDEX_CACHE_SIZE:
+        _event_index_cache.popitem(last=False)
+    
+    return index
+
+
+@app.get("/api/sessions/{session_id}/events", response_model=List[AlignedEventResponse])
+async def get_events_at(
+    session_id: int,
+    at: Optional[int] = Query(None, description="Time in milliseconds"),
+    from_ms: Optional[int] = Query(None, alias="from", description="Range start in milliseconds"),
+    to_ms: Optional[int] = Query(None, alias="to", description="Range end in milliseconds"),
+    db: Session = Depends(get_db_session)
+):
+    """Get all aligned events at a time (?at=) or overlapping a time range (?from=&to=)."""
     # Check if session exists
     session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # Get transcription entries
-    transcription_entries = db.query(TranscriptionEntry).filter(
+    if at is not None:
+        if from_ms is not None or to_ms is not None:
+            raise HTTPException(status_code=400, detail="Use either 'at' or 'from'/'to', not both")
+        from_ms = to_ms = at
+    elif from_ms is None or to_ms is None:
+        raise HTTPException(status_code=400, detail="Provide 'at' or both 'from' and 'to'")
+    
+    if from_ms > to_ms:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    
+    return _get_event_index(session_id, db).overlapping(from_ms, to_ms)
+
+
+def _agent_config():
+    """Return the graph configuration of the server's analyses (compiled at startup)."""
+    return {"checkpointer": _checkpointer, "interpreter": _moment_interpreter}
+
+
+def _checkpoint_durability():
+    """Return the LangGraph durability of checkpointed analyses, or None without checkpoints."""
+    return None if _checkpointer is None else ANALYSIS_CHECKPOINTS
+
+
+def _load_analysis_input(session_id: int, db: Session):
+    """Return a session with its transcription and emotion rows, or raise 404/400."""
+    # Check if session exists
+    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # Get transcription entries as plain column rows: unlike ORM instances they
+    # are not expired by the status commit below, so the agent reads them
+    # without lazy reloads
+    transcription_entries = db.query(
+        TranscriptionEntry.start_time_ms,
+        TranscriptionEntry.end_time_ms,
+        TranscriptionEntry.speaker,
+        TranscriptionEntry.transcript,
+    ).filter(
         TranscriptionEntry.session_id == session_id
-    ).order_by(TranscriptionEntry.start_time_ms).all()
+    ).order_by(TranscriptionEntry.start_time_ms, TranscriptionEntry.id).all()
     
     if not transcription_entries:
         raise HTTPException(status_code=400, detail="No transcription data found")
     
     # Get emotion detections
-    emotion_detections = db.query(EmotionDetection).filter(
+    emotion_detections = db.query(
+        EmotionDetection.timestamp_ms,
+        EmotionDetection.emotion,
+        EmotionDetection.confidence,
+    ).filter(
         EmotionDetection.session_id == session_id
-    ).order_by(EmotionDetection.timestamp_ms).all()
+    ).order_by(EmotionDetection.timestamp_ms, EmotionDetection.id).all()
     
     if not emotion_detections:
         raise HTTPException(status_code=400, detail="No emotion data found")
     
-    # Convert to format for agent
-    transcription_data = [
-        {
-            "startTime": f"{entry.start_time_ms // 60000:02d}:{(entry.start_time_ms % 60000) // 1000:02d}.{entry.start_time_ms % 1000:03d}",
-            "endTime": f"{entry.end_time_ms // 60000:02d}:{(entry.end_time_ms % 60000) // 1000:02d}.{entry.end_time_ms % 1000:03d}",
-            "speaker": entry.speaker,
-            "transcript": entry.transcript,
-        }
-        for entry in transcription_entries
-    ]
+    return session, transcription_entries, emotion_detections
+
+
+def _analyze(
+    session: SessionModel,
+    transcription_entries,
+    emotion_detections,
+    db: Session,
+    trace_memory: bool = False,
+    force: bool = False,
+    on_step=None
+):
+    """
+    Analyze a session's loaded input, reusing a stored analysis when possible.
     
-    emotion_data = [
-        {
-            "timestamp": f"{detection.timestamp_ms // 60000:02d}:{(detection.timestamp_ms % 60000) // 1000:02d}.{detection.timestamp_ms % 1000:03d}",
-            "emotion": detection.emotion,
-            "confidence": detection.confidence,
-        }
-        for detection in emotion_detections
-    ]
+    Returns (cached, response): the analyze response and whether it was
+    served from the analysis cache. Raises HTTPException 500 if the agent
+    fails.
+    """
+    session_id = session.id
+    speaker_baselines = None
+    if SPEAKER_BASELINES == "historical":
+        speaker_baselines = _historical_speaker_baselines(session_id, {row.speaker for row in transcription_entries}, db)
+    
+    # Return the stored report if this exact input was analyzed last; after
+    # an analysis of other input the report and speaker statistics are that
+    # analysis's, so the input is analyzed again
+    cache_key = analysis_cache_key(
+        transcription_entries, emotion_detections, ALIGNMENT_WINDOW_MS, engine="graph", scope=session_id,
+        speaker_baselines=speaker_baselines
+    )
+    cached = None if force or trace_memory else _analysis_cache.get(cache_key)
+    if cached is not None:
+        latest_report = db.query(InterpretationReport.id).filter(
+            InterpretationReport.session_id == session_id
+        ).order_by(InterpretationReport.created_at.desc(), InterpretationReport.id.desc()).first()
+        if latest_report is not None and latest_report.id == cached["report_id"]:
+            if session.status != SessionStatus.COMPLETED.value:
+                session.status = SessionStatus.COMPLETED.value
+                db.commit()
+            return True, cached
+        _analysis_cache.invalidate(cache_key)
     
     # Update session status
     session.status = SessionStatus.ANALYZING.value
     db.commit()
     
-    # Run agent analysis
+    # Run agent analysis; checkpointed input must be plain dicts
     try:
-        result = run_interpretation(transcription_data, emotion_data, session_id=session_id)
-        
-        # Save interpretation report
-        report = InterpretationReport(
+        result = run_interpretation_on_records(
+            [row._asdict() for row in transcription_entries],
+            [row._asdict() for row in emotion_detections],
             session_id=session_id,
-            report_data=result.get("report", {}),
-            summary=result.get("report", {}).get("summary"),
-            key_moments=result.get("critical_moments", []),
-            speaker_profiles=result.get("speaker_profiles", {}),
+            trace_memory=trace_memory,
+            on_step=on_step,
+            speaker_baselines=speaker_baselines,
+            **_agent_config(),
+            checkpoint_durability=_checkpoint_durability(),
         )
-        db.add(report)
-        
-        # Update session status
-        session.status = SessionStatus.COMPLETED.value
+        return False, _save_analysis(session, result, cache_key, db)
+    except Exception as e:
+        session.status = SessionStatus.FAILED.value
+        db.commit()
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+
+def _save_analysis(session: SessionModel, result, cache_key: str, db: Session):
+    """Save a finished analysis as the session's report, cache it and return the analyze response."""
+    session_id = session.id
+    
+    # Save interpretation report
+    report = InterpretationReport(
+        session_id=session_id,
+        report_data=result.get("report", {}),
+        summary=result.get("report", {}).get("summary"),
+        key_moments=result.get("critical_moments", []),
+        speaker_profiles=result.get("speaker_profiles", {}),
+        metrics=result.get("metrics", {}),
+    )
+    db.add(report)
+    
+    # Update session status
+    session.status = SessionStatus.COMPLETED.value
+    with _speaker_aggregates_lock:
+        _record_speaker_statistics(session_id, result.get("aligned_events", []), db)
         db.commit()
+    
+    response = {
+        "message": "Analysis completed successfully",
+        "session_id": session_id,
+        "report_id": report.id,
+        "critical_moments_found": len(result.get("critical_moments", [])),
+        "steps_completed": result.get("steps_completed", []),
+        "node_timings_ms": result.get("node_timings", {})
+    }
+    _analysis_cache.put(cache_key, response)
+    
+    return response
+
+
+def _row_statistics(row):
+    """Return the speaker statistics stored in a SpeakerAggregate or SpeakerSessionStatistics row."""
+    return {
+        "utterances": row.utterance_count,
+        "emotions": row.emotion_count,
+        "emotion_counts": row.emotion_counts,
+        "confidence_sums": row.confidence_sums,
+        "confidence_counts": row.confidence_counts,
+    }
+
+
+def _store_statistics(row, statistics):
+    """Write speaker statistics to a SpeakerAggregate or SpeakerSessionStatistics row."""
+    row.utterance_count = statistics["utterances"]
+    row.emotion_count = statistics["emotions"]
+    row.emotion_counts = statistics["emotion_counts"]
+    row.confidence_sums = statistics["confidence_sums"]
+    row.confidence_counts = statistics["confidence_counts"]
+
+
+def _record_speaker_statistics(session_id: int, aligned_events, db: Session):
+    """
+    Add a session's speaker statistics to the speaker aggregates.
+    
+    The statistics of the session's previous analysis, if any, are taken
+    out first, so re-analyzing a session never counts it twice. Only the
+    session's speakers are touched. The caller commits.
+    """
+    statistics = speaker_statistics(aligned_events)
+    previous = {
+        row.speaker: row
+        for row in db.query(SpeakerSessionStatistics).filter(SpeakerSessionStatistics.session_id == session_id)
+    }
+    speakers = set(statistics) | set(previous)
+    aggregates = {
+        row.speaker: row
+        for row in db.query(SpeakerAggregate).filter(SpeakerAggregate.speaker.in_(speakers)).with_for_update()
+    }
+    
+    for speaker in speakers:
+        aggregate = aggregates.get(speaker)
+        if aggregate is None:
+            aggregate = SpeakerAggregate(speaker=speaker, session_count=0)
+            _store_statistics(aggregate, empty_statistics())
+            db.add(aggregate)
+        totals = _row_statistics(aggregate)
         
-        return {
-            "message": "Analysis completed successfully",
-            "session_id": session_id,
-            "report_id": report.id,
-            "critical_moments_found": len(result.get("critical_moments", [])),
-            "steps_completed": result.get("steps_completed", [])
-        }
+        contribution = previous.get(speaker)
+        if contribution is not None:
+            totals = combine_statistics(totals, _row_statistics(contribution), -1)
+            aggregate.session_count -= 1
+        if speaker in statistics:
+            totals = combine_statistics(totals, statistics[speaker])
+            aggregate.session_count += 1
+            if contribution is None:
+                contribution = SpeakerSessionStatistics(session_id=session_id, speaker=speaker)
+                db.add(contribution)
+            _store_statistics(contribution, statistics[speaker])
+        else:
+            db.delete(contribution)
+        
+        if aggregate.session_count:
+            _store_statistics(aggregate, totals)
+        else:
+            db.delete(aggregate)
+
+
+def _historical_speaker_baselines(session_id: int, speakers, db: Session):
+    """Return {speaker: baseline emotion} over each speaker's other analyzed sessions."""
+    own = {
+        row.speaker: row
+        for row in db.query(SpeakerSessionStatistics).filter(SpeakerSessionStatistics.session_id == session_id)
+    }
+    baselines = {}
+    for aggregate in db.query(SpeakerAggregate).filter(SpeakerAggregate.speaker.in_(speakers)):
+        statistics = _row_statistics(aggregate)
+        if aggregate.speaker in own:
+            statistics = combine_statistics(statistics, _row_statistics(own[aggregate.speaker]), -1)
+        baseline = baseline_emotion(statistics)
+        if baseline is not None:
+            baselines[aggregate.speaker] = baseline
+    return baselines
+
+
+@app.post("/api/sessions/{session_id}/analyze", status_code=status.HTTP_201_CREATED)
+def analyze_session(
+    session_id: int,
+    trace_memory: bool = False,
+    force: bool = False,
+    run_async: bool = Query(False, alias="async", description="Run in the background and return a job"),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Run AI agent analysis on a session.
+    
+    If the session's transcription and emotions are unchanged since its
+    latest analysis, the stored report is returned (200, cached=true)
+    without running the agent or saving a new report. force=true always
+    runs a fresh analysis, as does trace_memory=true, which records each
+    node's peak allocation in the run metrics (tracemalloc makes the run
+    noticeably slower).
+    
+    By default the request waits for the analysis. With async=true the
+    input is validated, a job is queued on the analysis pool and 202 is
+    returned with the job id; poll GET /api/jobs/{job_id} for progress.
+    This is a plain (not async) endpoint so FastAPI runs it in its thread
+    pool, keeping the event loop free while an analysis is running.
+    """
+    session, transcription_entries, emotion_detections = _load_analysis_input(session_id, db)
+    
+    if run_async:
+        return _submit_analysis_job(session_id, trace_memory, force, db)
+    
+    cached, response = _analyze(session, transcription_entries, emotion_detections, db, trace_memory, force)
+    if cached:
+        return JSONResponse(status_code=status.HTTP_200_OK, content={**response, "cached": True})
+    return {**response, "cached": False}
+
+
+@app.post("/api/sessions/{session_id}/analyze/resume", status_code=status.HTTP_201_CREATED)
+def resume_session_analysis(
+    session_id: int,
+    trace_memory: bool = False,
+    db: Session = Depends(get_db_session)
+):
+    """
+    Resume a failed analysis of a session from its last completed node.
+    
+    With ANALYSIS_CHECKPOINTS enabled every analysis is checkpointed after
+    each node, keyed by the session id. Resuming skips the nodes that
+    finished before the failure and analyzes the data as it was when the
+    failed run started; run a new analysis to pick up data uploaded since.
+    Only a failed session can be resumed: an analysis that is still running
+    has checkpoints too, but they are not to be resumed (409).
+    """
+    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    if _checkpointer is None:
+        raise HTTPException(status_code=409, detail="Analyses are not checkpointed (set ANALYSIS_CHECKPOINTS)")
+    if session.status != SessionStatus.FAILED.value or not has_resumable_interpretation(session_id, **_agent_config()):
+        raise HTTPException(status_code=409, detail="No failed analysis to resume for this session")
+    
+    # Claim the failed run, so of concurrent resumes only one goes ahead
+    claimed = db.query(SessionModel).filter(
+        SessionModel.id == session_id,
+        SessionModel.status == SessionStatus.FAILED.value
+    ).update({SessionModel.status: SessionStatus.ANALYZING.value}, synchronize_session="fetch")
+    db.commit()
+    if not claimed:
+        raise HTTPException(status_code=409, detail="No failed analysis to resume for this session")
+    
+    try:
+        result = resume_interpretation(
+            session_id, trace_memory=trace_memory, checkpoint_durability=_checkpoint_durability(), **_agent_config()
+        )
+        cache_key = analysis_cache_key(
+            result["transcription_entries"], result["emotion_detections"], ALIGNMENT_WINDOW_MS,
+            engine="graph", scope=session_id, speaker_baselines=result.get("speaker_baselines")
+        )
+        return {**_save_analysis(session, result, cache_key, db), "cached": False, "resumed": True}
+    except NoResumableInterpretation as e:
+        # A new analysis of the session took over the checkpoints and sets the status itself
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         session.status = SessionStatus.FAILED.value
         db.commit()
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
+def _submit_analysis_job(session_id: int, trace_memory: bool, force: bool, db: Session):
+    """Queue a background analysis of a session and return the 202 response."""
+    if not _analysis_job_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=503,
+            detail=f"Too many pending analysis jobs (limit {ANALYSIS_MAX_PENDING_JOBS}), try again later"
+        )
+    
+    try:
+        job = AnalysisJob(session_id=session_id, steps_completed=[], total_steps=len(ENGINE_STEPS["graph"]))
+        db.add(job)
+        db.commit()
+        _analysis_executor.submit(_run_analysis_job, job.id, session_id, trace_memory, force)
+    except Exception:
+        _analysis_job_slots.release()
+        raise
+    
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={
+        "message": "Analysis queued",
+        "session_id": session_id,
+        "job_id": job.id,
+        "status": JobStatus.QUEUED.value,
+        "status_url": f"/api/jobs/{job.id}"
+    })
+
+
+def _run_analysis_job(job_id: int, session_id: int, trace_memory: bool, force: bool):
+    """Run a queued analysis job on the analysis pool, recording its progress."""
+    try:
+        with get_db() as db:
+            job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+            if not job:
+                return
+            job.status = JobStatus.RUNNING.value
+            job.started_at = datetime.utcnow()
+            db.commit()
+            
+            def record_step(name):
+                job.steps_completed = job.steps_completed + [name]
+                db.commit()
+            
+            try:
+                session, transcription_entries, emotion_detections = _load_analysis_input(session_id, db)
+                cached, response = _analyze(
+                    session, transcription_entries, emotion_detections, db, trace_memory, force, on_step=record_step
+                )
+            except Exception as e:
+                job.status = JobStatus.FAILED.value
+                job.error = e.detail if isinstance(e, HTTPException) else f"Analysis failed: {str(e)}"
+            else:
+                job.status = JobStatus.COMPLETED.value
+                job.report_id = response["report_id"]
+                job.result = {**response, "cached": cached}
+                if cached:
+                    job.steps_completed = response["steps_completed"]
+            job.finished_at = datetime.utcnow()
+    finally:
+        _analysis_job_slots.release()
+
+
+@app.get("/api/jobs/{job_id}", response_model=AnalysisJobResponse)
+async def get_analysis_job(job_id: int, db: Session = Depends(get_db_session)):
+    """Get the status, progress and result of a background analysis job."""
+    job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    steps_completed = job.steps_completed or []
+    if job.status == JobStatus.COMPLETED.value:
+        progress = 1.0
+    else:
+        progress = min(len(steps_completed) / job.total_steps, 1.0) if job.total_steps else 0.0
+    
+    return AnalysisJobResponse(
+        id=job.id,
+        session_id=job.session_id,
+        status=job.status,
+        progress=progress,
+        steps_completed=steps_completed,
+        total_steps=job.total_steps,
+        report_id=job.report_id,
+        report_url=f"/api/sessions/{job.session_id}/report" if job.report_id else None,
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
 @app.get("/api/sessions/{session_id}/report", response_model=InterpretationReportResponse)
 async def get_interpretation_report(session_id: int, db: Session = Depends(get_db_session)):
     """Get the interpretation report for a session."""
@@ -352,6 +1050,32 @@ async def get_interpretation_report(session_id: int, db: Session = Depends(get_d
     return report
 
 
+@app.get("/api/sessions/{session_id}/analysis-metrics", response_model=AnalysisMetricsResponse)
+async def get_analysis_metrics(session_id: int, db: Session = Depends(get_db_session)):
+    """Get the per-node agent metrics of the latest analysis of a session."""
+    # Check if session exists
+    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # Get the most recent report
+    report = db.query(InterpretationReport).filter(
+        InterpretationReport.session_id == session_id
+    ).order_by(InterpretationReport.created_at.desc()).first()
+    
+    if not report:
+        raise HTTPException(status_code=404, detail="No report found for this session")
+    if report.metrics is None:
+        raise HTTPException(status_code=404, detail="No metrics recorded for the latest report")
+    
+    return {
+        "session_id": session_id,
+        "report_id": report.id,
+        "created_at": report.created_at,
+        "metrics": report.metrics
+    }
+
+
 @app.get("/api/sessions/{session_id}/report.json")
 async def download_report_json(session_id: int, db: Session = Depends(get_db_session)):
     """Download the interpretation report as JSON."""
@@ -408,6 +1132,31 @@ async def download_report_markdown(session_id: int, db: Session = Depends(get_db
     )
 
 
+@app.get("/api/speakers/{name}/profile", response_model=SpeakerProfileResponse)
+async def get_speaker_profile(name: str, db: Session = Depends(get_db_session)):
+    """
+    Get a speaker's emotional profile over every analyzed session.
+    
+    Served from the speaker's running aggregate, which every completed
+    analysis updates, so the cost does not grow with the number of
+    sessions. A session counts with its latest analysis.
+    """
+    aggregate = db.query(SpeakerAggregate).filter(SpeakerAggregate.speaker == name).first()
+    if not aggregate:
+        raise HTTPException(status_code=404, detail="No analyzed sessions for this speaker")
+    
+    statistics = _row_statistics(aggregate)
+    return SpeakerProfileResponse(
+        speaker=aggregate.speaker,
+        session_count=aggregate.session_count,
+        utterance_count=aggregate.utterance_count,
+        emotion_count=aggregate.emotion_count,
+        emotion_counts=aggregate.emotion_counts,
+        updated_at=aggregate.updated_at,
+        **statistics_profile(statistics),
+    )
+
+
 @app.get("/api/sessions/{session_id}/status")
 async def get_session_status(session_id: int, db: Session = Depends(get_db_session)):
     """Get the current status of a session."""
@@ -0,0 +1,38 @@
+"""Alembic environment of the application database.
+
+init_db runs the migrations on its own connection, passed in
+config.attributes["connection"]; the alembic command line connects to
+DATABASE_URL.
+"""
+
+from alembic import context
+
+from src.models.database import Base
+
+# Modules that add their own tables to Base.metadata
+import src.core.agent.checkpoint  # noqa: F401
+import src.core.agent.interpretation  # noqa: F401
+
+target_metadata = Base.metadata
+
+
+def run_migrations(connection):
+    """Run the migrations on a connection."""
+    context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    from src.utils.database import DATABASE_URL
+
+    context.configure(url=DATABASE_URL, target_metadata=target_metadata, literal_binds=True, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+elif context.config.attributes.get("connection") is not None:
+    run_migrations(context.config.attributes["connection"])
+else:
+    from src.utils.database import engine
+
+    with engine.begin() as connection:
+        run_migrations(connection)
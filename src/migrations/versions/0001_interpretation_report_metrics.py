@@ -0,0 +1,32 @@
+"""Add interpretation_reports.metrics
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases created after the column was added, but before the schema
+    # was versioned, already have it
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("interpretation_reports")}
+    if "metrics" not in columns:
+        op.add_column("interpretation_reports", sa.Column("metrics", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("interpretation_reports", "metrics")
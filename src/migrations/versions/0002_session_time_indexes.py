@@ -0,0 +1,40 @@
+"""Index transcription entries, emotion detections and aligned events by session time
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ("ix_transcription_entries_session_start", "transcription_entries", ["session_id", "start_time_ms"]),
+    ("ix_emotion_detections_session_time", "emotion_detections", ["session_id", "timestamp_ms"]),
+    ("ix_aligned_events_session_start", "aligned_events", ["session_id", "start_time_ms"]),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_all() only adds indexes along with their table, so tables
+    # created by an older version lack them
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if name not in {index["name"] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
@@ -7,7 +7,12 @@ from src.models.database import (
     TranscriptionEntry,
     EmotionDetection,
     AlignedEvent,
+    AlignmentWatermark,
     InterpretationReport,
+    JobStatus,
+    AnalysisJob,
+    SpeakerAggregate,
+    SpeakerSessionStatistics,
 )
 from src.models.schemas import (
     TranscriptionEntryInput,
@@ -18,6 +23,9 @@ from src.models.schemas import (
     SessionResponse,
     AlignedEventResponse,
     InterpretationReportResponse,
+    AnalysisMetricsResponse,
+    AnalysisJobResponse,
+    SpeakerProfileResponse,
     HealthResponse,
 )
 
@@ -28,7 +36,12 @@ __all__ = [
     "TranscriptionEntry",
     "EmotionDetection",
     "AlignedEvent",
+    "AlignmentWatermark",
     "InterpretationReport",
+    "JobStatus",
+    "AnalysisJob",
+    "SpeakerAggregate",
+    "SpeakerSessionStatistics",
     "TranscriptionEntryInput",
     "EmotionDetectionInput",
     "TranscriptionUpload",
@@ -37,5 +50,8 @@ __all__ = [
     "SessionResponse",
     "AlignedEventResponse",
     "InterpretationReportResponse",
+    "AnalysisMetricsResponse",
+    "AnalysisJobResponse",
+    "SpeakerProfileResponse",
     "HealthResponse",
 ]
@@ -4,7 +4,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, Float, JSON
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, Float, JSON
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -21,6 +21,14 @@ class SessionStatus(str, Enum):
     FAILED = "failed"
 
 
+class JobStatus(str, Enum):
+    """Status of a background analysis job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 class Session(Base):
     """Analysis session model."""
     __tablename__ = "sessions"
@@ -36,6 +44,9 @@ class Session(Base):
     emotion_detections = relationship("EmotionDetection", back_populates="session", cascade="all, delete-orphan")
     aligned_events = relationship("AlignedEvent", back_populates="session", cascade="all, delete-orphan")
     interpretation_reports = relationship("InterpretationReport", back_populates="session", cascade="all, delete-orphan")
+    alignment_watermark = relationship("AlignmentWatermark", back_populates="session", uselist=False, cascade="all, delete-orphan")
+    analysis_jobs = relationship("AnalysisJob", back_populates="session", cascade="all, delete-orphan")
+    speaker_statistics = relationship("SpeakerSessionStatistics", back_populates="session", cascade="all, delete-orphan")
 
 
 class TranscriptionEntry(Base):
@@ -52,6 +63,10 @@ class TranscriptionEntry(Base):
     
     # Relationship
     session = relationship("Session", back_populates="transcription_entries")
+    
+    __table_args__ = (
+        Index("ix_transcription_entries_session_start", "session_id", "start_time_ms"),
+    )
 
 
 class EmotionDetection(Base):
@@ -67,6 +82,10 @@ class EmotionDetection(Base):
     
     # Relationship
     session = relationship("Session", back_populates="emotion_detections")
+    
+    __table_args__ = (
+        Index("ix_emotion_detections_session_time", "session_id", "timestamp_ms"),
+    )
 
 
 class AlignedEvent(Base):
@@ -85,6 +104,24 @@ class AlignedEvent(Base):
     
     # Relationship
     session = relationship("Session", back_populates="aligned_events")
+    
+    __table_args__ = (
+        Index("ix_aligned_events_session_start", "session_id", "start_time_ms"),
+    )
+
+
+class AlignmentWatermark(Base):
+    """Last transcription and emotion rows covered by a session's aligned events."""
+    __tablename__ = "alignment_watermarks"
+
+    session_id = Column(Integer, ForeignKey("sessions.id", ondelete="CASCADE"), primary_key=True)
+    last_transcription_entry_id = Column(Integer, nullable=False, default=0)
+    last_emotion_detection_id = Column(Integer, nullable=False, default=0)
+    window_ms = Column(Integer, nullable=False)  # Alignment window the events were built with
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationship
+    session = relationship("Session", back_populates="alignment_watermark")
 
 
 class InterpretationReport(Base):
@@ -97,7 +134,59 @@ class InterpretationReport(Base):
     summary = Column(Text, nullable=True)
     key_moments = Column(JSON, nullable=True)  # List of critical moments
     speaker_profiles = Column(JSON, nullable=True)  # Speaker emotion profiles
+    metrics = Column(JSON, nullable=True)  # Per-node agent metrics for the run
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationship
     session = relationship("Session", back_populates="interpretation_reports")
+
+
+class AnalysisJob(Base):
+    """Background analysis of a session (POST /analyze?async=true)."""
+    __tablename__ = "analysis_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False, index=True)
+    status = Column(String(50), default=JobStatus.QUEUED.value)
+    steps_completed = Column(JSON, nullable=False, default=list)  # Agent steps finished so far
+    total_steps = Column(Integer, nullable=False)
+    report_id = Column(Integer, nullable=True)  # Set once the job completes
+    result = Column(JSON, nullable=True)  # Analyze response of a completed job
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    # Relationship
+    session = relationship("Session", back_populates="analysis_jobs")
+
+
+class SpeakerAggregate(Base):
+    """Running statistics of a speaker over every analyzed session."""
+    __tablename__ = "speaker_aggregates"
+
+    speaker = Column(String(255), primary_key=True)
+    session_count = Column(Integer, nullable=False, default=0)
+    utterance_count = Column(Integer, nullable=False, default=0)
+    emotion_count = Column(Integer, nullable=False, default=0)
+    emotion_counts = Column(JSON, nullable=False, default=dict)  # Detections per emotion label
+    confidence_sums = Column(JSON, nullable=False, default=dict)  # Summed confidence per emotion label
+    confidence_counts = Column(JSON, nullable=False, default=dict)  # Detections with a confidence per label
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class SpeakerSessionStatistics(Base):
+    """A speaker's statistics from a session's latest analysis, as added to their aggregate."""
+    __tablename__ = "speaker_session_statistics"
+
+    session_id = Column(Integer, ForeignKey("sessions.id", ondelete="CASCADE"), primary_key=True)
+    speaker = Column(String(255), primary_key=True)
+    utterance_count = Column(Integer, nullable=False, default=0)
+    emotion_count = Column(Integer, nullable=False, default=0)
+    emotion_counts = Column(JSON, nullable=False, default=dict)
+    confidence_sums = Column(JSON, nullable=False, default=dict)
+    confidence_counts = Column(JSON, nullable=False, default=dict)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationship
+    session = relationship("Session", back_populates="speaker_statistics")
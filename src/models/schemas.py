@@ -7,15 +7,15 @@ from pydantic import BaseModel, Field
 
 class TranscriptionEntryInput(BaseModel):
     """Input model for transcription entry."""
-    startTime: str = Field(..., description="Start time in format MM:SS.mmm")
-    endTime: str = Field(..., description="End time in format MM:SS.mmm")
+    startTime: str = Field(..., description="Start time in format MM:SS.mmm or HH:MM:SS.mmm")
+    endTime: str = Field(..., description="End time in format MM:SS.mmm or HH:MM:SS.mmm")
     speaker: str = Field(..., description="Speaker name")
     transcript: str = Field(..., description="Transcription text")
 
 
 class EmotionDetectionInput(BaseModel):
     """Input model for emotion detection."""
-    timestamp: str = Field(..., description="Timestamp in format MM:SS.mmm")
+    timestamp: str = Field(..., description="Timestamp in format MM:SS.mmm or HH:MM:SS.mmm")
     emotion: str = Field(..., description="Detected emotion")
     confidence: Optional[float] = Field(None, description="Confidence score (0-1)")
 
@@ -74,6 +74,44 @@ class InterpretationReportResponse(BaseModel):
         from_attributes = True
 
 
+class AnalysisMetricsResponse(BaseModel):
+    """Per-node agent metrics recorded with an interpretation report."""
+    session_id: int
+    report_id: int
+    created_at: datetime
+    metrics: Dict[str, Dict[str, Any]]
+
+
+class AnalysisJobResponse(BaseModel):
+    """Status and progress of a background analysis job."""
+    id: int
+    session_id: int
+    status: str
+    progress: float
+    steps_completed: List[str]
+    total_steps: int
+    report_id: Optional[int]
+    report_url: Optional[str]
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+
+class SpeakerProfileResponse(BaseModel):
+    """A speaker's emotional profile over every analyzed session."""
+    speaker: str
+    session_count: int
+    utterance_count: int
+    emotion_count: int
+    baseline_emotion: Optional[str]
+    emotion_counts: Dict[str, int]
+    emotion_distribution: Dict[str, float]
+    average_confidence: Dict[str, float]
+    updated_at: Optional[datetime]
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
     status: str
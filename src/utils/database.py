@@ -1,6 +1,8 @@
 """Database configuration and connection management."""
 
-from sqlalchemy import create_engine
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
 from typing import Generator
@@ -22,10 +24,30 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Alembic scripts of the changes to tables that existing databases already have
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
 
 def init_db():
-    """Initialize database tables."""
-    Base.metadata.create_all(bind=engine)
+    """
+    Initialize database tables.
+    
+    create_all() creates missing tables from the models and from the
+    modules imported so far that add tables to Base.metadata (analysis
+    checkpoints and the interpretation cache). A new database
+    is then stamped with the latest migration; an existing one is migrated
+    to it, so tables created by an older version get their new columns.
+    """
+    with engine.begin() as connection:
+        new_database = not inspect(connection).get_table_names()
+        Base.metadata.create_all(bind=connection)
+        config = Config()
+        config.set_main_option("script_location", MIGRATIONS_DIR)
+        config.attributes["connection"] = connection
+        if new_database:
+            command.stamp(config, "head")
+        else:
+            command.upgrade(config, "head")
 
 
 @contextmanager
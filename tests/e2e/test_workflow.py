@@ -2,9 +2,14 @@
 
 import pytest
 import json
+import threading
+import time
+import uuid
 from pathlib import Path
 from fastapi.testclient import TestClient
+from src import main as main_module
 from src.main import app
+from src.core.agent import ENGINE_STEPS
 from src.utils.database import init_db
 
 
@@ -69,6 +74,14 @@ class TestCompleteWorkflow:
         assert response.status_code == 201
         analysis_result = response.json()
         assert "report_id" in analysis_result
+        assert set(analysis_result["node_timings_ms"]) >= {"temporal_alignment", "report_synthesis"}
+        
+        # Step 5b: Get the metrics persisted with the report
+        response = client.get(f"/api/sessions/{session_id}/analysis-metrics")
+        assert response.status_code == 200
+        metrics = response.json()
+        assert metrics["report_id"] == analysis_result["report_id"]
+        assert metrics["metrics"]["temporal_alignment"]["outputs"]["aligned_events"] == len(transcription_data)
         
         # Step 6: Get report
         response = client.get(f"/api/sessions/{session_id}/report")
@@ -84,6 +97,9 @@ class TestCompleteWorkflow:
         json_report = json.loads(response.content)
         assert "metadata" in json_report
         assert json_report["metadata"]["session_name"] == "Holmes E2E Test"
+        matrices = json_report["emotion_patterns"]["transition_matrices"]
+        assert matrices["global"]["total"] > 0
+        assert set(matrices["by_speaker"]) == set(json_report["speaker_profiles"])
         
         # Step 8: Download Markdown report
         response = client.get(f"/api/sessions/{session_id}/report.md")
@@ -108,6 +124,25 @@ class TestCompleteWorkflow:
         assert response.status_code == 400
         assert "No transcription data found" in response.json()["detail"]
     
+    def test_error_handling_invalid_timestamps(self, setup_database):
+        """Test uploads report every invalid timestamp row and store nothing."""
+        response = client.post("/api/sessions", json={"name": "Bad Timestamps"})
+        session_id = response.json()["id"]
+        
+        response = client.post(
+            f"/api/sessions/{session_id}/emotions",
+            json={"detections": [
+                {"timestamp": "00:01.000", "emotion": "Neutral"},
+                {"timestamp": "1:02", "emotion": "Fear"},
+                {"timestamp": "00:99.000", "emotion": "Joy"},
+            ]}
+        )
+        assert response.status_code == 422
+        assert [error["row"] for error in response.json()["detail"]] == [1, 2]
+        
+        response = client.get(f"/api/sessions/{session_id}/status")
+        assert response.json()["data"]["emotion_detections"] == 0
+    
     def test_error_handling_missing_session(self):
         """Test error handling for non-existent session."""
         response = client.get("/api/sessions/99999/status")
@@ -133,6 +168,22 @@ class TestCompleteWorkflow:
 class TestAPIEndpoints:
     """Test individual API endpoints."""
     
+    def test_startup_compiles_the_analysis_agent(self, setup_database):
+        """Test that analyses use the agent compiled at startup instead of compiling their own."""
+        import asyncio
+        from src.core.agent import agent as agent_module
+        from src.core.agent import clear_agent_cache
+        
+        clear_agent_cache()
+        asyncio.run(main_module.startup_event())
+        agents = dict(agent_module._agent_cache)
+        assert len(agents) == 1
+        
+        session_id = TestAnalysisJobs()._create_session("Warm Agent")
+        response = client.post(f"/api/sessions/{session_id}/analyze")
+        assert response.status_code == 201
+        assert agent_module._agent_cache == agents
+    
     def test_health_check(self):
         """Test health check endpoint."""
         response = client.get("/health")
@@ -168,6 +219,451 @@ class TestAPIEndpoints:
         assert retrieved["name"] == "Test Session"
 
 
+class TestEventLookup:
+    """Test time-point and time-range event lookups."""
+    
+    def test_events_at_and_range(self, setup_database):
+        """Test ?at= and ?from=&to= return every overlapping aligned event."""
+        response = client.post("/api/sessions", json={"name": "Event Lookup"})
+        session_id = response.json()["id"]
+        
+        transcription = [
+            {"startTime": "00:00.000", "endTime": "00:10.000", "speaker": "A", "transcript": "Long"},
+            {"startTime": "00:05.000", "endTime": "00:07.000", "speaker": "B", "transcript": "Overlap"},
+            {"startTime": "00:12.000", "endTime": "00:15.000", "speaker": "A", "transcript": "Later"},
+        ]
+        emotions = [{"timestamp": "00:06.000", "emotion": "Surprise", "confidence": 0.9}]
+        client.post(f"/api/sessions/{session_id}/transcription", json={"entries": transcription})
+        client.post(f"/api/sessions/{session_id}/emotions", json={"detections": emotions})
+        client.post(f"/api/sessions/{session_id}/align")
+        
+        response = client.get(f"/api/sessions/{session_id}/events", params={"at": 6000})
+        assert response.status_code == 200
+        assert [e["transcript"] for e in response.json()] == ["Long", "Overlap"]
+        
+        response = client.get(f"/api/sessions/{session_id}/events", params={"from": 9000, "to": 13000})
+        assert response.status_code == 200
+        assert [e["transcript"] for e in response.json()] == ["Long", "Later"]
+        
+        # Re-aligning with new data invalidates the cached index
+        client.post(f"/api/sessions/{session_id}/transcription", json={"entries": transcription[:1]})
+        client.post(f"/api/sessions/{session_id}/align")
+        response = client.get(f"/api/sessions/{session_id}/events", params={"at": 6000})
+        assert [e["transcript"] for e in response.json()] == ["Long"]
+    
+    def test_events_invalid_parameters(self, setup_database):
+        """Test missing, conflicting and inverted parameters are rejected."""
+        response = client.post("/api/sessions", json={"name": "Event Lookup Errors"})
+        session_id = response.json()["id"]
+        
+        assert client.get(f"/api/sessions/{session_id}/events").status_code == 400
+        assert client.get(f"/api/sessions/{session_id}/events", params={"from": 10}).status_code == 400
+        assert client.get(f"/api/sessions/{session_id}/events", params={"at": 1, "from": 0, "to": 5}).status_code == 400
+        assert client.get(f"/api/sessions/{session_id}/events", params={"from": 10, "to": 5}).status_code == 400
+        assert client.get("/api/sessions/99999/events", params={"at": 0}).status_code == 404
+
+
+class TestIncrementalAlignment:
+    """Test incremental re-alignment of appended live data."""
+    
+    def test_incremental_matches_full_and_keeps_untouched_rows(self, setup_database):
+        """Test appended rows update only affected events and match a full alignment."""
+        response = client.post("/api/sessions", json={"name": "Live Session"})
+        session_id = response.json()["id"]
+        
+        client.post(f"/api/sessions/{session_id}/transcription", json={"entries": [
+            {"startTime": "00:00.000", "endTime": "00:04.000", "speaker": "A", "transcript": "First"},
+            {"startTime": "00:05.000", "endTime": "00:09.000", "speaker": "B", "transcript": "Second"},
+        ]})
+        client.post(f"/api/sessions/{session_id}/emotions", json={"detections": [
+            {"timestamp": "00:02.000", "emotion": "Neutral", "confidence": 0.8},
+            {"timestamp": "00:06.000", "emotion": "Joy", "confidence": 0.7},
+        ]})
+        response = client.post(f"/api/sessions/{session_id}/align", params={"incremental": True})
+        assert response.json()["mode"] == "full"
+        before = {e["transcript"]: e for e in client.get(f"/api/sessions/{session_id}/aligned-events").json()}
+        
+        # Append a late detection for "Second" and a new segment with its detection
+        client.post(f"/api/sessions/{session_id}/transcription", params={"append": True}, json={"entries": [
+            {"startTime": "00:10.000", "endTime": "00:12.000", "speaker": "A", "transcript": "Third"},
+        ]})
+        client.post(f"/api/sessions/{session_id}/emotions", params={"append": True}, json={"detections": [
+            {"timestamp": "00:08.000", "emotion": "Fear", "confidence": 0.9},
+            {"timestamp": "00:11.000", "emotion": "Surprise", "confidence": 0.6},
+        ]})
+        response = client.post(f"/api/sessions/{session_id}/align", params={"incremental": True})
+        result = response.json()
+        assert result["mode"] == "incremental"
+        assert result["created"] == 1
+        assert result["updated"] == 1
+        assert result["aligned_events_count"] == 3
+        
+        after = client.get(f"/api/sessions/{session_id}/aligned-events").json()
+        by_transcript = {e["transcript"]: e for e in after}
+        assert by_transcript["First"] == before["First"]
+        assert by_transcript["Second"]["id"] == before["Second"]["id"]
+        assert [e["emotion"] for e in by_transcript["Second"]["emotions"]] == ["Joy", "Fear"]
+        
+        # Nothing new: no rows change
+        response = client.post(f"/api/sessions/{session_id}/align", params={"incremental": True})
+        assert response.json()["created"] == 0
+        assert response.json()["updated"] == 0
+        
+        # A full alignment produces the same events
+        client.post(f"/api/sessions/{session_id}/align")
+        full = client.get(f"/api/sessions/{session_id}/aligned-events").json()
+        strip = lambda events: [{k: v for k, v in e.items() if k != "id"} for e in events]
+        assert strip(full) == strip(after)
+    
+    def test_replacing_upload_forces_full_alignment(self, setup_database):
+        """Test a replacing upload resets the watermark."""
+        response = client.post("/api/sessions", json={"name": "Replaced Session"})
+        session_id = response.json()["id"]
+        entries = [{"startTime": "00:00.000", "endTime": "00:04.000", "speaker": "A", "transcript": "Only"}]
+        detections = [{"timestamp": "00:02.000", "emotion": "Neutral"}]
+        
+        client.post(f"/api/sessions/{session_id}/transcription", json={"entries": entries})
+        client.post(f"/api/sessions/{session_id}/emotions", json={"detections": detections})
+        client.post(f"/api/sessions/{session_id}/align")
+        client.post(f"/api/sessions/{session_id}/emotions", json={"detections": detections})
+        
+        response = client.post(f"/api/sessions/{session_id}/align", params={"incremental": True})
+        assert response.json()["mode"] == "full"
+
+
+class TestAlignmentWindows:
+    """Test multi-window alignment and comparison endpoints."""
+    
+    def test_windows_and_compare(self, setup_database):
+        """Test per-window events and counts for a session."""
+        response = client.post("/api/sessions", json={"name": "Window Tuning"})
+        session_id = response.json()["id"]
+        client.post(f"/api/sessions/{session_id}/transcription", json={"entries": [
+            {"startTime": "00:01.000", "endTime": "00:02.000", "speaker": "A", "transcript": "Hi"},
+        ]})
+        client.post(f"/api/sessions/{session_id}/emotions", json={"detections": [
+            {"timestamp": "00:01.500", "emotion": "Neutral"},
+            {"timestamp": "00:02.080", "emotion": "Joy"},
+            {"timestamp": "00:02.400", "emotion": "Fear"},
+        ]})
+        
+        response = client.get(
+            f"/api/sessions/{session_id}/alignment-windows", params={"windows": [0, 100, 500]}
+        )
+        assert response.status_code == 200
+        windows = response.json()["windows"]
+        assert [w["window_ms"] for w in windows] == [0, 100, 500]
+        assert [w["match_count"] for w in windows] == [1, 2, 3]
+        assert [e["emotion"] for e in windows[1]["aligned_events"][0]["emotions"]] == ["Neutral", "Joy"]
+        
+        response = client.get(f"/api/sessions/{session_id}/alignment-windows/compare")
+        assert response.status_code == 200
+        comparison = response.json()["windows"]
+        assert [w["window_ms"] for w in comparison] == [0, 50, 100, 250, 500]
+        assert [w["unmatched_detections"] for w in comparison] == [2, 2, 1, 1, 0]
+        assert comparison[0]["added_matches"] is None
+        assert comparison[-1]["added_matches"] == 1
+        
+        response = client.get(f"/api/sessions/{session_id}/alignment-windows", params={"windows": [-5]})
+        assert response.status_code == 400
+
+
+class TestAnalysisCache:
+    """Test reuse of stored analyses for unchanged sessions."""
+    
+    def test_unchanged_session_returns_stored_report(self, setup_database):
+        """Test a repeated analysis is served from the cache until forced or the data changes."""
+        response = client.post("/api/sessions", json={"name": "Cached Analysis"})
+        session_id = response.json()["id"]
+        client.post(f"/api/sessions/{session_id}/transcription", json={"entries": [
+            {"startTime": "00:00.000", "endTime": "00:04.000", "speaker": "A", "transcript": "Calm"},
+            {"startTime": "00:05.000", "endTime": "00:09.000", "speaker": "A", "transcript": "Scared"},
+        ]})
+        client.post(f"/api/sessions/{session_id}/emotions", json={"detections": [
+            {"timestamp": "00:02.000", "emotion": "Neutral", "confidence": 0.8},
+            {"timestamp": "00:06.000", "emotion": "Fear", "confidence": 0.9},
+        ]})
+        
+        first = client.post(f"/api/sessions/{session_id}/analyze")
+        assert first.status_code == 201
+        assert first.json()["cached"] is False
+        
+        second = client.post(f"/api/sessions/{session_id}/analyze")
+        assert second.status_code == 200
+        assert second.json()["cached"] is True
+        assert second.json()["report_id"] == first.json()["report_id"]
+        
+        forced = client.post(f"/api/sessions/{session_id}/analyze", params={"force": True})
+        assert forced.status_code == 201
+        assert forced.json()["report_id"] != first.json()["report_id"]
+        
+        # The forced run is now the stored analysis for this input
+        response = client.post(f"/api/sessions/{session_id}/analyze")
+        assert response.json()["report_id"] == forced.json()["report_id"]
+        
+        # New data changes the key
+        client.post(f"/api/sessions/{session_id}/emotions", params={"append": True}, json={"detections": [
+            {"timestamp": "00:07.000", "emotion": "Anger", "confidence": 0.7},
+        ]})
+        response = client.post(f"/api/sessions/{session_id}/analyze")
+        assert response.status_code == 201
+        assert response.json()["cached"] is False
+    
+    def test_returning_to_earlier_input_analyzes_again(self, setup_database):
+        """Test that input analyzed before, but not last, gets a new latest report."""
+        speaker = f"Reverted {uuid.uuid4().hex}"
+        response = client.post("/api/sessions", json={"name": "Reverted Analysis"})
+        session_id = response.json()["id"]
+        client.post(f"/api/sessions/{session_id}/transcription", json={"entries": [
+            {"startTime": "00:00.000", "endTime": "00:04.000", "speaker": speaker, "transcript": "Well"},
+        ]})
+        first_emotions = [{"timestamp": "00:02.000", "emotion": "Fear", "confidence": 0.9}]
+        second_emotions = [{"timestamp": "00:02.000", "emotion": "Joy", "confidence": 0.9}]
+        
+        client.post(f"/api/sessions/{session_id}/emotions", json={"detections": first_emotions})
+        first = client.post(f"/api/sessions/{session_id}/analyze").json()
+        client.post(f"/api/sessions/{session_id}/emotions", json={"detections": second_emotions})
+        second = client.post(f"/api/sessions/{session_id}/analyze").json()
+        assert second["report_id"] != first["report_id"]
+        
+        client.post(f"/api/sessions/{session_id}/emotions", json={"detections": first_emotions})
+        response = client.post(f"/api/sessions/{session_id}/analyze")
+        assert response.status_code == 201
+        assert response.json()["cached"] is False
+        report_id = response.json()["report_id"]
+        assert report_id not in (first["report_id"], second["report_id"])
+        
+        report = client.get(f"/api/sessions/{session_id}/report").json()
+        assert report["id"] == report_id
+        assert report["speaker_profiles"][speaker]["baseline_emotion"] == "Fear"
+        patterns = client.get(f"/api/sessions/{session_id}/report.json").json()["emotion_patterns"]
+        assert patterns["by_speaker"][speaker]["dominantEmotion"] == "Fear"
+        profile = client.get(f"/api/speakers/{speaker}/profile").json()
+        assert profile["session_count"] == 1 and profile["emotion_counts"] == {"Fear": 1}
+        
+        # Analyzing the same input again is served from the cache
+        response = client.post(f"/api/sessions/{session_id}/analyze")
+        assert response.status_code == 200
+        assert response.json()["report_id"] == report_id
+
+
+class TestAnalysisJobs:
+    """Test background analysis jobs."""
+    
+    def _create_session(self, name):
+        response = client.post("/api/sessions", json={"name": name})
+        session_id = response.json()["id"]
+        client.post(f"/api/sessions/{session_id}/transcription", json={"entries": [
+            {"startTime": "00:00.000", "endTime": "00:04.000", "speaker": "A", "transcript": "Calm"},
+            {"startTime": "00:05.000", "endTime": "00:09.000", "speaker": "A", "transcript": "Scared"},
+        ]})
+        client.post(f"/api/sessions/{session_id}/emotions", json={"detections": [
+            {"timestamp": "00:02.000", "emotion": "Neutral"},
+            {"timestamp": "00:06.000", "emotion": "Fear"},
+        ]})
+        return session_id
+    
+    def _wait_for(self, job_id, timeout_s=30):
+        deadline = time.monotonic() + timeout_s
+        while time.monotonic() < deadline:
+            job = client.get(f"/api/jobs/{job_id}").json()
+            if job["status"] in ("completed", "failed"):
+                return job
+            time.sleep(0.05)
+        raise AssertionError(f"Job {job_id} did not finish")
+    
+    def test_async_analysis_reports_progress_and_result(self, setup_database):
+        """Test async=true queues a job whose result links to the report."""
+        session_id = self._create_session("Async Analysis")
+        
+        response = client.post(f"/api/sessions/{session_id}/analyze", params={"async": True})
+        assert response.status_code == 202
+        queued = response.json()
+        assert queued["status_url"] == f"/api/jobs/{queued['job_id']}"
+        
+        job = self._wait_for(queued["job_id"])
+        assert job["status"] == "completed"
+        assert job["progress"] == 1.0
+        assert sorted(job["steps_completed"]) == sorted(ENGINE_STEPS["graph"])
+        assert job["result"]["critical_moments_found"] == 1
+        
+        response = client.get(job["report_url"])
+        assert response.status_code == 200
+        assert response.json()["id"] == job["report_id"]
+        assert client.get(f"/api/sessions/{session_id}").json()["status"] == "completed"
+    
+    def test_async_analysis_validates_before_queueing(self, setup_database):
+        """Test missing sessions and data are rejected without creating a job."""
+        response = client.post("/api/sessions/999999/analyze", params={"async": True})
+        assert response.status_code == 404
+        
+        response = client.post("/api/sessions", json={"name": "Empty Async"})
+        response = client.post(f"/api/sessions/{response.json()['id']}/analyze", params={"async": True})
+        assert response.status_code == 400
+    
+    def test_full_queue_is_rejected(self, setup_database, monkeypatch):
+        """Test submissions beyond the pending job limit get 503."""
+        session_id = self._create_session("Busy Queue")
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        monkeypatch.setattr(main_module, "_analysis_job_slots", slots)
+        
+        response = client.post(f"/api/sessions/{session_id}/analyze", params={"async": True})
+        assert response.status_code == 503
+    
+    def test_missing_job(self, setup_database):
+        """Test unknown job ids return 404."""
+        response = client.get("/api/jobs/999999")
+        assert response.status_code == 404
+
+
+class TestResumeAnalysis:
+    """Test resuming failed analyses from their checkpoints."""
+    
+    def _set_status(self, session_id, status):
+        with main_module.get_db() as db:
+            db.query(main_module.SessionModel).filter(main_module.SessionModel.id == session_id).update({"status": status})
+    
+    def test_failed_analysis_resumes(self, setup_database, monkeypatch):
+        """Test a failed analysis can be resumed once, producing a report."""
+        from src.core.agent import agent as agent_module
+        from src.core.agent import SQLCheckpointSaver, clear_agent_cache
+        
+        monkeypatch.setattr(main_module, "ANALYSIS_CHECKPOINTS", "sync")
+        monkeypatch.setattr(main_module, "_checkpointer", SQLCheckpointSaver(main_module.engine))
+        session_id = TestAnalysisJobs()._create_session("Resumed Analysis")
+        
+        response = client.post(f"/api/sessions/{session_id}/analyze/resume")
+        assert response.status_code == 409
+        
+        def fail(state, interpreter=None):
+            raise RuntimeError("interpretation backend unavailable")
+        
+        clear_agent_cache()
+        try:
+            with monkeypatch.context() as patch:
+                patch.setattr(agent_module, "interpret_moments", fail)
+                response = client.post(f"/api/sessions/{session_id}/analyze")
+            assert response.status_code == 500
+            assert client.get(f"/api/sessions/{session_id}").json()["status"] == "failed"
+        finally:
+            clear_agent_cache()
+        
+        # Checkpoints of a run that is still in progress are not resumed
+        self._set_status(session_id, "analyzing")
+        response = client.post(f"/api/sessions/{session_id}/analyze/resume")
+        assert response.status_code == 409
+        assert client.get(f"/api/sessions/{session_id}").json()["status"] == "analyzing"
+        self._set_status(session_id, "failed")
+        
+        response = client.post(f"/api/sessions/{session_id}/analyze/resume")
+        assert response.status_code == 201
+        result = response.json()
+        assert result["resumed"] is True
+        assert result["critical_moments_found"] == 1
+        assert len(result["steps_completed"]) == len(ENGINE_STEPS["graph"])
+        assert client.get(f"/api/sessions/{session_id}/report").json()["id"] == result["report_id"]
+        
+        # The resumed analysis is cached like any other, and nothing is left to resume
+        response = client.post(f"/api/sessions/{session_id}/analyze")
+        assert response.json()["report_id"] == result["report_id"]
+        response = client.post(f"/api/sessions/{session_id}/analyze/resume")
+        assert response.status_code == 409
+    
+    def test_resume_after_another_run_took_over(self, setup_database, monkeypatch):
+        """Test that a resume finding its checkpoints gone returns 409 and leaves the status alone."""
+        from src.core.agent import NoResumableInterpretation
+        
+        def taken_over(session_id, *args, **kwargs):
+            self._set_status(session_id, "completed")
+            raise NoResumableInterpretation(f"No unfinished analysis to resume for session {session_id}")
+        
+        monkeypatch.setattr(main_module, "_checkpointer", object())
+        monkeypatch.setattr(main_module, "has_resumable_interpretation", lambda *args, **kwargs: True)
+        monkeypatch.setattr(main_module, "resume_interpretation", taken_over)
+        session_id = TestAnalysisJobs()._create_session("Taken Over Analysis")
+        self._set_status(session_id, "failed")
+        
+        response = client.post(f"/api/sessions/{session_id}/analyze/resume")
+        assert response.status_code == 409
+        assert client.get(f"/api/sessions/{session_id}").json()["status"] == "completed"
+    
+    def test_resume_missing_session(self, setup_database):
+        """Test resuming an unknown session returns 404."""
+        response = client.post("/api/sessions/999999/analyze/resume")
+        assert response.status_code == 404
+    
+    def test_checkpoints_are_opt_in(self, setup_database, monkeypatch):
+        """Test that without ANALYSIS_CHECKPOINTS there is nothing to resume."""
+        monkeypatch.setattr(main_module, "_checkpointer", None)
+        session_id = TestAnalysisJobs()._create_session("Unchecked Analysis")
+        
+        response = client.post(f"/api/sessions/{session_id}/analyze/resume")
+        assert response.status_code == 409
+        assert "ANALYSIS_CHECKPOINTS" in response.json()["detail"]
+
+
+class TestSpeakerProfiles:
+    """Test the cross-session speaker aggregates."""
+    
+    def _create_session(self, speaker, emotions):
+        response = client.post("/api/sessions", json={"name": f"Profile {speaker}"})
+        session_id = response.json()["id"]
+        client.post(f"/api/sessions/{session_id}/transcription", json={"entries": [
+            {"startTime": f"00:{2 * i:02d}.000", "endTime": f"00:{2 * i + 1:02d}.000", "speaker": speaker, "transcript": f"Line {i}"}
+            for i in range(len(emotions))
+        ]})
+        client.post(f"/api/sessions/{session_id}/emotions", json={"detections": [
+            {"timestamp": f"00:{2 * i:02d}.500", "emotion": emotion, "confidence": 0.5}
+            for i, emotion in enumerate(emotions)
+        ]})
+        return session_id
+    
+    def test_profile_adds_up_sessions(self, setup_database):
+        """Test the profile sums every session once, also after a forced re-analysis."""
+        speaker = f"Speaker {uuid.uuid4().hex}"
+        first = self._create_session(speaker, ["Neutral", "Neutral", "Fear"])
+        second = self._create_session(speaker, ["Joy", "Neutral"])
+        
+        response = client.get(f"/api/speakers/{speaker}/profile")
+        assert response.status_code == 404
+        
+        client.post(f"/api/sessions/{first}/analyze")
+        client.post(f"/api/sessions/{second}/analyze")
+        client.post(f"/api/sessions/{first}/analyze", params={"force": True})
+        
+        response = client.get(f"/api/speakers/{speaker}/profile")
+        assert response.status_code == 200
+        profile = response.json()
+        assert profile["session_count"] == 2
+        assert profile["utterance_count"] == 5
+        assert profile["emotion_counts"] == {"Neutral": 3, "Fear": 1, "Joy": 1}
+        assert profile["baseline_emotion"] == "Neutral"
+        assert profile["emotion_distribution"]["Neutral"] == 0.6
+        assert profile["average_confidence"]["Fear"] == 0.5
+    
+    def test_historical_baselines(self, setup_database, monkeypatch):
+        """Test SPEAKER_BASELINES=historical anchors anomalies to earlier sessions."""
+        speaker = f"Speaker {uuid.uuid4().hex}"
+        earlier = self._create_session(speaker, ["Neutral", "Neutral", "Neutral"])
+        client.post(f"/api/sessions/{earlier}/analyze")
+        
+        # Fear dominates this session, so only the historical baseline flags it
+        session_id = self._create_session(speaker, ["Fear", "Fear", "Neutral"])
+        response = client.post(f"/api/sessions/{session_id}/analyze")
+        assert response.json()["critical_moments_found"] == 0
+        
+        monkeypatch.setattr(main_module, "SPEAKER_BASELINES", "historical")
+        response = client.post(f"/api/sessions/{session_id}/analyze")
+        assert response.status_code == 201
+        assert response.json()["cached"] is False
+        assert response.json()["critical_moments_found"] == 2
+        
+        # The session's own statistics never feed its baseline
+        response = client.post(f"/api/sessions/{session_id}/analyze")
+        assert response.json()["cached"] is True
+
+
 class TestPerformance:
     """Test performance targets."""
     
@@ -0,0 +1,86 @@
+"""Record factories and example loaders shared by the test modules."""
+
+import glob
+import json
+import os
+import random
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "examples")
+
+# Everything an analysis produces; steps and timings name different stages
+RESULT_KEYS = ("emotion_patterns", "anomalies", "critical_moments", "speaker_profiles", "interpretation", "report")
+
+
+def example_names():
+    """Return the names of the example sessions with both input files."""
+    paths = glob.glob(os.path.join(EXAMPLES_DIR, "transcription_*.json"))
+    names = [os.path.basename(path)[len("transcription_"):-len(".json")] for path in paths]
+    return sorted(name for name in names if os.path.exists(os.path.join(EXAMPLES_DIR, f"emotion_analysis_{name}.json")))
+
+
+def load_example(name):
+    """Load an example session's transcription and emotion analysis."""
+    with open(os.path.join(EXAMPLES_DIR, f"transcription_{name}.json")) as f:
+        transcription = json.load(f)
+    with open(os.path.join(EXAMPLES_DIR, f"emotion_analysis_{name}.json")) as f:
+        emotions = json.load(f)
+    return transcription, emotions
+
+
+def random_records(
+    seed,
+    segments=40,
+    detections=300,
+    span_ms=60000,
+    max_length_ms=4000,
+    speakers=3,
+    labels=("Neutral", "Fear", "Joy"),
+    confidences=None,
+    sort=False,
+    sequential=False,
+):
+    """
+    Build random millisecond transcription and emotion records.
+
+    Segments start anywhere in [500, span_ms + 500), so they overlap, and a
+    few end before they start; with sequential=True they follow each other
+    in order, some overlapping the previous one by up to 200 ms. Detections fall anywhere from time
+    zero to past the last segment, so some match no segment. Confidences
+    are uniform in [0, 1), or drawn from confidences. With sort=True
+    segments are ordered by start and detections by time.
+    """
+    rng = random.Random(seed)
+    transcription = []
+    start = 500
+    for i in range(segments):
+        if sequential:
+            length = rng.randrange(500, max_length_ms)
+        else:
+            start = 500 + rng.randrange(0, span_ms)
+            length = rng.randrange(-300, max_length_ms)
+        transcription.append({
+            "start_time_ms": start,
+            "end_time_ms": start + length,
+            "speaker": f"Speaker {i % speakers}",
+            "transcript": f"Segment {i}",
+        })
+        if sequential:
+            start += length + rng.randrange(-200, 600)
+    end_ms = max((entry["end_time_ms"] for entry in transcription), default=0)
+    emotions = [
+        {
+            "timestamp_ms": rng.randrange(0, end_ms + 1500),
+            "emotion": rng.choice(labels),
+            "confidence": rng.random() if confidences is None else rng.choice(confidences),
+        }
+        for _ in range(detections)
+    ]
+    if sort:
+        transcription.sort(key=lambda record: record["start_time_ms"])
+        emotions.sort(key=lambda record: record["timestamp_ms"])
+    return transcription, emotions
+
+
+def random_session(seed, segments=300, speakers=4, labels=("Neutral", "Fear", "Joy", "Surprise", "anxious", "Anger")):
+    """Random time-ordered session of consecutive turns with six detections per segment."""
+    return random_records(seed, segments, segments * 6, speakers=speakers, labels=labels, sort=True, sequential=True)
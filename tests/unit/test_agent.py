@@ -1,14 +1,20 @@
 """Unit tests for agent nodes."""
 
+import threading
+
 import pytest
+from src.core.agent import agent as agent_module
 from src.core.agent import (
+    get_interpretation_agent,
     perform_temporal_alignment,
+    build_speaker_index,
     analyze_emotion_patterns,
     detect_anomalies,
     interpret_moments,
     create_speaker_profiles,
     synthesize_report,
     run_interpretation,
+    run_interpretation_on_records,
 )
 
 
@@ -38,6 +44,38 @@ class TestAgentNodes:
         assert len(result["aligned_events"]) == 1
         assert "temporal_alignment" in result["steps_completed"]
     
+    def test_speaker_index_node(self):
+        """Test grouping events and emotions by speaker in one pass."""
+        state = {
+            "aligned_events": [
+                {"speaker": "A", "transcript": "1", "emotions": [{"emotion": "Joy", "timestamp_ms": 1000}]},
+                {"speaker": "B", "transcript": "2", "emotions": []},
+                {"speaker": "A", "transcript": "3", "emotions": [
+                    {"emotion": "Fear", "timestamp_ms": 2000, "timestamp": "00:02.000"},
+                    {"emotion": "Fear", "timestamp_ms": 2500}
+                ]}
+            ],
+            "steps_completed": []
+        }
+        
+        result = build_speaker_index(state)
+        
+        index = result["speaker_index"]
+        assert list(index) == ["A", "B"]
+        assert index["A"]["event_indices"] == [0, 2]
+        assert index["A"]["pattern"] == {
+            "totalEmotions": 3,
+            "dominantEmotion": "Fear",
+            "emotionCounts": {"Joy": 1, "Fear": 2},
+            "emotionSequence": [
+                {"timestamp_ms": 1000, "emotion": "Joy"},
+                {"timestamp_ms": 2000, "emotion": "Fear"},
+                {"timestamp_ms": 2500, "emotion": "Fear"}
+            ]
+        }
+        assert index["B"]["pattern"]["dominantEmotion"] is None
+        assert result["steps_completed"] == ["speaker_indexing"]
+    
     def test_pattern_analysis_node(self):
         """Test the emotion pattern analysis node."""
         state = {
@@ -94,6 +132,66 @@ class TestAgentNodes:
         assert result["anomalies"][0]["emotion"] == "Fear"
         assert "anomaly_detection" in result["steps_completed"]
     
+    def test_moment_interpretation_uses_source_event(self):
+        """Test that moments use the anomaly's own segment when timestamps collide."""
+        state = {
+            "aligned_events": [
+                {"speaker": "Holmes", "transcript": "First", "start_time_ms": 0, "end_time_ms": 5000,
+                 "emotions": [{"emotion": "Neutral", "timestamp_ms": 5000}]},
+                {"speaker": "Watson", "transcript": "Second", "start_time_ms": 5000, "end_time_ms": 9000,
+                 "emotions": [{"emotion": "Fear", "timestamp_ms": 5000}]}
+            ],
+            "emotion_patterns": {"by_speaker": {"Holmes": {"dominantEmotion": "Neutral"}}},
+            "steps_completed": []
+        }
+        state.update(detect_anomalies(state))
+        
+        result = interpret_moments(state)
+        
+        assert [m["transcript"] for m in result["critical_moments"]] == ["Second"]
+    
+    def test_moment_interpretation_without_event_reference(self):
+        """Test the timestamp lookup for anomalies that carry no event reference."""
+        state = {
+            "aligned_events": [
+                {"speaker": "Holmes", "transcript": "Test statement", "start_time_ms": 0, "end_time_ms": 9000,
+                 "emotions": [{"emotion": "Surprise", "timestamp_ms": 5000}]}
+            ],
+            "anomalies": [
+                {"timestamp_ms": 5000, "speaker": "Holmes", "emotion": "Surprise", "severity": "high"},
+                {"timestamp_ms": 7000, "speaker": "Holmes", "emotion": "Fear", "severity": "high"}
+            ],
+            "steps_completed": []
+        }
+        
+        result = interpret_moments(state)
+        
+        assert [m["timestamp_ms"] for m in result["critical_moments"]] == [5000]
+        assert "caught off guard" in result["critical_moments"][0]["interpretation"]
+    
+    def test_nodes_normalize_emotion_labels(self):
+        """Test that label variants are treated as one emotion."""
+        state = perform_temporal_alignment({
+            "transcription_entries": [
+                {"startTime": "00:00.000", "endTime": "00:02.000", "speaker": "Holmes", "transcript": "One"},
+                {"startTime": "00:03.000", "endTime": "00:05.000", "speaker": "Holmes", "transcript": "Two"},
+                {"startTime": "00:06.000", "endTime": "00:08.000", "speaker": "Holmes", "transcript": "Three"}
+            ],
+            "emotion_detections": [
+                {"timestamp": "00:01.000", "emotion": "neutral"},
+                {"timestamp": "00:04.000", "emotion": "Neutral"},
+                {"timestamp": "00:07.000", "emotion": "scared"}
+            ],
+            "steps_completed": []
+        })
+        state.update(analyze_emotion_patterns(state))
+        
+        result = detect_anomalies(state)
+        
+        transitions = state["emotion_patterns"]["transitions"]
+        assert [(t["from_emotions"], t["to_emotions"]) for t in transitions] == [(["Neutral"], ["Fear"])]
+        assert [(a["emotion"], a["baseline"]) for a in result["anomalies"]] == [("Fear", "Neutral")]
+    
     def test_speaker_profiling_node(self):
         """Test the speaker profiling node."""
         state = {
@@ -147,6 +245,29 @@ class TestAgentNodes:
         assert "report" in result
         assert "summary" in result["report"]
         assert "report_synthesis" in result["steps_completed"]
+    
+    def test_report_formats_emotion_sequences(self):
+        """Test that the report carries MM:SS.mmm sequence timestamps."""
+        pattern = {
+            "totalEmotions": 1,
+            "dominantEmotion": "Joy",
+            "emotionCounts": {"Joy": 1},
+            "emotionSequence": [{"timestamp_ms": 61500, "emotion": "Joy"}]
+        }
+        state = {
+            "critical_moments": [],
+            "speaker_profiles": {},
+            "emotion_patterns": {"by_speaker": {"A": pattern}},
+            "anomalies": [],
+            "steps_completed": []
+        }
+        
+        report = synthesize_report(state)["report"]
+        
+        assert report["emotion_patterns"]["by_speaker"]["A"]["emotionSequence"] == [
+            {"timestamp": "01:01.500", "emotion": "Joy"}
+        ]
+        assert pattern["emotionSequence"] == [{"timestamp_ms": 61500, "emotion": "Joy"}]
 
 
 class TestFullAgentExecution:
@@ -222,3 +343,192 @@ class TestFullAgentExecution:
         
         # Should have at least one critical moment near 01:01
         assert len(moments_near_01_01) > 0
+    
+    def test_run_interpretation_on_records_matches_strings(self):
+        """Test the integer-ms entry point reports the same as the string one."""
+        import json
+        import os
+        from src.core.alignment import timestamp_to_ms
+        
+        examples_dir = os.path.join(os.path.dirname(__file__), "..", "..", "examples")
+        
+        with open(os.path.join(examples_dir, "transcription_holmes.json")) as f:
+            transcription = json.load(f)
+        
+        with open(os.path.join(examples_dir, "emotion_analysis_holmes.json")) as f:
+            emotions = json.load(f)
+        
+        transcription_records = [
+            {
+                "start_time_ms": timestamp_to_ms(e["startTime"]),
+                "end_time_ms": timestamp_to_ms(e["endTime"]),
+                "speaker": e["speaker"],
+                "transcript": e["transcript"],
+            }
+            for e in transcription
+        ]
+        emotion_records = [
+            {
+                "timestamp_ms": timestamp_to_ms(d["timestamp"]),
+                "emotion": d["emotion"],
+                "confidence": d.get("confidence"),
+            }
+            for d in emotions
+        ]
+        
+        expected = run_interpretation(transcription, emotions)
+        result = run_interpretation_on_records(transcription_records, emotion_records)
+        
+        assert result["steps_completed"] == expected["steps_completed"]
+        assert result["critical_moments"] == expected["critical_moments"]
+        assert result["speaker_profiles"] == expected["speaker_profiles"]
+        assert result["emotion_patterns"] == expected["emotion_patterns"]
+
+
+class TestAgentCache:
+    """Tests for the process-wide compiled agent cache."""
+    
+    def test_agent_is_compiled_once_per_config(self):
+        """Test that the same configuration reuses one compiled agent."""
+        agent = get_interpretation_agent(force_rebuild=True)
+        
+        assert get_interpretation_agent() is agent
+        assert get_interpretation_agent(interrupt_after=["temporal_alignment"]) is not agent
+        assert get_interpretation_agent(interrupt_after=("temporal_alignment",)) is get_interpretation_agent(
+            interrupt_after=["temporal_alignment"]
+        )
+        assert get_interpretation_agent(force_rebuild=True) is not agent
+    
+    def test_unknown_config_is_rejected(self):
+        """Test that unsupported configuration options raise."""
+        with pytest.raises(ValueError):
+            get_interpretation_agent(unknown_option=True)
+    
+    def test_runs_do_not_rebuild_the_graph(self, monkeypatch):
+        """Test that repeated runs reuse the cached agent, also across threads."""
+        get_interpretation_agent(force_rebuild=True)
+        builds = []
+        original = agent_module.create_interpretation_agent
+        monkeypatch.setattr(agent_module, "create_interpretation_agent", lambda **config: builds.append(config) or original(**config))
+        transcription = [{"startTime": "00:00.000", "endTime": "00:02.000", "speaker": "A", "transcript": "Hi"}]
+        emotions = [{"timestamp": "00:01.000", "emotion": "Fear"}]
+        results = []
+        
+        threads = [
+            threading.Thread(target=lambda: results.append(run_interpretation(transcription, emotions)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert builds == []
+        assert len(results) == 4
+        assert all(result["report"] == results[0]["report"] for result in results)
+
+
+class TestParallelGraph:
+    """Tests for the fan-out/fan-in agent graph."""
+    
+    def test_parallel_graph_matches_sequential(self):
+        """Test that both graph shapes produce the same report."""
+        import json
+        import os
+        
+        examples_dir = os.path.join(os.path.dirname(__file__), "../../examples")
+        with open(os.path.join(examples_dir, "transcription_double_agent.json")) as f:
+            transcription = json.load(f)
+        with open(os.path.join(examples_dir, "emotion_analysis_double_agent.json")) as f:
+            emotions = json.load(f)
+        initial_state = {
+            "transcription_entries": transcription,
+            "emotion_detections": emotions,
+            "steps_completed": []
+        }
+        
+        sequential = get_interpretation_agent(parallel=False).invoke(dict(initial_state))
+        parallel = get_interpretation_agent(parallel=True).invoke(dict(initial_state))
+        
+        assert parallel["report"] == sequential["report"]
+        assert parallel["interpretation"] == sequential["interpretation"]
+        assert sorted(parallel["steps_completed"]) == sorted(sequential["steps_completed"])
+        assert len(parallel["steps_completed"]) == 7
+        assert parallel["steps_completed"][-1] == "report_synthesis"
+    
+    def test_node_timings_are_reported(self):
+        """Test that every node reports its wall time."""
+        transcription = [{"startTime": "00:00.000", "endTime": "00:02.000", "speaker": "A", "transcript": "Hi"}]
+        emotions = [{"timestamp": "00:01.000", "emotion": "Fear"}]
+        
+        result = run_interpretation(transcription, emotions)
+        
+        assert set(result["node_timings"]) == {
+            "temporal_alignment", "speaker_indexing", "pattern_analysis", "anomaly_detection",
+            "moment_interpretation", "speaker_profiling", "report_synthesis",
+        }
+        assert all(ms >= 0 for ms in result["node_timings"].values())
+
+
+class TestAgentMetrics:
+    """Tests for per-node instrumentation."""
+    
+    def test_metrics_report_times_and_cardinalities(self):
+        """Test wall/CPU times and input/output sizes for every node."""
+        transcription = [
+            {"startTime": "00:00.000", "endTime": "00:02.000", "speaker": "A", "transcript": "Hi"},
+            {"startTime": "00:03.000", "endTime": "00:05.000", "speaker": "B", "transcript": "Oh"}
+        ]
+        emotions = [
+            {"timestamp": "00:01.000", "emotion": "Neutral"},
+            {"timestamp": "00:04.000", "emotion": "Fear"},
+            {"timestamp": "00:04.500", "emotion": "Surprise"}
+        ]
+        
+        metrics = run_interpretation(transcription, emotions)["metrics"]
+        
+        assert len(metrics) == 7
+        assert all(m["wall_ms"] >= 0 and m["cpu_ms"] >= 0 for m in metrics.values())
+        assert all("peak_alloc_kb" not in m for m in metrics.values())
+        assert metrics["temporal_alignment"]["inputs"] == {"transcription_entries": 2, "emotion_detections": 3}
+        assert metrics["temporal_alignment"]["outputs"] == {"aligned_events": 2}
+        assert metrics["anomaly_detection"]["outputs"] == {"anomalies": 1}
+        assert metrics["pattern_analysis"]["outputs"]["emotion_patterns.by_speaker"] == 2
+    
+    def test_memory_tracing_is_opt_in(self):
+        """Test that trace_memory adds peak allocations and stops tracing afterwards."""
+        import tracemalloc
+        
+        transcription = [{"startTime": "00:00.000", "endTime": "00:02.000", "speaker": "A", "transcript": "Hi"}]
+        emotions = [{"timestamp": "00:01.000", "emotion": "Fear"}]
+        
+        metrics = run_interpretation(transcription, emotions, trace_memory=True)["metrics"]
+        
+        assert all(m["peak_alloc_kb"] >= 0 for m in metrics.values())
+        assert not tracemalloc.is_tracing()
+
+
+class TestProgressCallback:
+    """Tests for per-step progress reporting."""
+    
+    @pytest.mark.parametrize("engine", ["graph", "fused"])
+    def test_on_step_reports_each_step_once(self, engine):
+        """Test on_step sees every engine step and the result is unchanged."""
+        from src.core.agent import ENGINE_STEPS
+        
+        transcription = [
+            {"startTime": "00:00.000", "endTime": "00:02.000", "speaker": "A", "transcript": "Hi"},
+            {"startTime": "00:03.000", "endTime": "00:05.000", "speaker": "B", "transcript": "Oh"}
+        ]
+        emotions = [
+            {"timestamp": "00:01.000", "emotion": "Neutral"},
+            {"timestamp": "00:04.000", "emotion": "Fear"}
+        ]
+        steps = []
+        
+        result = run_interpretation(transcription, emotions, engine=engine, on_step=steps.append)
+        
+        assert sorted(steps) == sorted(ENGINE_STEPS[engine])
+        assert steps[0] == "temporal_alignment" and steps[-1] == "report_synthesis"
+        assert result["report"] == run_interpretation(transcription, emotions, engine=engine)["report"]
+
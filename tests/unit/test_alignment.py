@@ -1,14 +1,24 @@
 """Unit tests for temporal alignment algorithm."""
 
+import json
+import os
+import random
+
 import pytest
 from src.core.alignment import (
+    TimestampParseError,
+    parse_timestamps,
+    parse_timestamp_fields,
     timestamp_to_ms,
     ms_to_timestamp,
     align_emotion_with_transcript,
+    align_records,
     find_event_at_time,
     compute_emotion_pattern,
 )
 
+from tests.helpers import random_records
+
 
 class TestTimestampConversion:
     """Test timestamp conversion functions."""
@@ -24,6 +34,69 @@ class TestTimestampConversion:
         assert timestamp_to_ms("0:05.100") == 5100
         assert timestamp_to_ms("10:30.500") == 630500
     
+    def test_timestamp_to_ms_fraction_is_decimal(self):
+        """Test short fractions are read as decimal seconds."""
+        assert timestamp_to_ms("00:01.5") == 1500
+        assert timestamp_to_ms("00:01.05") == 1050
+        assert timestamp_to_ms("00:01.1239") == 1123
+    
+    def test_timestamp_to_ms_hours(self):
+        """Test HH:MM:SS.mmm timestamps for sessions longer than an hour."""
+        assert timestamp_to_ms("01:00:00.000") == 3600000
+        assert timestamp_to_ms("2:03:04.005") == 7384005
+        # Minutes beyond an hour are still accepted without an hours field
+        assert timestamp_to_ms("75:00.000") == 4500000
+    
+    @pytest.mark.parametrize("value", [
+        "", "00:05", "1:2:3:4.000", "00:60.000", "01:60:00.000", "00:05.000abc",
+        " 00:05.000", "+1:05.000", "1_0:05.000", "00:005.000", "00:05.", "\u0661:05.000",
+    ])
+    def test_timestamp_to_ms_rejects_invalid(self, value):
+        """Test malformed timestamps are rejected."""
+        with pytest.raises(ValueError):
+            timestamp_to_ms(value)
+    
+    def test_timestamp_round_trip(self):
+        """Test fixed-width and general forms agree across the range."""
+        rng = random.Random(1)
+        for ms in [0, 59999, 60000, 3599999, 3600000] + [rng.randrange(0, 5 * 3600000) for _ in range(500)]:
+            hours, rest = divmod(ms, 3600000)
+            assert timestamp_to_ms(ms_to_timestamp(ms)) == ms
+            assert timestamp_to_ms(f"{hours:02d}:{ms_to_timestamp(rest)}") == ms
+            assert timestamp_to_ms(f"{hours}:{ms_to_timestamp(rest)}") == ms
+    
+    def test_parse_timestamps_batch(self):
+        """Test batch parsing matches single parsing."""
+        values = ["00:00.000", "01:23.456", "1:00:00.5"]
+        
+        assert parse_timestamps(values) == [timestamp_to_ms(v) for v in values]
+    
+    def test_parse_timestamps_reports_every_bad_row(self):
+        """Test all invalid rows are reported together."""
+        with pytest.raises(TimestampParseError) as excinfo:
+            parse_timestamps(["00:01.000", "bad", "00:02.000", None], field="timestamp")
+        
+        assert [(e["row"], e["field"], e["value"]) for e in excinfo.value.errors] == [
+            (1, "timestamp", "bad"),
+            (3, "timestamp", None),
+        ]
+        assert isinstance(excinfo.value, ValueError)
+    
+    def test_parse_timestamp_fields(self):
+        """Test several fields are parsed and errors merged by row."""
+        rows = [
+            {"startTime": "00:01.000", "endTime": "00:02.000"},
+            {"startTime": "00:03.000", "endTime": "00:0x.000"},
+            {"startTime": "later", "endTime": "00:05.000"},
+        ]
+        
+        with pytest.raises(TimestampParseError) as excinfo:
+            parse_timestamp_fields(rows, ("startTime", "endTime"))
+        assert [(e["row"], e["field"]) for e in excinfo.value.errors] == [(1, "endTime"), (2, "startTime")]
+        
+        parsed = parse_timestamp_fields(rows[:1], ("startTime", "endTime"))
+        assert parsed == {"startTime": [1000], "endTime": [2000]}
+    
     def test_ms_to_timestamp(self):
         """Test milliseconds to timestamp conversion."""
         assert ms_to_timestamp(0) == "00:00.000"
@@ -102,6 +175,135 @@ class TestAlignment:
         assert aligned[0]["emotions"][1]["emotion"] == "Neutral"
 
 
+class TestSweepEngine:
+    """Test that the sweep-line engine matches the nested-loop reference."""
+    
+    @staticmethod
+    def _random_session(seed):
+        """Random records in the timestamp input format."""
+        transcription, emotions = random_records(
+            seed, span_ms=120000, max_length_ms=8000, labels=("Neutral", "Fear", "Surprise", "Joy")
+        )
+        transcription = [
+            {
+                "startTime": ms_to_timestamp(entry["start_time_ms"]),
+                "endTime": ms_to_timestamp(entry["end_time_ms"]),
+                "speaker": entry["speaker"],
+                "transcript": entry["transcript"]
+            }
+            for entry in transcription
+        ]
+        emotions = [
+            {"timestamp": ms_to_timestamp(e["timestamp_ms"]), "emotion": e["emotion"], "confidence": e["confidence"]}
+            for e in emotions
+        ]
+        return transcription, emotions
+    
+    def test_matches_nested_on_examples(self):
+        """Test both engines agree on every parseable example pair."""
+        examples_dir = os.path.join(os.path.dirname(__file__), "..", "..", "examples")
+        # love_story is not valid JSON and office_lovers has an entry without
+        # a transcript, so neither can be aligned by either engine
+        for name in ["holmes", "double_agent", "20min_lie"]:
+            with open(os.path.join(examples_dir, f"transcription_{name}.json")) as f:
+                transcription = json.load(f)
+            with open(os.path.join(examples_dir, f"emotion_analysis_{name}.json")) as f:
+                emotions = json.load(f)
+            
+            expected = align_emotion_with_transcript(transcription, emotions, engine="nested")
+            actual = align_emotion_with_transcript(transcription, emotions, engine="sweep")
+            
+            assert json.dumps(actual) == json.dumps(expected), name
+    
+    @pytest.mark.parametrize("window_ms", [0, 100, 750])
+    def test_matches_nested_on_overlapping_unsorted_input(self, window_ms):
+        """Test overlapping segments and unsorted detections give identical output."""
+        transcription, emotions = self._random_session(window_ms)
+        
+        expected = align_emotion_with_transcript(transcription, emotions, window_ms, engine="nested")
+        actual = align_emotion_with_transcript(transcription, emotions, window_ms, engine="sweep")
+        
+        assert json.dumps(actual) == json.dumps(expected)
+    
+    def test_window_boundaries_are_inclusive(self):
+        """Test detections exactly on the window edges are matched."""
+        transcription = [
+            {"startTime": "00:01.000", "endTime": "00:02.000", "speaker": "A", "transcript": "x"}
+        ]
+        emotions = [
+            {"timestamp": "00:00.899", "emotion": "Outside"},
+            {"timestamp": "00:00.900", "emotion": "Start"},
+            {"timestamp": "00:02.100", "emotion": "End"},
+            {"timestamp": "00:02.101", "emotion": "Outside"},
+        ]
+        
+        aligned = align_emotion_with_transcript(transcription, emotions, window_ms=100)
+        
+        assert [e["emotion"] for e in aligned[0]["emotions"]] == ["Start", "End"]
+    
+    def test_unknown_engine(self):
+        """Test an unknown engine name is rejected."""
+        with pytest.raises(ValueError):
+            align_emotion_with_transcript([], [], engine="quantum")
+
+
+class TestAlignRecords:
+    """Test alignment of integer-millisecond records."""
+    
+    def test_align_dict_records(self):
+        """Test dict records align like their timestamp-string equivalents."""
+        transcription = [
+            {"startTime": "00:03.000", "endTime": "00:05.000", "speaker": "A", "transcript": "x"},
+            {"startTime": "00:04.500", "endTime": "00:09.000", "speaker": "B", "transcript": "y"},
+        ]
+        emotions = [
+            {"timestamp": "00:04.000", "emotion": "Neutral", "confidence": 0.5},
+            {"timestamp": "00:04.900", "emotion": "Fear"},
+            {"timestamp": "00:08.950", "emotion": "Joy", "confidence": 0.9},
+        ]
+        transcription_records = [
+            {
+                "start_time_ms": timestamp_to_ms(e["startTime"]),
+                "end_time_ms": timestamp_to_ms(e["endTime"]),
+                "speaker": e["speaker"],
+                "transcript": e["transcript"],
+            }
+            for e in transcription
+        ]
+        emotion_records = [
+            {"timestamp_ms": timestamp_to_ms(d["timestamp"]), "emotion": d["emotion"], "confidence": d.get("confidence")}
+            for d in emotions
+        ]
+        
+        expected = align_emotion_with_transcript(transcription, emotions)
+        for event in expected:
+            for emotion in event["emotions"]:
+                del emotion["timestamp"]
+        
+        assert align_records(transcription_records, emotion_records) == expected
+    
+    def test_align_object_records(self):
+        """Test attribute-style records such as ORM rows are accepted."""
+        from types import SimpleNamespace
+        
+        transcription_records = [
+            SimpleNamespace(start_time_ms=1000, end_time_ms=2000, speaker="A", transcript="x")
+        ]
+        emotion_records = [
+            SimpleNamespace(timestamp_ms=1500, emotion="Surprise", confidence=None)
+        ]
+        
+        aligned = align_records(transcription_records, emotion_records)
+        
+        assert aligned == [{
+            "start_time_ms": 1000,
+            "end_time_ms": 2000,
+            "speaker": "A",
+            "transcript": "x",
+            "emotions": [{"timestamp_ms": 1500, "emotion": "Surprise", "confidence": None}]
+        }]
+
+
 class TestFindEventAtTime:
     """Test finding events at specific times."""
     
@@ -0,0 +1,97 @@
+"""Tests for the content-addressed analysis cache."""
+
+import pytest
+from src.core.agent import ANALYSIS_VERSION, AnalysisCache, analysis_cache_key
+from src.core.agent import cache as cache_module
+
+TRANSCRIPTION = [
+    {"start_time_ms": 0, "end_time_ms": 4000, "speaker": "A", "transcript": "Hello"},
+    {"start_time_ms": 5000, "end_time_ms": 9000, "speaker": "B", "transcript": "Hi"},
+]
+EMOTIONS = [
+    {"timestamp_ms": 2000, "emotion": "Neutral", "confidence": 0.8},
+    {"timestamp_ms": 6000, "emotion": "Fear", "confidence": None},
+]
+
+
+class TestAnalysisCacheKey:
+    """Test the content hash of analysis input."""
+    
+    def test_key_is_stable(self):
+        """Test equal input gives equal keys, whatever the record type."""
+        class Row:
+            def __init__(self, **fields):
+                self.__dict__.update(fields)
+        
+        rows = [Row(**record) for record in TRANSCRIPTION]
+        assert analysis_cache_key(TRANSCRIPTION, EMOTIONS, 100) == analysis_cache_key(rows, EMOTIONS, 100)
+    
+    def test_labels_are_normalized(self):
+        """Test synonym labels hash like their canonical label."""
+        synonyms = [dict(EMOTIONS[0]), {**EMOTIONS[1], "emotion": "afraid"}]
+        assert analysis_cache_key(TRANSCRIPTION, synonyms, 100) == analysis_cache_key(TRANSCRIPTION, EMOTIONS, 100)
+    
+    @pytest.mark.parametrize("change", [
+        lambda t, e: (t[:1], e),
+        lambda t, e: ([{**t[0], "transcript": "Bye"}, t[1]], e),
+        lambda t, e: (t, [e[0], {**e[1], "timestamp_ms": 6001}]),
+        lambda t, e: (t, [e[0], {**e[1], "confidence": 0.5}]),
+    ])
+    def test_content_changes_change_key(self, change):
+        """Test any change to the analyzed fields gives a new key."""
+        transcription, emotions = change(TRANSCRIPTION, EMOTIONS)
+        assert analysis_cache_key(transcription, emotions, 100) != analysis_cache_key(TRANSCRIPTION, EMOTIONS, 100)
+    
+    def test_settings_change_key(self, monkeypatch):
+        """Test window, engine, scope and analysis version are part of the key."""
+        key = analysis_cache_key(TRANSCRIPTION, EMOTIONS, 100)
+        assert analysis_cache_key(TRANSCRIPTION, EMOTIONS, 250) != key
+        assert analysis_cache_key(TRANSCRIPTION, EMOTIONS, 100, engine="fused") != key
+        assert analysis_cache_key(TRANSCRIPTION, EMOTIONS, 100, scope=7) != key
+        monkeypatch.setattr(cache_module, "ANALYSIS_VERSION", ANALYSIS_VERSION + 1)
+        assert analysis_cache_key(TRANSCRIPTION, EMOTIONS, 100) != key
+
+
+class TestAnalysisCache:
+    """Test size and age eviction."""
+    
+    def test_get_and_put(self):
+        """Test stored values are returned and hits and misses counted."""
+        cache = AnalysisCache()
+        assert cache.get("a") is None
+        cache.put("a", {"report_id": 1})
+        assert cache.get("a") == {"report_id": 1}
+        assert (cache.hits, cache.misses) == (1, 1)
+    
+    def test_least_recently_used_is_evicted(self):
+        """Test the size limit drops the least recently used entry."""
+        cache = AnalysisCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+    
+    def test_expired_entries_are_dropped(self, monkeypatch):
+        """Test entries older than max_age_s are misses."""
+        now = [1000.0]
+        monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+        cache = AnalysisCache(max_age_s=10)
+        cache.put("a", 1)
+        now[0] += 5
+        assert cache.get("a") == 1
+        now[0] += 6
+        assert cache.get("a") is None
+        assert len(cache) == 0
+    
+    def test_invalidate_and_clear(self):
+        """Test entries can be dropped explicitly."""
+        cache = AnalysisCache(max_age_s=None)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.invalidate("a")
+        assert cache.get("a") is None
+        cache.clear()
+        assert len(cache) == 0
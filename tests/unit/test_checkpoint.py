@@ -0,0 +1,154 @@
+"""Tests for checkpointed and resumed agent runs."""
+
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from src.core.agent import (
+    SQLCheckpointSaver,
+    clear_agent_cache,
+    has_resumable_interpretation,
+    resume_interpretation,
+    run_interpretation_on_records,
+)
+from src.core.agent import agent as agent_module
+
+TRANSCRIPTION = [
+    {"start_time_ms": 0, "end_time_ms": 4000, "speaker": "A", "transcript": "All calm"},
+    {"start_time_ms": 5000, "end_time_ms": 9000, "speaker": "A", "transcript": "What was that?"},
+    {"start_time_ms": 10000, "end_time_ms": 14000, "speaker": "B", "transcript": "Nothing"},
+]
+EMOTIONS = [
+    {"timestamp_ms": 1000, "emotion": "Neutral", "confidence": 0.9},
+    {"timestamp_ms": 2000, "emotion": "Neutral", "confidence": 0.8},
+    {"timestamp_ms": 6000, "emotion": "Fear", "confidence": 0.7},
+    {"timestamp_ms": 11000, "emotion": "Joy", "confidence": None},
+]
+
+
+@pytest.fixture
+def saver(tmp_path):
+    """Checkpoint saver on a fresh SQLite database file."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'checkpoints.sqlite'}", connect_args={"check_same_thread": False})
+    yield SQLCheckpointSaver(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def failing_interpretation(monkeypatch):
+    """Make moment interpretation fail in newly compiled agents; call the result to undo it."""
+    def fail(state):
+        raise RuntimeError("interpretation backend unavailable")
+
+    clear_agent_cache()
+    monkeypatch.setattr(agent_module, "interpret_moments", fail)
+
+    def restore():
+        monkeypatch.undo()
+        clear_agent_cache()
+
+    yield restore
+    restore()
+
+
+class TestCheckpointedRuns:
+    """Tests for SQLCheckpointSaver with the interpretation agent."""
+
+    def test_completed_run_matches_and_leaves_no_checkpoint(self, saver):
+        """Test that checkpointing does not change results and finished runs are cleaned up."""
+        expected = run_interpretation_on_records(TRANSCRIPTION, EMOTIONS, session_id=1)
+
+        result = run_interpretation_on_records(TRANSCRIPTION, EMOTIONS, session_id=1, checkpointer=saver)
+
+        assert result["report"] == expected["report"]
+        assert result["aligned_events"].to_list() == expected["aligned_events"].to_list()
+        assert not has_resumable_interpretation(1, saver)
+        assert list(saver.list(None)) == []
+
+    def test_failed_run_resumes_from_last_completed_node(self, saver, failing_interpretation):
+        """Test that a resumed run only re-runs the unfinished nodes and matches a clean run."""
+        with pytest.raises(RuntimeError):
+            run_interpretation_on_records(TRANSCRIPTION, EMOTIONS, session_id=7, checkpointer=saver)
+        assert has_resumable_interpretation(7, saver)
+        assert not has_resumable_interpretation(8, saver)
+
+        failing_interpretation()
+        steps = []
+        result = resume_interpretation(7, saver, on_step=steps.append)
+
+        # Speaker profiling finished in the failed step, so only the failed branch and the join run
+        assert steps == ["moment_interpretation", "report_synthesis"]
+        expected = run_interpretation_on_records(TRANSCRIPTION, EMOTIONS, session_id=7)
+        for key in ("emotion_patterns", "anomalies", "critical_moments", "speaker_profiles", "report"):
+            assert result[key] == expected[key], key
+        assert sorted(result["steps_completed"]) == sorted(expected["steps_completed"])
+        assert set(result["metrics"]) == set(expected["metrics"])
+        assert not has_resumable_interpretation(7, saver)
+
+    def test_list_limit(self, saver, failing_interpretation):
+        """Test that limited listings return the newest checkpoints, with and without a filter."""
+        with pytest.raises(RuntimeError):
+            run_interpretation_on_records(TRANSCRIPTION, EMOTIONS, session_id=4, checkpointer=saver)
+        config = {"configurable": {"thread_id": "4"}}
+        checkpoints = list(saver.list(config))
+        assert len(checkpoints) > 2
+
+        newest = [checkpoint.config for checkpoint in checkpoints[:2]]
+        assert [checkpoint.config for checkpoint in saver.list(config, limit=2)] == newest
+        assert saver.get_tuple(config).config == newest[0]
+        loops = [checkpoint for checkpoint in checkpoints if checkpoint.metadata["source"] == "loop"]
+        assert [c.config for c in saver.list(config, filter={"source": "loop"}, limit=1)] == [loops[0].config]
+
+    def test_new_run_replaces_failed_run(self, saver, failing_interpretation):
+        """Test that starting over discards the checkpoints of a failed run."""
+        with pytest.raises(RuntimeError):
+            run_interpretation_on_records(TRANSCRIPTION, EMOTIONS, session_id=3, checkpointer=saver)
+
+        failing_interpretation()
+        run_interpretation_on_records(TRANSCRIPTION[:1], EMOTIONS[:1], session_id=3, checkpointer=saver)
+
+        assert not has_resumable_interpretation(3, saver)
+        with pytest.raises(ValueError):
+            resume_interpretation(3, saver)
+
+    def test_resumability_uses_the_run_configuration(self, saver, failing_interpretation):
+        """Test that a failed run is found with the detector it was started with."""
+        with pytest.raises(RuntimeError):
+            run_interpretation_on_records(
+                TRANSCRIPTION, EMOTIONS, session_id=5, checkpointer=saver,
+                anomaly_detector="rolling", checkpoint_durability="sync"
+            )
+        failing_interpretation()
+
+        assert has_resumable_interpretation(5, saver, anomaly_detector="rolling")
+        result = resume_interpretation(5, saver, anomaly_detector="rolling")
+        expected = run_interpretation_on_records(TRANSCRIPTION, EMOTIONS, anomaly_detector="rolling")
+        assert result["anomalies"] == expected["anomalies"]
+
+    def test_runs_of_a_session_wait_for_each_other(self, saver):
+        """Test that concurrent runs of one session do not delete each other's checkpoints."""
+        results, errors = [], []
+
+        def run():
+            try:
+                results.append(run_interpretation_on_records(TRANSCRIPTION, EMOTIONS, session_id=9, checkpointer=saver))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == [] and len(results) == 4
+        assert all(result["report"] == results[0]["report"] for result in results)
+        assert list(saver.list(None)) == []
+        assert agent_module._thread_locks == {}
+
+    def test_checkpointing_needs_graph_engine_and_session(self, saver):
+        """Test that unsupported checkpointed runs are rejected."""
+        with pytest.raises(ValueError):
+            run_interpretation_on_records(TRANSCRIPTION, EMOTIONS, session_id=1, engine="fused", checkpointer=saver)
+        with pytest.raises(ValueError):
+            run_interpretation_on_records(TRANSCRIPTION, EMOTIONS, checkpointer=saver)
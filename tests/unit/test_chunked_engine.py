@@ -0,0 +1,199 @@
+"""Differential tests for the chunked map-reduce analysis engine."""
+
+import random
+from functools import reduce
+
+import pytest
+from src.core.agent import (
+    ENGINE_STEPS,
+    MomentInterpreter,
+    StubInterpretationBackend,
+    chunked_analysis,
+    merge_summaries,
+    plan_chunks,
+    run_chunked,
+    run_interpretation,
+    run_interpretation_on_records,
+    summarize_chunk,
+)
+from src.core.agent.chunked import _empty_summary, _input_columns, finalize_summary
+from src.core.agent.nodes import ALIGNMENT_WINDOW_MS
+from src.core.alignment import (
+    AlignedEvents,
+    matrices_from_counts,
+    merge_transition_counts,
+    transition_counts,
+    transition_matrices,
+)
+
+from tests.helpers import RESULT_KEYS, example_names, load_example, random_session
+
+
+def _state(transcription, emotions, input_format="ms"):
+    return {
+        "transcription_entries": transcription,
+        "emotion_detections": emotions,
+        "input_format": input_format,
+        "steps_completed": []
+    }
+
+
+def _assert_same_results(expected, actual):
+    for key in RESULT_KEYS + ("speaker_index",):
+        assert actual[key] == expected[key], key
+    assert list(actual["aligned_events"]) == list(expected["aligned_events"])
+
+
+def _summaries(transcription, emotions, chunk_ms):
+    """Summarize every chunk of a session in this process."""
+    segments, speakers, transcripts, times, labels, confidences = _input_columns(_state(transcription, emotions))
+    summaries = []
+    for first, stop in plan_chunks([start for start, _ in segments], speakers, chunk_ms):
+        low = segments[first][0] - ALIGNMENT_WINDOW_MS
+        high = max(end for _, end in segments[first:stop]) + ALIGNMENT_WINDOW_MS
+        selected = [i for i, t in enumerate(times) if low <= t <= high]
+        summary = summarize_chunk(
+            segments[first:stop], speakers[first:stop], transcripts[first:stop],
+            [times[i] for i in selected], [labels[i] for i in selected], [confidences[i] for i in selected],
+            ALIGNMENT_WINDOW_MS,
+        )
+        summary["events"] = AlignedEvents.from_bytes(summary["events"])
+        summaries.append(summary)
+    return summaries
+
+
+class TestPlanChunks:
+    """Tests for plan_chunks."""
+
+    def test_cuts_at_speaker_turns(self):
+        """Test that a chunk ends at the first speaker turn after chunk_ms."""
+        starts = [0, 400, 800, 1200, 1600, 2000]
+        speakers = ["A", "A", "A", "B", "B", "A"]
+        assert plan_chunks(starts, speakers, 500) == [(0, 3), (3, 5), (5, 6)]
+
+    def test_monologues_are_cut_at_twice_the_span(self):
+        """Test the hard cap for a single speaker."""
+        starts = list(range(0, 5000, 500))
+        assert plan_chunks(starts, ["A"] * 10, 1000) == [(0, 4), (4, 8), (8, 10)]
+
+    def test_covers_every_segment(self):
+        """Test that the chunks are contiguous and complete."""
+        transcription, _ = random_session(0)
+        chunks = plan_chunks([e["start_time_ms"] for e in transcription], [e["speaker"] for e in transcription], 20_000)
+        assert chunks[0][0] == 0 and chunks[-1][1] == len(transcription)
+        assert all(left[1] == right[0] for left, right in zip(chunks, chunks[1:]))
+        assert plan_chunks([], [], 1000) == []
+
+    def test_rejects_empty_chunks(self):
+        """Test parameter validation."""
+        with pytest.raises(ValueError):
+            plan_chunks([0], ["A"], 0)
+
+
+class TestMerging:
+    """The reduce steps must be associative and reproduce single-pass results."""
+
+    def test_merge_summaries_is_associative(self):
+        """Test that any grouping of the chunk summaries gives the same result."""
+        transcription, emotions = random_session(1)
+
+        left_fold = reduce(merge_summaries, _summaries(transcription, emotions, 15_000), _empty_summary())
+        a, b, c, *rest = _summaries(transcription, emotions, 15_000)
+        grouped = merge_summaries(merge_summaries(a, merge_summaries(b, c)), reduce(merge_summaries, rest, _empty_summary()))
+
+        assert finalize_summary(grouped) == finalize_summary(left_fold)
+
+    def test_transition_counts_merge_to_single_pass_matrices(self):
+        """Test merge_transition_counts over arbitrary splits of a container."""
+        transcription, emotions = random_session(2, speakers=3)
+        events = run_interpretation_on_records(transcription, emotions)["aligned_events"]
+        rng = random.Random(2)
+        cuts = sorted(rng.sample(range(1, len(events)), 6))
+        runs = [events[first:stop] for first, stop in zip([0] + cuts, cuts + [len(events)])]
+
+        counts = [transition_counts(AlignedEvents.from_events(run)) for run in runs]
+        left = reduce(merge_transition_counts, counts)
+        right = merge_transition_counts(counts[0], reduce(merge_transition_counts, counts[1:]))
+
+        assert matrices_from_counts(left) == transition_matrices(events)
+        assert matrices_from_counts(right) == transition_matrices(events)
+
+    def test_extend_concatenates_containers(self):
+        """Test AlignedEvents.extend against a container built in one go."""
+        transcription, emotions = random_session(3)
+        events = list(run_interpretation_on_records(transcription, emotions)["aligned_events"])
+
+        container = AlignedEvents.from_events(events[:100])
+        container.extend(AlignedEvents.from_events(events[100:]))
+
+        assert list(container) == events
+        assert container.to_bytes() == AlignedEvents.from_events(events).to_bytes()
+
+
+class TestChunkedEngine:
+    """The chunked engine must reproduce the node-by-node graph exactly."""
+
+    @pytest.mark.parametrize("seed,chunk_ms", [(0, 5_000), (1, 30_000), (2, 10_000_000)])
+    def test_matches_graph_on_synthetic_records(self, seed, chunk_ms):
+        """Test random sessions cut into many, some and a single chunk."""
+        transcription, emotions = random_session(seed)
+
+        expected = run_interpretation_on_records(transcription, emotions, engine="graph")
+        actual = run_chunked(_state(transcription, emotions), chunk_ms=chunk_ms, max_workers=1)
+
+        _assert_same_results(expected, actual)
+
+    def test_matches_graph_with_label_variants(self):
+        """Test that synonyms and case variants give the graph's patterns and matrices."""
+        transcription, emotions = random_session(6, labels=("joy", "Joy", "happy", " JOY ", "Fear", "scared", "Neutral"))
+
+        expected = run_interpretation_on_records(transcription, emotions, engine="graph")
+        actual = run_chunked(_state(transcription, emotions), chunk_ms=10_000, max_workers=1)
+
+        _assert_same_results(expected, actual)
+        assert actual["emotion_patterns"]["transition_matrices"]["labels"] == ["Neutral", "Joy", "Fear"]
+
+    @pytest.mark.parametrize("name", [name for name in example_names() if name in ("holmes", "double_agent", "20min_lie")])
+    def test_matches_graph_on_example(self, name):
+        """Test the timestamp input format on the example sessions."""
+        transcription, emotions = load_example(name)
+        expected = run_interpretation(transcription, emotions, engine="graph")
+        actual = run_chunked(_state(transcription, emotions, "timestamp"), chunk_ms=20_000, max_workers=1)
+
+        _assert_same_results(expected, actual)
+        assert actual["metrics"]["chunked_analysis"]["chunks"] > 1
+
+    def test_process_pool(self):
+        """Test that chunks summarized in worker processes give the same result."""
+        transcription, emotions = random_session(4)
+        update = chunked_analysis(_state(transcription, emotions), chunk_ms=60_000, max_workers=2)
+        expected = chunked_analysis(_state(transcription, emotions), chunk_ms=60_000, max_workers=1)
+
+        assert update["metrics"]["chunked_analysis"]["workers"] == 2
+        assert update["metrics"]["chunked_analysis"]["chunks"] == expected["metrics"]["chunked_analysis"]["chunks"]
+        update.pop("metrics"), expected.pop("metrics")
+        assert list(update.pop("aligned_events")) == list(expected.pop("aligned_events"))
+        assert update == expected
+
+    def test_engine_option(self):
+        """Test engine="chunked" with progress reporting and an interpreter."""
+        transcription, emotions = random_session(5, segments=50)
+        steps = []
+        interpreter = MomentInterpreter(StubInterpretationBackend())
+
+        result = run_interpretation_on_records(
+            transcription, emotions, engine="chunked", on_step=steps.append, interpreter=interpreter
+        )
+
+        assert steps == list(ENGINE_STEPS["chunked"])
+        assert result["steps_completed"] == list(ENGINE_STEPS["chunked"])
+        assert "interpretation" in result["metrics"]["moment_interpretation"]
+        _assert_same_results(run_interpretation_on_records(transcription, emotions), result)
+
+    def test_empty_session(self):
+        """Test that a session without segments finishes like the graph."""
+        expected = run_interpretation_on_records([], [])
+        actual = run_chunked(_state([], []))
+
+        _assert_same_results(expected, actual)
+        assert actual["metrics"]["chunked_analysis"]["chunks"] == 0
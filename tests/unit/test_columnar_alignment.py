@@ -0,0 +1,95 @@
+"""Unit tests for the columnar alignment backend."""
+
+from functools import partial
+
+import pytest
+from src.core.alignment import (
+    ColumnarAlignment,
+    EmotionColumns,
+    align_columnar,
+    align_records,
+    compute_emotion_pattern,
+)
+from src.core.alignment import columnar
+
+from tests.helpers import random_records
+
+
+# Time-ordered records whose confidences are exactly representable in float32
+_random_records = partial(
+    random_records, segments=30, detections=250, span_ms=90000, max_length_ms=6000, speakers=2,
+    labels=("Neutral", "Fear", "Surprise", "Joy"), confidences=(None, 0.25, 0.5, 0.75), sort=True,
+)
+
+
+BACKENDS = ["python", pytest.param("numpy", marks=pytest.mark.skipif(columnar.np is None, reason="NumPy not installed"))]
+
+
+class TestColumnarAlignment:
+    """Test the columnar backends against align_records."""
+    
+    @pytest.mark.parametrize("backend", BACKENDS)
+    @pytest.mark.parametrize("window_ms", [0, 100, 500])
+    def test_events_match_align_records(self, backend, window_ms):
+        """Test materialized events equal the dict-based alignment."""
+        transcription, emotions = _random_records(window_ms)
+        
+        result = align_columnar(transcription, emotions, window_ms, backend=backend)
+        
+        assert isinstance(result, ColumnarAlignment)
+        assert result.to_aligned_events() == align_records(transcription, emotions, window_ms)
+    
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_slice_statistics(self, backend):
+        """Test counts and dominant emotion per segment match compute_emotion_pattern."""
+        transcription, emotions = _random_records(7)
+        
+        result = align_columnar(transcription, emotions, backend=backend)
+        events = align_records(transcription, emotions)
+        matrix = result.count_matrix()
+        
+        for i, event in enumerate(events):
+            pattern = compute_emotion_pattern(
+                [dict(e, timestamp=str(e["timestamp_ms"])) for e in event["emotions"]]
+            )
+            assert int(result.match_counts()[i]) == len(event["emotions"])
+            assert result.emotion_counts(i) == pattern["emotionCounts"]
+            assert result.dominant_emotion(i) == pattern["dominantEmotion"]
+            assert [int(c) for c in matrix[i]] == [int(c) for c in result.emotion_code_counts(i)]
+    
+    def test_backends_agree_on_offsets(self):
+        """Test both backends produce the same slice offsets."""
+        pytest.importorskip("numpy")
+        transcription, emotions = _random_records(3)
+        
+        numpy_result = align_columnar(transcription, emotions, backend="numpy")
+        python_result = align_columnar(transcription, emotions, backend="python")
+        
+        assert list(numpy_result.lower) == list(python_result.lower)
+        assert list(numpy_result.upper) == list(python_result.upper)
+    
+    def test_prebuilt_columns_are_reused(self):
+        """Test EmotionColumns can be built once and aligned repeatedly."""
+        transcription, emotions = _random_records(11)
+        columns = EmotionColumns.from_records(emotions, backend="python")
+        
+        result = align_columnar(transcription, columns, window_ms=250)
+        
+        assert result.emotions is columns
+        assert result.to_aligned_events() == align_records(transcription, emotions, 250)
+    
+    def test_auto_falls_back_without_numpy(self, monkeypatch):
+        """Test "auto" uses the python backend and "numpy" fails clearly without NumPy."""
+        monkeypatch.setattr(columnar, "np", None)
+        transcription, emotions = _random_records(5)
+        
+        result = align_columnar(transcription, emotions, backend="auto")
+        
+        assert result.emotions.backend == "python"
+        with pytest.raises(ImportError):
+            align_columnar(transcription, emotions, backend="numpy")
+    
+    def test_unknown_backend(self):
+        """Test an unknown backend name is rejected."""
+        with pytest.raises(ValueError):
+            align_columnar([], [], backend="gpu")
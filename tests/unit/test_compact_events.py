@@ -0,0 +1,116 @@
+"""Unit tests for the compact AlignedEvents container."""
+
+import json
+import tracemalloc
+
+import pytest
+from src.core.alignment import AlignedEvents, align_emotion_with_transcript, align_records, ms_to_timestamp
+
+from tests.helpers import random_records
+
+
+def _traced_size(build):
+    """Return the object built by build() and the bytes it still holds."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        built = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return built, after - before
+
+
+class TestAlignedEvents:
+    """Tests for AlignedEvents and its dict-compatible views."""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_from_records_matches_align_records(self, seed):
+        """Test that the views read exactly like align_records output."""
+        transcription, emotions = random_records(seed)
+        expected = align_records(transcription, emotions, window_ms=100)
+        for event in expected:
+            for emotion in event["emotions"]:
+                emotion["timestamp"] = ms_to_timestamp(emotion["timestamp_ms"])
+
+        events = AlignedEvents.from_records(transcription, emotions, window_ms=100)
+
+        assert events == expected
+        assert events.to_list() == expected
+
+    def test_from_entries_matches_string_alignment(self):
+        """Test alignment of timestamp-string input."""
+        transcription = [
+            {"startTime": "00:00.000", "endTime": "00:02.000", "speaker": "A", "transcript": "Hi"},
+            {"startTime": "00:02.500", "endTime": "00:04.000", "speaker": "B", "transcript": "Hello"},
+        ]
+        detections = [
+            {"timestamp": "00:01.000", "emotion": "Joy", "confidence": 0.9},
+            {"timestamp": "00:03.000", "emotion": "Fear"},
+        ]
+
+        events = AlignedEvents.from_entries(transcription, detections)
+
+        assert events == align_emotion_with_transcript(transcription, detections)
+        assert events[1]["emotions"][0]["confidence"] is None
+
+    def test_label_variants_share_one_code(self):
+        """Test that case variants and synonyms of a label are encoded once."""
+        variants = ["joy", "Joy", "happy", " JOY ", "Fear", "scared"]
+        transcription = [{"startTime": "00:00.000", "endTime": "00:10.000", "speaker": "A", "transcript": "Hi"}]
+        detections = [{"timestamp": f"00:0{i}.000", "emotion": label} for i, label in enumerate(variants)]
+
+        from_entries = AlignedEvents.from_entries(transcription, detections)
+        from_events = AlignedEvents.from_events([{
+            "start_time_ms": 0, "end_time_ms": 10000, "speaker": "A", "transcript": "Hi",
+            "emotions": [{"timestamp_ms": i * 1000, "emotion": label} for i, label in enumerate(variants)],
+        }])
+
+        for events in (from_entries, from_events):
+            assert events.labels == ["Joy", "Fear"]
+            assert list(events.emotion_codes) == [0, 0, 0, 0, 1, 1]
+            assert [emotion["emotion"] for emotion in events[0]["emotions"]] == ["Joy"] * 4 + ["Fear"] * 2
+
+    def test_views_behave_like_dicts(self):
+        """Test the read access used by the agent nodes."""
+        events = AlignedEvents.from_events([
+            {"start_time_ms": 0, "end_time_ms": 1000, "speaker": "A", "transcript": "Hi",
+             "emotions": [{"timestamp_ms": 500, "emotion": "Joy", "confidence": 0.5}]},
+            {"start_time_ms": 1000, "end_time_ms": 2000, "speaker": "B", "transcript": "Bye", "emotions": []},
+        ])
+
+        assert len(events) == 2
+        assert events[-1]["speaker"] == "B"
+        assert not events[1]["emotions"]
+        assert [e["speaker"] for e in events[:1]] == ["A"]
+        emotion = events[0].get("emotions", [])[0]
+        assert "timestamp" in emotion
+        assert emotion["timestamp"] == "00:00.500"
+        assert emotion.get("missing", 1) == 1
+        with pytest.raises(KeyError):
+            events[0]["missing"]
+        with pytest.raises(IndexError):
+            events[2]
+        json.dumps(events.to_list())
+
+    def test_uses_less_memory_than_dicts(self):
+        """Test that the container holds far less memory than event dicts."""
+        transcription, emotions = random_records(7, segments=500, detections=5000)
+
+        _, dict_bytes = _traced_size(lambda: align_records(transcription, emotions, window_ms=100))
+        _, compact_bytes = _traced_size(lambda: AlignedEvents.from_records(transcription, emotions, window_ms=100))
+
+        assert compact_bytes * 3 < dict_bytes
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_bytes_round_trip(self, seed):
+        """Test that to_bytes/from_bytes restore identical columns."""
+        transcription, emotions = random_records(seed)
+        events = AlignedEvents.from_records(transcription, emotions, window_ms=100)
+
+        restored = AlignedEvents.from_bytes(events.to_bytes())
+
+        assert restored.to_list() == events.to_list()
+        assert restored.confidences.tobytes() == events.confidences.tobytes()
+        assert AlignedEvents.from_bytes(AlignedEvents().to_bytes()) == []
+
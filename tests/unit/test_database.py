@@ -0,0 +1,63 @@
+"""Unit tests for database initialization and migrations."""
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from src.core.agent.checkpoint import CHECKPOINT_TABLES
+from src.core.agent.interpretation import interpretations_table
+from src.models.database import Base
+from src.utils import database
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """Point init_db at a fresh SQLite database file."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.sqlite'}")
+    monkeypatch.setattr(database, "engine", engine)
+    yield engine
+    engine.dispose()
+
+
+def _revision(engine):
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+class TestInitDb:
+    """Tests for init_db."""
+
+    def test_new_database_is_stamped(self, engine):
+        """Test that a new database gets every table and the latest revision."""
+        database.init_db()
+
+        tables = set(inspect(engine).get_table_names())
+        assert set(Base.metadata.tables) <= tables
+        assert {table.name for table in CHECKPOINT_TABLES} <= tables
+        assert interpretations_table.name in tables
+        assert _revision(engine) == "0002"
+
+    def test_older_database_gets_the_session_time_indexes(self, engine):
+        """Test that tables created without the time-range indexes get them."""
+        Base.metadata.create_all(engine)
+        names = ("ix_transcription_entries_session_start", "ix_emotion_detections_session_time", "ix_aligned_events_session_start")
+        with engine.begin() as connection:
+            for name in names:
+                connection.execute(text(f"DROP INDEX {name}"))
+
+        database.init_db()
+
+        indexes = {index["name"] for table in Base.metadata.tables for index in inspect(engine).get_indexes(table)}
+        assert set(names) <= indexes
+        assert _revision(engine) == "0002"
+
+    def test_older_database_is_migrated(self, engine):
+        """Test that a database created before the metrics column gets it, and only once."""
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE interpretation_reports DROP COLUMN metrics"))
+
+        database.init_db()
+        database.init_db()
+
+        columns = {column["name"] for column in inspect(engine).get_columns("interpretation_reports")}
+        assert "metrics" in columns
+        assert _revision(engine) == "0002"
@@ -0,0 +1,54 @@
+"""Differential tests for the fused analysis engine."""
+
+import pytest
+from src.core.agent import run_interpretation, run_interpretation_on_records
+
+from tests.helpers import RESULT_KEYS, example_names, load_example, random_session
+
+
+def _assert_same_results(expected, actual):
+    for key in RESULT_KEYS:
+        assert actual[key] == expected[key], key
+    assert actual["speaker_index"] == expected["speaker_index"]
+
+
+class TestFusedEngine:
+    """The fused engine must reproduce the node-by-node graph exactly."""
+
+    @pytest.mark.parametrize("name", example_names())
+    def test_matches_graph_on_example(self, name):
+        """Test every example pair; pairs the graph rejects must fail the same way."""
+        try:
+            transcription, emotions = load_example(name)
+            expected = run_interpretation(transcription, emotions, engine="graph")
+        except Exception as error:
+            # love_story is not valid JSON and office_lovers has an entry without a transcript
+            with pytest.raises(type(error)):
+                transcription, emotions = load_example(name)
+                run_interpretation(transcription, emotions, engine="fused")
+            return
+
+        actual = run_interpretation(transcription, emotions, engine="fused")
+
+        _assert_same_results(expected, actual)
+
+    def test_covers_all_examples(self):
+        """Test that the differential test sees every example pair."""
+        assert {"holmes", "double_agent", "20min_lie", "love_story", "office_lovers"} <= set(example_names())
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_matches_graph_on_synthetic_records(self, seed):
+        """Test a larger random session with many speakers on the millisecond path."""
+        transcription, emotions = random_session(seed, segments=400, speakers=12)
+
+        expected = run_interpretation_on_records(transcription, emotions, engine="graph")
+        actual = run_interpretation_on_records(transcription, emotions, engine="fused")
+
+        _assert_same_results(expected, actual)
+        assert actual["steps_completed"] == ["temporal_alignment", "fused_analysis", "report_synthesis"]
+        assert set(actual["metrics"]) == {"temporal_alignment", "fused_analysis", "report_synthesis"}
+
+    def test_unknown_engine_is_rejected(self):
+        """Test that an unsupported engine raises."""
+        with pytest.raises(ValueError):
+            run_interpretation([], [], engine="turbo")
@@ -0,0 +1,89 @@
+"""Unit tests for incremental alignment."""
+
+import random
+
+from src.core.alignment import align_increment, align_records, delta_time_range
+
+
+def _segments(rng, count, start_ms, span_ms):
+    segments = []
+    for i in range(count):
+        start = start_ms + rng.randrange(0, span_ms)
+        segments.append({
+            "start_time_ms": start,
+            "end_time_ms": start + rng.randrange(0, 5000),
+            "speaker": f"Speaker {i % 2}",
+            "transcript": f"Segment {start}",
+        })
+    return segments
+
+
+def _detections(rng, count, start_ms, span_ms):
+    return [
+        {
+            "timestamp_ms": start_ms + rng.randrange(0, span_ms),
+            "emotion": rng.choice(["Neutral", "Fear", "Joy"]),
+            "confidence": rng.random(),
+        }
+        for _ in range(count)
+    ]
+
+
+def _by_time(detections):
+    return sorted(detections, key=lambda d: d["timestamp_ms"])
+
+
+class TestIncrementalAlignment:
+    """Test incremental alignment against full re-alignment."""
+    
+    def test_increments_match_full_alignment(self):
+        """Test repeated appends converge to the same events as a full alignment."""
+        rng = random.Random(3)
+        window_ms = 100
+        transcription = _segments(rng, 20, 0, 60000)
+        detections = _detections(rng, 200, 0, 65000)
+        events = align_records(transcription, _by_time(detections), window_ms)
+        
+        for step in range(5):
+            # Live feeds mostly append later data, with some late arrivals
+            offset = 60000 + step * 10000
+            new_transcription = _segments(rng, 4, offset - 3000, 10000)
+            new_detections = _detections(rng, 40, offset - 5000, 15000)
+            
+            from_ms, to_ms = delta_time_range(new_transcription, new_detections, window_ms)
+            all_detections = detections + new_detections
+            candidates = [e for e in events if e["start_time_ms"] <= to_ms and e["end_time_ms"] >= from_ms]
+            context = _by_time(d for d in all_detections if from_ms <= d["timestamp_ms"] <= to_ms)
+            
+            updates, new_events = align_increment(candidates, new_transcription, new_detections, context, window_ms)
+            
+            for event, emotions in updates:
+                event["emotions"] = emotions
+            events = events + new_events
+            transcription = transcription + new_transcription
+            detections = all_detections
+            
+            assert events == align_records(transcription, _by_time(detections), window_ms)
+    
+    def test_only_touched_events_are_updated(self):
+        """Test events outside the new detections' windows are not reported."""
+        existing = [
+            {"start_time_ms": 0, "end_time_ms": 1000, "emotions": []},
+            {"start_time_ms": 5000, "end_time_ms": 6000, "emotions": [{"timestamp_ms": 5500, "emotion": "Joy", "confidence": None}]},
+        ]
+        new_detections = [{"timestamp_ms": 5050, "emotion": "Fear", "confidence": 0.5}]
+        
+        updates, new_events = align_increment(existing, [], new_detections, new_detections)
+        
+        assert new_events == []
+        assert len(updates) == 1
+        event, emotions = updates[0]
+        assert event is existing[1]
+        assert [e["emotion"] for e in emotions] == ["Fear", "Joy"]
+        # The stored event is only changed by the caller
+        assert len(existing[1]["emotions"]) == 1
+    
+    def test_empty_delta(self):
+        """Test nothing new means no range and no work."""
+        assert delta_time_range([], [], 100) is None
+        assert align_increment([], [], [], []) == ([], [])
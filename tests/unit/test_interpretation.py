@@ -0,0 +1,216 @@
+"""Unit tests for the moment interpretation backends and interpreter."""
+
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from sqlalchemy import create_engine
+
+from src.core.agent import (
+    ChatModelBackend,
+    InterpretationBackend,
+    InterpretationCache,
+    MomentInterpreter,
+    SQLInterpretationCache,
+    StubInterpretationBackend,
+    moment_cache_key,
+    run_interpretation,
+)
+
+
+def _moments(count, speaker="Holmes"):
+    return [
+        {"speaker": speaker, "emotion": "Fear", "transcript": f"Statement {i}", "context": ""}
+        for i in range(count)
+    ]
+
+
+def _holmes():
+    examples_dir = os.path.join(os.path.dirname(__file__), "..", "..", "examples")
+    with open(os.path.join(examples_dir, "transcription_holmes.json")) as f:
+        transcription = json.load(f)
+    with open(os.path.join(examples_dir, "emotion_analysis_holmes.json")) as f:
+        emotions = json.load(f)
+    return transcription, emotions
+
+
+class RecordingBackend(InterpretationBackend):
+    """Async backend recording its batches and the calls in flight."""
+
+    name = "recording"
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    async def ainterpret_batch(self, moments):
+        with self.lock:
+            self.batches.append([moment["transcript"] for moment in moments])
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+        return [f"LLM: {moment['transcript']}" for moment in moments]
+
+
+class FailingBackend(InterpretationBackend):
+    """Synchronous backend that always fails."""
+
+    name = "failing"
+
+    def interpret_batch(self, moments):
+        raise RuntimeError("backend unavailable")
+
+
+class TestMomentInterpreter:
+    """Tests for MomentInterpreter."""
+
+    def test_batches_moments(self):
+        """Test that moments are sent batch_size per call, in order."""
+        backend = RecordingBackend()
+        interpreter = MomentInterpreter(backend, batch_size=8)
+
+        interpretations, stats = interpreter.interpret(_moments(20))
+
+        assert interpretations == [f"LLM: Statement {i}" for i in range(20)]
+        assert sorted(len(batch) for batch in backend.batches) == [4, 8, 8]
+        assert stats == {"moments": 20, "cache_hits": 0, "calls": 3, "timeouts": 0, "failures": 0}
+
+    def test_limits_concurrency(self):
+        """Test that at most max_concurrency calls run at once."""
+        backend = RecordingBackend(delay=0.02)
+        interpreter = MomentInterpreter(backend, batch_size=1, max_concurrency=3)
+
+        interpreter.interpret(_moments(12))
+
+        assert len(backend.batches) == 12
+        assert backend.max_in_flight == 3
+
+    def test_identical_moments_are_interpreted_once(self):
+        """Test deduplication within a request and caching across requests."""
+        backend = RecordingBackend()
+        interpreter = MomentInterpreter(backend, cache=InterpretationCache())
+        moments = _moments(3) + _moments(3)
+
+        interpretations, stats = interpreter.interpret(moments)
+        assert interpretations[:3] == interpretations[3:]
+        assert sum(len(batch) for batch in backend.batches) == 3
+
+        interpretations_again, stats = interpreter.interpret(moments)
+        assert interpretations_again == interpretations
+        assert stats["cache_hits"] == 6
+        assert stats["calls"] == 0
+        assert len(backend.batches) == 1
+
+    def test_context_is_part_of_the_key(self):
+        """Test that the same moment with other context is a different entry."""
+        moment = _moments(1)[0]
+        assert moment_cache_key("stub", moment) != moment_cache_key("stub", {**moment, "context": "Earlier: Joy"})
+        assert moment_cache_key("stub", moment) != moment_cache_key("other", moment)
+
+    def test_timeouts_fall_back_uncached(self):
+        """Test that a call over the timeout falls back to the rule-based text."""
+        cache = InterpretationCache()
+        interpreter = MomentInterpreter(RecordingBackend(delay=1), cache=cache, timeout_s=0.05)
+
+        interpretations, stats = interpreter.interpret(_moments(2))
+
+        assert stats["timeouts"] == 1
+        assert interpretations == StubInterpretationBackend().interpret_batch(_moments(2))
+        assert len(cache) == 0
+
+    def test_failures_fall_back(self):
+        """Test that a failing synchronous backend falls back per batch."""
+        interpreter = MomentInterpreter(FailingBackend(), batch_size=2)
+
+        interpretations, stats = interpreter.interpret(_moments(3))
+
+        assert stats["failures"] == 2
+        assert interpretations == StubInterpretationBackend().interpret_batch(_moments(3))
+
+    def test_sql_cache_persists(self, tmp_path):
+        """Test that interpretations are reused by a new interpreter on the same database."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'interpretations.sqlite'}")
+        first = RecordingBackend()
+        MomentInterpreter(first, cache=SQLInterpretationCache(engine)).interpret(_moments(5))
+
+        second = RecordingBackend()
+        interpretations, stats = MomentInterpreter(second, cache=SQLInterpretationCache(engine)).interpret(_moments(6))
+
+        assert stats["cache_hits"] == 5
+        assert second.batches == [["Statement 5"]]
+        assert interpretations == [f"LLM: Statement {i}" for i in range(6)]
+
+    def test_rejects_bad_parameters(self):
+        """Test parameter validation."""
+        with pytest.raises(ValueError):
+            MomentInterpreter(StubInterpretationBackend(), batch_size=0)
+        with pytest.raises(ValueError):
+            MomentInterpreter(StubInterpretationBackend(), timeout_s=0)
+
+
+class TestChatModelBackend:
+    """Tests for ChatModelBackend."""
+
+    def test_one_prompt_per_batch(self):
+        """Test that a batch is one model call parsed into one answer per moment."""
+        model = FakeListChatModel(responses=['Sure: ["first", "second"]'])
+        backend = ChatModelBackend(model)
+
+        interpretations, stats = MomentInterpreter(backend).interpret(_moments(2))
+
+        assert interpretations == ["first", "second"]
+        assert stats["calls"] == 1
+        assert "1. Holmes showed Fear" in backend.prompt(_moments(2))
+
+    def test_malformed_answer_falls_back(self):
+        """Test that an answer with the wrong number of items is a failure."""
+        backend = ChatModelBackend(FakeListChatModel(responses=['["only one"]']))
+
+        interpretations, stats = MomentInterpreter(backend).interpret(_moments(2))
+
+        assert stats["failures"] == 1
+        assert interpretations == StubInterpretationBackend().interpret_batch(_moments(2))
+
+
+class TestInterpretMomentsNode:
+    """Tests for the interpreter option of the agent."""
+
+    def test_default_is_the_rule_based_stub(self):
+        """Test that the stub reproduces the rule-based interpretations and reports its stats."""
+        transcription, emotions = _holmes()
+
+        result = run_interpretation(transcription, emotions)
+
+        moments = result["critical_moments"]
+        assert moments
+        assert [m["interpretation"] for m in moments] == StubInterpretationBackend().interpret_batch(moments)
+        stats = result["metrics"]["moment_interpretation"]["interpretation"]
+        assert stats["moments"] == len(moments)
+        assert "wall_ms" in result["metrics"]["moment_interpretation"]
+
+    def test_graph_uses_given_interpreter(self):
+        """Test that a graph built with an interpreter uses its backend."""
+        transcription, emotions = _holmes()
+        interpreter = MomentInterpreter(RecordingBackend(), cache=InterpretationCache())
+
+        result = run_interpretation(transcription, emotions, interpreter=interpreter)
+
+        assert all(m["interpretation"] == f"LLM: {m['transcript']}" for m in result["critical_moments"])
+        again = run_interpretation(transcription, emotions, interpreter=interpreter)
+        assert again["metrics"]["moment_interpretation"]["interpretation"]["calls"] == 0
+
+    def test_fused_engine_rejects_interpreter(self):
+        """Test that the fused engine does not silently ignore an interpreter."""
+        transcription, emotions = _holmes()
+        with pytest.raises(ValueError):
+            run_interpretation(transcription, emotions, engine="fused", interpreter=MomentInterpreter(RecordingBackend()))
@@ -0,0 +1,82 @@
+"""Unit tests for the aligned event interval index."""
+
+import random
+
+import pytest
+from src.core.alignment import IntervalIndex
+
+
+def _event(start, end, name):
+    return {"start_time_ms": start, "end_time_ms": end, "speaker": name, "transcript": name, "emotions": []}
+
+
+class TestIntervalIndex:
+    """Test point and range lookups."""
+    
+    def test_point_query_returns_all_overlaps(self):
+        """Test every segment containing the time is returned, in start order."""
+        events = [
+            _event(5000, 9000, "B"),
+            _event(0, 10000, "A"),
+            _event(9500, 12000, "C"),
+        ]
+        index = IntervalIndex(events)
+        
+        assert [e["speaker"] for e in index.at(8000)] == ["A", "B"]
+        assert [e["speaker"] for e in index.at(9000)] == ["A", "B"]
+        assert [e["speaker"] for e in index.at(11000)] == ["C"]
+        assert index.at(12001) == []
+        assert index.first_at(8000)["speaker"] == "A"
+        assert index.first_at(-1) is None
+    
+    def test_range_query(self):
+        """Test range queries return segments overlapping the closed range."""
+        events = [_event(0, 1000, "A"), _event(2000, 3000, "B"), _event(4000, 5000, "C")]
+        index = IntervalIndex(events)
+        
+        assert [e["speaker"] for e in index.overlapping(1000, 2000)] == ["A", "B"]
+        assert [e["speaker"] for e in index.overlapping(1001, 1999)] == []
+        assert [e["speaker"] for e in index.overlapping(0, 10000)] == ["A", "B", "C"]
+        with pytest.raises(ValueError):
+            index.overlapping(10, 5)
+    
+    def test_matches_linear_scan(self):
+        """Test lookups agree with a brute-force scan on random overlapping segments."""
+        rng = random.Random(42)
+        events = []
+        for i in range(200):
+            start = rng.randrange(0, 100000)
+            events.append(_event(start, start + rng.randrange(0, 15000), str(i)))
+        index = IntervalIndex(events)
+        ordered = sorted(events, key=lambda e: e["start_time_ms"])
+        
+        for _ in range(300):
+            a = rng.randrange(-1000, 120000)
+            b = a + rng.choice([0, rng.randrange(0, 5000)])
+            expected = [e for e in ordered if e["start_time_ms"] <= b and e["end_time_ms"] >= a]
+            assert index.overlapping(a, b) == expected
+    
+    def test_long_segment_does_not_widen_lookups(self):
+        """Test that one segment spanning the session keeps lookups logarithmic."""
+        events = [_event(0, 10_000_000, "long")] + [_event(i * 1000, i * 1000 + 500, str(i)) for i in range(1, 10_000)]
+        index = IntervalIndex(events)
+        visits = []
+        collect = index._collect
+        
+        def counting_collect(*args):
+            visits.append(args)
+            collect(*args)
+        
+        index._collect = counting_collect
+        
+        assert [e["speaker"] for e in index.at(5_000_200)] == ["long", "5000"]
+        assert [e["speaker"] for e in index.at(9_999_900)] == ["long"]
+        assert len(visits) < 200
+    
+    def test_empty_index(self):
+        """Test an empty index answers every query with nothing."""
+        index = IntervalIndex([])
+        
+        assert len(index) == 0
+        assert index.at(0) == []
+        assert index.overlapping(0, 1000) == []
@@ -0,0 +1,45 @@
+"""Unit tests for multi-window alignment."""
+
+import pytest
+from src.core.alignment import DEFAULT_WINDOWS_MS, align_multi_window, align_records
+
+from tests.helpers import random_records
+
+
+class TestMultiWindowAlignment:
+    """Test one-pass alignment over several windows."""
+    
+    @pytest.mark.parametrize("sort_detections", [True, False])
+    def test_each_window_matches_single_alignment(self, sort_detections):
+        """Test every window's events equal a separate alignment with that window."""
+        transcription, detections = random_records(5, sort=sort_detections)
+        windows = [500, 0, 100, 50, 250, 100]
+        
+        results = align_multi_window(transcription, detections, windows)
+        
+        assert list(results) == [0, 50, 100, 250, 500]
+        for window, result in results.items():
+            expected = align_records(transcription, detections, window)
+            assert result["aligned_events"] == expected
+            assert result["match_count"] == sum(len(e["emotions"]) for e in expected)
+            assert result["matched_segments"] == sum(1 for e in expected if e["emotions"])
+    
+    def test_unmatched_detections(self):
+        """Test detections outside every window are counted once."""
+        transcription, detections = random_records(9, sort=True)
+        
+        results = align_multi_window(transcription, detections, include_events=False)
+        
+        assert list(results) == list(DEFAULT_WINDOWS_MS)
+        for window, result in results.items():
+            matched = {
+                (d["timestamp_ms"], d["emotion"], d["confidence"])
+                for e in align_records(transcription, detections, window) for d in e["emotions"]
+            }
+            assert result["unmatched_detections"] == len(detections) - len(matched)
+            assert result["aligned_events"] is None
+    
+    def test_negative_window_rejected(self):
+        """Test negative windows are rejected."""
+        with pytest.raises(ValueError):
+            align_multi_window([], [], [-1, 100])
@@ -0,0 +1,157 @@
+"""Unit tests for prompt context building."""
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.core.agent import (
+    ChatModelBackend,
+    ContextBuilder,
+    MomentInterpreter,
+    compress_emotions,
+    estimate_tokens,
+    interpret_moments,
+)
+from src.core.alignment import AlignedEvents
+
+
+def _events(count):
+    return [
+        {"start_time_ms": i * 1000, "end_time_ms": i * 1000 + 900, "speaker": f"Speaker {i % 2}",
+         "transcript": f"Line number {i} of the interview",
+         "emotions": [{"timestamp_ms": i * 1000 + j, "emotion": "Neutral" if j < 3 else "Fear", "confidence": None}
+                      for j in range(4)]}
+        for i in range(count)
+    ]
+
+
+class TestContextHelpers:
+    """Tests for estimate_tokens and compress_emotions."""
+
+    def test_estimate_tokens(self):
+        """Test the local token estimate."""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("I saw it.") == 4
+        assert estimate_tokens("extraordinarily") == 4
+
+    def test_compress_emotions(self):
+        """Test run-length compression of consecutive labels."""
+        assert compress_emotions(["Neutral", "Neutral", "Neutral", "Fear", "Neutral"]) == "Neutral x3, Fear, Neutral"
+        assert compress_emotions([]) == ""
+        assert compress_emotions(["Joy", "Fear", "Fear", "Joy"], max_runs=2) == "Joy, Fear x2, ..."
+        assert compress_emotions(["Joy", "Fear"], max_runs=2) == "Joy, Fear"
+
+
+class TestContextBuilder:
+    """Tests for ContextBuilder."""
+
+    def test_neighbourhood_is_centered_and_ordered(self):
+        """Test that the context spans window_events on each side, in event order."""
+        contexts, stats = ContextBuilder(window_events=2, max_tokens=1000).build(_events(20), [10])
+
+        assert [i for i, _ in contexts[0]["context_lines"]] == [8, 9, 10, 11, 12]
+        assert contexts[0]["context_lines"][2][1] == "Speaker 0: Line number 10 of the interview [Neutral x3, Fear]"
+        assert contexts[0]["context"].count("\n") == 4
+        assert stats["events"] == 5
+
+    def test_token_budget(self):
+        """Test that neighbours are dropped, farthest first, to fit the budget."""
+        builder = ContextBuilder(window_events=5, max_tokens=40)
+        line_tokens = estimate_tokens(builder.event_line(_events(1)[0]))
+
+        contexts, stats = builder.build(_events(20), [0, 10])
+
+        assert stats["max_moment_tokens"] <= 40
+        assert len(contexts[1]["context_lines"]) == 40 // line_tokens
+        assert [i for i, _ in contexts[0]["context_lines"]] == list(range(40 // line_tokens))
+
+    def test_long_transcripts_are_cut(self):
+        """Test the per-transcript token limit."""
+        event = {"speaker": "A", "transcript": "word " * 500, "emotions": []}
+        line = ContextBuilder(max_transcript_tokens=10).event_line(event)
+        assert line.endswith("...")
+        assert estimate_tokens(line) < 20
+
+    def test_single_event_over_budget(self):
+        """Test that a moment whose own line exceeds the budget still fits into max_tokens."""
+        event = {"speaker": "A", "transcript": "Well", "emotions": [
+            {"emotion": "Fear" if j % 2 else "Joy"} for j in range(400)
+        ]}
+        line = ContextBuilder().event_line(event)
+        assert line.endswith("Joy, Fear, Joy, Fear, Joy, Fear, Joy, Fear, ...]")
+
+        for max_tokens in (2, 10, 30):
+            builder = ContextBuilder(window_events=1, max_tokens=max_tokens, max_emotion_runs=400)
+            contexts, stats = builder.build([event, event], [0])
+            assert stats["max_moment_tokens"] <= max_tokens
+            assert [i for i, _ in contexts[0]["context_lines"]] == [0]
+            assert contexts[0]["context"].startswith("A:")
+
+    def test_shared_lines_are_counted_once(self):
+        """Test deduplication of overlapping contexts."""
+        contexts, stats = ContextBuilder(window_events=2, max_tokens=1000).build(_events(20), [10, 11])
+
+        assert stats["events"] == 6
+        assert stats["tokens"] < stats["tokens_per_moment"]
+
+    def test_context_size_does_not_grow_with_session_length(self):
+        """Test that per-moment context is bounded for long sessions."""
+        builder = ContextBuilder()
+        _, short = builder.build(AlignedEvents.from_events(_events(50)), [25])
+        _, long = builder.build(AlignedEvents.from_events(_events(5000)), [2500])
+
+        assert long["tokens"] == short["tokens"]
+
+    def test_rejects_bad_parameters(self):
+        """Test parameter validation."""
+        with pytest.raises(ValueError):
+            ContextBuilder(window_events=-1)
+        with pytest.raises(ValueError):
+            ContextBuilder(max_tokens=0)
+        with pytest.raises(ValueError):
+            ContextBuilder(max_emotion_runs=0)
+
+
+class TestContextInInterpretation:
+    """Tests for context in interpret_moments and ChatModelBackend."""
+
+    def _state(self):
+        events = _events(10)
+        anomalies = [
+            {"timestamp_ms": i * 1000 + 3, "event_index": i, "speaker": f"Speaker {i % 2}", "emotion": "Fear",
+             "baseline": "Neutral", "transcript": events[i]["transcript"], "severity": "high"}
+            for i in (4, 5)
+        ]
+        return {"aligned_events": events, "anomalies": anomalies}
+
+    def test_prompt_lists_shared_lines_once(self):
+        """Test that overlapping contexts appear once in a batch prompt."""
+        backend = ChatModelBackend(FakeListChatModel(responses=['["a", "b"]']))
+        interpreter = MomentInterpreter(backend, context_builder=ContextBuilder(window_events=2, max_tokens=1000))
+
+        result = interpret_moments(self._state(), interpreter=interpreter)
+
+        assert [m["interpretation"] for m in result["critical_moments"]] == ["a", "b"]
+        moments = [
+            {"speaker": m["speaker"], "emotion": m["emotion"], "transcript": m["transcript"], "event_index": i}
+            for m, i in zip(result["critical_moments"], (4, 5))
+        ]
+        contexts, _ = interpreter.context_builder.build(self._state()["aligned_events"], [4, 5])
+        prompt = backend.prompt([{**m, **c} for m, c in zip(moments, contexts)])
+        assert prompt.count("Line number 5 of") == 2  # its excerpt line and moment 2 itself
+        assert "[3]" in prompt and "[7]" in prompt
+        assert "Context: excerpts [2]-[6], the moment is [4]" in prompt
+
+        context = result["metrics"]["moment_interpretation"]["context"]
+        assert context["events"] == 6
+        assert context["tokens"] < context["tokens_per_moment"]
+
+    def test_context_needs_a_builder(self):
+        """Test that only interpreters with a context builder build context."""
+        state = self._state()
+        plain = interpret_moments(state)
+        with_context = interpret_moments(state, interpreter=MomentInterpreter(
+            ChatModelBackend(FakeListChatModel(responses=['["a", "b"]'])), context_builder=ContextBuilder()
+        ))
+
+        assert "context" not in plain["metrics"]["moment_interpretation"]
+        assert [m["interpretation"] for m in with_context["critical_moments"]] == ["a", "b"]
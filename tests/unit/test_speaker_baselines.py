@@ -0,0 +1,127 @@
+"""Unit tests for cross-session speaker statistics and historical baselines."""
+
+import pytest
+from src.core.agent import (
+    analysis_cache_key,
+    baseline_emotion,
+    combine_statistics,
+    empty_statistics,
+    run_chunked,
+    run_interpretation_on_records,
+    speaker_statistics,
+    statistics_profile,
+)
+
+from tests.helpers import random_session
+
+
+def _records():
+    transcription = [
+        {"start_time_ms": 0, "end_time_ms": 1000, "speaker": "A", "transcript": "Hello"},
+        {"start_time_ms": 1000, "end_time_ms": 2000, "speaker": "B", "transcript": "Hi"},
+        {"start_time_ms": 2000, "end_time_ms": 3000, "speaker": "A", "transcript": "Well"},
+    ]
+    emotions = [
+        {"timestamp_ms": 500, "emotion": "Fear", "confidence": 0.9},
+        {"timestamp_ms": 600, "emotion": "anxious", "confidence": None},
+        {"timestamp_ms": 1500, "emotion": "Neutral", "confidence": 0.5},
+        {"timestamp_ms": 2500, "emotion": "Fear", "confidence": 0.7},
+    ]
+    return transcription, emotions
+
+
+class TestSpeakerStatistics:
+    """Tests for speaker_statistics and its helpers."""
+
+    def test_counts_and_sums(self):
+        """Test per-speaker counts, canonical labels and confidence sums."""
+        events = run_interpretation_on_records(*_records())["aligned_events"]
+        statistics = speaker_statistics(events)
+
+        assert statistics["A"]["utterances"] == 2
+        assert statistics["A"]["emotions"] == 3
+        assert statistics["A"]["emotion_counts"] == {"Fear": 2, "Anxiety": 1}
+        assert statistics["A"]["confidence_sums"] == {"Fear": pytest.approx(1.6)}
+        assert statistics["A"]["confidence_counts"] == {"Fear": 2}
+        assert statistics == speaker_statistics(list(events))
+
+    def test_counts_match_patterns(self):
+        """Test that the emotion counts agree with the session's patterns."""
+        result = run_interpretation_on_records(*random_session(0))
+        statistics = speaker_statistics(result["aligned_events"])
+
+        for speaker, pattern in result["emotion_patterns"]["by_speaker"].items():
+            assert statistics[speaker]["emotions"] == pattern["totalEmotions"]
+            assert sum(statistics[speaker]["emotion_counts"].values()) == pattern["totalEmotions"]
+            assert statistics[speaker]["utterances"] == len(result["speaker_index"][speaker]["event_indices"])
+
+    def test_subtracting_a_session_restores_the_others(self):
+        """Test that combine_statistics adds and takes out sessions exactly."""
+        first = speaker_statistics(run_interpretation_on_records(*random_session(1, speakers=2))["aligned_events"])
+        second = speaker_statistics(run_interpretation_on_records(*random_session(2, speakers=2))["aligned_events"])
+
+        total = combine_statistics(combine_statistics(empty_statistics(), first["Speaker 0"]), second["Speaker 0"])
+        assert total["utterances"] == first["Speaker 0"]["utterances"] + second["Speaker 0"]["utterances"]
+
+        rest = combine_statistics(total, first["Speaker 0"], -1)
+        assert rest["emotion_counts"] == second["Speaker 0"]["emotion_counts"]
+        assert rest["confidence_counts"] == second["Speaker 0"]["confidence_counts"]
+        assert rest["confidence_sums"] == pytest.approx(second["Speaker 0"]["confidence_sums"])
+        assert combine_statistics(rest, second["Speaker 0"], -1)["emotion_counts"] == {}
+
+    def test_profile(self):
+        """Test baseline, distribution and average confidence."""
+        statistics = speaker_statistics(run_interpretation_on_records(*_records())["aligned_events"])["A"]
+        profile = statistics_profile(statistics)
+
+        assert baseline_emotion(statistics) == profile["baseline_emotion"] == "Fear"
+        assert profile["emotion_distribution"] == {"Fear": pytest.approx(2 / 3), "Anxiety": pytest.approx(1 / 3)}
+        assert profile["average_confidence"] == {"Fear": pytest.approx(0.8)}
+        assert statistics_profile(empty_statistics())["baseline_emotion"] is None
+
+
+class TestHistoricalBaselines:
+    """Tests for speaker_baselines in anomaly detection."""
+
+    def test_historical_baseline_replaces_session_dominant(self):
+        """Test that a stored baseline changes which emotions are anomalies."""
+        transcription, emotions = _records()
+        plain = run_interpretation_on_records(transcription, emotions)
+        anchored = run_interpretation_on_records(transcription, emotions, speaker_baselines={"A": "Neutral"})
+
+        # Fear is A's own dominant emotion, but not their historical one
+        assert all(anomaly["emotion"] != "Fear" for anomaly in plain["anomalies"])
+        fear = [anomaly for anomaly in anchored["anomalies"] if anomaly["emotion"] == "Fear"]
+        assert len(fear) == 2 and {anomaly["baseline"] for anomaly in fear} == {"Neutral"}
+        # Speakers without a stored baseline keep their session's
+        assert anchored["speaker_profiles"] == plain["speaker_profiles"]
+
+    @pytest.mark.parametrize("engine", ["fused", "chunked"])
+    def test_engines_agree(self, engine):
+        """Test that every engine applies historical baselines alike."""
+        transcription, emotions = random_session(3)
+        baselines = {"Speaker 0": "Fear", "Speaker 1": "Neutral"}
+        expected = run_interpretation_on_records(transcription, emotions, speaker_baselines=baselines)
+        if engine == "chunked":
+            actual = run_chunked({
+                "transcription_entries": transcription, "emotion_detections": emotions, "input_format": "ms",
+                "speaker_baselines": baselines, "steps_completed": [],
+            }, chunk_ms=20_000, max_workers=1)
+        else:
+            actual = run_interpretation_on_records(transcription, emotions, engine=engine, speaker_baselines=baselines)
+
+        assert actual["anomalies"] == expected["anomalies"]
+        assert actual["critical_moments"] == expected["critical_moments"]
+
+    def test_rolling_detector_is_rejected(self):
+        """Test that the rolling detector, which has its own baseline, refuses stored ones."""
+        with pytest.raises(ValueError):
+            run_interpretation_on_records(*_records(), anomaly_detector="rolling", speaker_baselines={"A": "Neutral"})
+
+    def test_cache_key_covers_baselines(self):
+        """Test that analyses against different baselines are cached apart."""
+        transcription, emotions = _records()
+        plain = analysis_cache_key(transcription, emotions, 100)
+
+        assert analysis_cache_key(transcription, emotions, 100, speaker_baselines={}) == plain
+        assert analysis_cache_key(transcription, emotions, 100, speaker_baselines={"A": "Neutral"}) != plain
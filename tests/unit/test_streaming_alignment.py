@@ -0,0 +1,107 @@
+"""Unit tests for streaming alignment."""
+
+import asyncio
+import random
+
+import pytest
+from src.core.alignment import StreamingAligner, align_records, astream_align, stream_align
+
+from tests.helpers import random_records
+
+
+def _feeds(seed, segments=60, detections=600, lateness=500):
+    """Random feeds, each shuffled by less than `lateness` ms."""
+    transcription, emotions = random_records(seed, segments, detections, max_length_ms=3000)
+    rng = random.Random(seed)
+    transcription.sort(key=lambda record: record["start_time_ms"] + rng.uniform(0, lateness))
+    emotions.sort(key=lambda record: record["timestamp_ms"] + rng.uniform(0, lateness))
+    return transcription, emotions
+
+
+def _by_segment(events):
+    return sorted(events, key=lambda event: event["transcript"])
+
+
+class TestStreamingAlignment:
+    """Tests for StreamingAligner, stream_align and astream_align."""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_batch_alignment(self, seed):
+        """Test that on-time feeds give exactly the batch alignment."""
+        transcription, emotions = _feeds(seed)
+
+        events = list(stream_align(transcription, emotions, window_ms=100, allowed_lateness_ms=500))
+
+        assert _by_segment(events) == _by_segment(align_records(transcription, emotions, window_ms=100))
+
+    def test_async_feeds_match_batch_alignment(self):
+        """Test the async generator with async and sync feeds."""
+        transcription, emotions = _feeds(11)
+
+        async def feed(records):
+            for record in records:
+                await asyncio.sleep(0)
+                yield record
+
+        async def collect():
+            return [event async for event in astream_align(feed(transcription), emotions, allowed_lateness_ms=500)]
+
+        events = asyncio.run(collect())
+
+        assert _by_segment(events) == _by_segment(align_records(transcription, emotions, window_ms=100))
+
+    def test_yields_before_feeds_end(self):
+        """Test that events are emitted while the feeds are still running."""
+        transcription, emotions = _feeds(3)
+        consumed = []
+
+        def detections():
+            for record in emotions:
+                consumed.append(record)
+                yield record
+
+        stream = stream_align(transcription, detections(), allowed_lateness_ms=500)
+        next(stream)
+
+        assert len(consumed) < len(emotions)
+
+    def test_buffers_stay_bounded(self):
+        """Test that buffer sizes do not grow with session length."""
+        aligner = StreamingAligner(window_ms=100, allowed_lateness_ms=1000)
+        largest = 0
+        emitted = 0
+        for second in range(5000):
+            emitted += len(aligner.add_segment({
+                "start_time_ms": second * 1000, "end_time_ms": second * 1000 + 900,
+                "speaker": "A", "transcript": str(second),
+            }))
+            for offset in range(0, 1000, 100):
+                emitted += len(aligner.add_detection({"timestamp_ms": second * 1000 + offset, "emotion": "Joy"}))
+            largest = max(largest, aligner.buffered_detections + aligner.pending_segments)
+        emitted += len(aligner.flush())
+
+        assert emitted == 5000
+        assert largest < 40
+
+    def test_late_detection_is_counted(self):
+        """Test that detections behind the watermark are reported."""
+        aligner = StreamingAligner(window_ms=100, allowed_lateness_ms=0)
+        aligner.add_segment({"start_time_ms": 0, "end_time_ms": 1000, "speaker": "A", "transcript": "Hi"})
+        finalized = aligner.add_detection({"timestamp_ms": 5000, "emotion": "Joy"})
+        aligner.add_detection({"timestamp_ms": 500, "emotion": "Fear"})
+
+        assert [event["emotions"] for event in finalized] == [[]]
+        assert aligner.stats["late_detections"] == 1
+
+    def test_max_buffer_forces_segments_out(self):
+        """Test that a stalled detection feed cannot grow the segment buffer."""
+        aligner = StreamingAligner(max_buffer=2)
+        finalized = []
+        for i in range(5):
+            finalized += aligner.add_segment({
+                "start_time_ms": i * 1000, "end_time_ms": i * 1000 + 500, "speaker": "A", "transcript": str(i),
+            })
+
+        assert [event["transcript"] for event in finalized] == ["0", "1", "2"]
+        assert aligner.pending_segments == 2
+        assert aligner.stats["forced_segments"] == 3
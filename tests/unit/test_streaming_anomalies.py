@@ -0,0 +1,184 @@
+"""Unit tests for rolling-baseline anomaly detection."""
+
+import asyncio
+from functools import partial
+
+import pytest
+from src.core.agent import (
+    StreamingAnomalyDetector,
+    astream_anomalies,
+    detect_anomalies,
+    detect_anomalies_rolling,
+    run_interpretation_on_records,
+    stream_anomalies,
+)
+from src.core.alignment import AlignedEvents, align_records, stream_align
+
+from tests.helpers import random_records
+
+
+def _events(emotions, speaker="A"):
+    """One single-emotion event per label, one second apart."""
+    return [
+        {"start_time_ms": i * 1000, "end_time_ms": i * 1000 + 900, "speaker": speaker, "transcript": f"Line {i}",
+         "emotions": [{"timestamp_ms": i * 1000 + 100, "emotion": emotion, "confidence": None}]}
+        for i, emotion in enumerate(emotions)
+    ]
+
+
+# Mostly neutral sessions with occasional strong emotions, in speaker turns
+_records = partial(
+    random_records, segments=80, detections=320, max_length_ms=1500, speakers=2,
+    labels=("Neutral",) * 6 + ("Fear", "Anger", "Joy"), confidences=(None,), sort=True, sequential=True,
+)
+
+
+class TestStreamingAnomalyDetector:
+    """Tests for StreamingAnomalyDetector."""
+
+    def test_decayed_distribution(self):
+        """Test the baseline against directly decayed counts."""
+        detector = StreamingAnomalyDetector(half_life=3)
+        sequence = ["Neutral", "Fear", "Neutral", "Joy", "Joy", "Neutral", "Fear"]
+        for emotion in sequence:
+            detector.observe("A", emotion)
+
+        decay = 0.5 ** (1 / 3)
+        weights = {}
+        for age, emotion in enumerate(reversed(sequence)):
+            weights[emotion] = weights.get(emotion, 0.0) + decay ** age
+        total = sum(weights.values())
+
+        baseline = detector.baseline("A")
+        assert baseline.keys() == weights.keys()
+        for emotion, weight in weights.items():
+            assert baseline[emotion] == pytest.approx(weight / total)
+        assert detector.dominant_emotion("A") == max(weights, key=weights.get)
+        assert detector.baseline("B") == {}
+        assert detector.dominant_emotion("B") is None
+
+    def test_long_streams_stay_finite(self):
+        """Test that lazy decay is renormalized on long streams."""
+        detector = StreamingAnomalyDetector(half_life=1)
+        for _ in range(5000):
+            detector.observe("A", "Neutral")
+        detector.observe("A", "Joy")
+
+        baseline = detector.baseline("A")
+        assert baseline["Neutral"] == pytest.approx(0.5)
+        assert baseline["Joy"] == pytest.approx(0.5)
+
+    def test_scores_before_updating(self):
+        """Test that a detection is scored against the baseline without it."""
+        detector = StreamingAnomalyDetector(min_history=3)
+        results = [detector.observe("A", "Neutral") for _ in range(10)]
+        fear = detector.observe("A", "Fear")
+
+        assert results[0]["baseline"] is None
+        assert results[-1]["baseline"] == "Neutral"
+        assert results[-1]["surprise"] < results[0]["surprise"]
+        assert fear["anomalous"]
+        assert fear["baseline"] == "Neutral"
+        assert fear["surprise"] > 3
+
+    def test_surprise_ignores_unrelated_labels(self):
+        """Test that labels registered elsewhere in the vocabulary do not change scores."""
+        plain = StreamingAnomalyDetector()
+        crowded = StreamingAnomalyDetector()
+        for i in range(50):
+            crowded.vocabulary.code(f"Label {i}")
+
+        for emotion in ["Neutral"] * 5 + ["Awe", "Fear", "Awe"]:
+            assert crowded.observe("A", emotion)["surprise"] == pytest.approx(plain.observe("A", emotion)["surprise"])
+
+    def test_needs_history(self):
+        """Test that nothing is flagged before min_history detections."""
+        detector = StreamingAnomalyDetector(min_history=5)
+        flags = [detector.observe("A", emotion)["anomalous"] for emotion in ["Neutral"] * 4 + ["Fear"]]
+        assert flags == [False] * 5
+
+    def test_adapts_to_drift(self):
+        """Test that a mood shift stops being flagged once it is the norm."""
+        events = _events(["Neutral"] * 30 + ["Anger"] * 30)
+
+        anomalies = list(stream_anomalies(events))
+
+        # The session-wide baseline is Neutral (tie broken by first seen):
+        # every Anger is flagged, while the rolling baseline catches up
+        global_anomalies = detect_anomalies({
+            "aligned_events": events,
+            "emotion_patterns": {"by_speaker": {"A": {"dominantEmotion": "Neutral"}}},
+        })["anomalies"]
+        assert len(global_anomalies) == 30
+        assert 0 < len(anomalies) < 10
+        assert [a["event_index"] for a in anomalies] == list(range(30, 30 + len(anomalies)))
+        assert all(a["baseline"] == "Neutral" and a["severity"] == "medium" for a in anomalies)
+
+    def test_speakers_are_independent(self):
+        """Test that each speaker has their own baseline."""
+        events = _events(["Fear"] * 10, speaker="A") + _events(["Neutral"] * 10, speaker="B")
+        events.append(_events(["Fear"], speaker="B")[0])
+
+        anomalies = list(stream_anomalies(events))
+
+        assert [(a["speaker"], a["emotion"], a["severity"]) for a in anomalies] == [("B", "Fear", "high")]
+
+    def test_rejects_bad_parameters(self):
+        """Test parameter validation."""
+        with pytest.raises(ValueError):
+            StreamingAnomalyDetector(half_life=0)
+        with pytest.raises(ValueError):
+            StreamingAnomalyDetector(prior=0)
+        with pytest.raises(ValueError):
+            StreamingAnomalyDetector(min_history=-1)
+
+
+class TestRollingAnomalyNode:
+    """Tests for detect_anomalies_rolling and the streaming iterators."""
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_node_matches_stream_over_streaming_alignment(self, seed):
+        """Test that the node reports what the live iterator reports."""
+        transcription, emotions = _records(seed)
+        events = align_records(transcription, emotions, window_ms=100)
+
+        expected = detect_anomalies_rolling({"aligned_events": AlignedEvents.from_events(events)})["anomalies"]
+        streamed = list(stream_anomalies(stream_align(transcription, emotions, window_ms=100)))
+
+        assert expected
+        assert streamed == expected
+        assert detect_anomalies_rolling({"aligned_events": events})["anomalies"] == expected
+
+    def test_async_iterator(self):
+        """Test astream_anomalies against stream_anomalies."""
+        events = _events(["Neutral"] * 10 + ["Fear", "Neutral", "Surprise"])
+
+        async def feed():
+            for event in events:
+                await asyncio.sleep(0)
+                yield event
+
+        async def collect():
+            return [anomaly async for anomaly in astream_anomalies(feed())]
+
+        assert asyncio.run(collect()) == list(stream_anomalies(events))
+
+    def test_graph_uses_rolling_detector(self):
+        """Test the anomaly_detector option of the graph."""
+        transcription, emotions = _records(1)
+
+        dominant = run_interpretation_on_records(transcription, emotions)
+        rolling = run_interpretation_on_records(transcription, emotions, anomaly_detector="rolling")
+
+        assert rolling["anomalies"] == detect_anomalies_rolling(rolling)["anomalies"]
+        assert rolling["anomalies"] != dominant["anomalies"]
+        assert all("surprise" in anomaly for anomaly in rolling["anomalies"])
+        assert rolling["steps_completed"].count("anomaly_detection") == 1
+
+    def test_rejects_unknown_detector_and_fused_engine(self):
+        """Test that unsupported detector choices are rejected."""
+        transcription, emotions = _records(2, segments=5)
+        with pytest.raises(ValueError):
+            run_interpretation_on_records(transcription, emotions, anomaly_detector="median")
+        with pytest.raises(ValueError):
+            run_interpretation_on_records(transcription, emotions, engine="fused", anomaly_detector="rolling")
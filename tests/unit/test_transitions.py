@@ -0,0 +1,105 @@
+"""Tests for emotion transition matrices."""
+
+import random
+
+import pytest
+from src.core.alignment import AlignedEvents, transition_matrices
+from src.core.alignment import transitions as transitions_module
+
+EVENTS = [
+    {"start_time_ms": 0, "end_time_ms": 1000, "speaker": "A", "transcript": "One", "emotions": [
+        {"timestamp_ms": 100, "emotion": "Neutral", "confidence": None},
+        {"timestamp_ms": 500, "emotion": "Fear", "confidence": None},
+    ]},
+    {"start_time_ms": 1000, "end_time_ms": 2000, "speaker": "B", "transcript": "Two", "emotions": [
+        {"timestamp_ms": 1500, "emotion": "Joy", "confidence": None},
+    ]},
+    {"start_time_ms": 2000, "end_time_ms": 3000, "speaker": "A", "transcript": "Three", "emotions": [
+        {"timestamp_ms": 2500, "emotion": "Fear", "confidence": None},
+    ]},
+    {"start_time_ms": 3000, "end_time_ms": 4000, "speaker": "C", "transcript": "Silent", "emotions": []},
+]
+
+
+def _random_events(seed, count=300):
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        events.append({
+            "start_time_ms": i * 1000,
+            "end_time_ms": i * 1000 + 900,
+            "speaker": f"Speaker {rng.randrange(5)}",
+            "transcript": f"Line {i}",
+            "emotions": [
+                {"timestamp_ms": i * 1000 + j, "emotion": rng.choice(["Neutral", "Fear", "Joy", "Anger", "calm"]), "confidence": None}
+                for j in range(rng.randrange(4))
+            ],
+        })
+    return events
+
+
+class TestTransitionMatrices:
+    """Tests for transition_matrices."""
+
+    def test_counts_global_and_per_speaker(self):
+        """Test counts against hand-counted transitions."""
+        result = transition_matrices(AlignedEvents.from_events(EVENTS))
+
+        # Vocabulary order: Neutral, Joy, Fear
+        assert result["labels"] == ["Neutral", "Joy", "Fear"]
+        # Neutral -> Fear -> Joy -> Fear
+        assert result["global"]["counts"] == [[0, 0, 1], [0, 0, 1], [0, 1, 0]]
+        assert result["global"]["total"] == 3
+        # A: Neutral -> Fear -> Fear
+        assert result["by_speaker"]["A"]["counts"] == [[0, 0, 1], [0, 0, 0], [0, 0, 1]]
+        assert result["by_speaker"]["A"]["probabilities"] == [[0.0, 0.0, 1.0], [0.0, 0.0, 0.0], [0.0, 0.0, 1.0]]
+        assert result["by_speaker"]["B"]["total"] == 0
+        assert result["by_speaker"]["C"]["counts"] == [[0] * 3] * 3
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_python_fallback_matches_numpy(self, seed, monkeypatch):
+        """Test that the NumPy-free path gives identical results."""
+        events = AlignedEvents.from_events(_random_events(seed))
+        expected = transition_matrices(events)
+
+        monkeypatch.setattr(transitions_module, "np", None)
+
+        assert transition_matrices(events) == expected
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_matches_pairwise_count(self, seed):
+        """Test against a direct count over each speaker's emotion sequence."""
+        events = _random_events(seed)
+        result = transition_matrices(events)
+        labels = result["labels"]
+
+        sequences = {}
+        for event in AlignedEvents.from_events(events):
+            sequences.setdefault(event["speaker"], []).extend(e["emotion"] for e in event["emotions"])
+        for speaker, sequence in sequences.items():
+            expected = [[0] * len(labels) for _ in labels]
+            for previous, following in zip(sequence, sequence[1:]):
+                expected[labels.index(previous)][labels.index(following)] += 1
+            assert result["by_speaker"][speaker]["counts"] == expected
+        for row in result["global"]["probabilities"]:
+            assert sum(row) == pytest.approx(1.0) or sum(row) == 0
+
+    @pytest.mark.parametrize("numpy", [True, False])
+    def test_labels_sharing_a_code_share_a_row(self, numpy, monkeypatch):
+        """Test that container labels with the same vocabulary code are counted together."""
+        events = AlignedEvents.from_events(EVENTS)
+        # e.g. a container serialized before labels were encoded once per vocabulary code
+        events.labels = ["Neutral", "Joy", "Joy"]
+        if not numpy:
+            monkeypatch.setattr(transitions_module, "np", None)
+
+        result = transition_matrices(events)
+
+        assert result["labels"] == ["Neutral", "Joy"]
+        # Neutral -> Joy -> Joy -> Joy
+        assert result["global"]["counts"] == [[0, 1], [0, 2]]
+        assert result["by_speaker"]["A"]["counts"] == [[0, 1], [0, 1]]
+
+    def test_empty(self):
+        """Test that no events give empty matrices."""
+        assert transition_matrices([]) == {"labels": [], "global": {"counts": [], "probabilities": [], "total": 0}, "by_speaker": {}}
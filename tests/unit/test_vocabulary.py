@@ -0,0 +1,87 @@
+"""Unit tests for the emotion vocabulary."""
+
+import threading
+
+import pytest
+from src.core.alignment import EMOTION_VOCABULARY, AlignedEvents, EmotionVocabulary, codes_mask
+
+
+class TestEmotionVocabulary:
+    """Tests for label normalization, codes and bitmasks."""
+
+    def test_case_whitespace_and_synonyms_share_a_code(self):
+        """Test that label variants resolve to the canonical code."""
+        vocabulary = EmotionVocabulary()
+        joy = vocabulary.code("Joy")
+
+        assert vocabulary.code("joy") == joy
+        assert vocabulary.code(" JOY ") == joy
+        assert vocabulary.code("Happy") == joy
+        assert vocabulary.normalize("scared") == "Fear"
+
+    def test_unknown_labels_are_registered(self):
+        """Test that new labels get the next code and keep their first spelling."""
+        vocabulary = EmotionVocabulary()
+        size = len(vocabulary)
+
+        code = vocabulary.code("Awe ")
+
+        assert code == size
+        assert vocabulary.code("awe") == code
+        assert vocabulary.label(code) == "Awe"
+
+    def test_shared_vocabulary_is_frozen(self):
+        """Test that unknown labels never grow the process-wide vocabulary."""
+        size = len(EMOTION_VOCABULARY)
+
+        with pytest.raises(KeyError):
+            EMOTION_VOCABULARY.code("Awe")
+        assert EMOTION_VOCABULARY.normalize(" AWE ") == "Awe"
+        assert EMOTION_VOCABULARY.normalize("happy") == "Joy"
+        assert EMOTION_VOCABULARY.find("awe") is None
+        local = EMOTION_VOCABULARY.local(["Awe"])
+
+        assert local.code("awe") == size
+        assert local.code("Fear") == EMOTION_VOCABULARY.code("Fear")
+        assert len(EMOTION_VOCABULARY) == size
+
+    def test_container_codes_do_not_depend_on_history(self):
+        """Test that a container numbers its unknown labels the same in every process state."""
+        events = [{"start_time_ms": 0, "end_time_ms": 1000, "speaker": "A", "transcript": "Hi", "emotions": [
+            {"timestamp_ms": 100, "emotion": "Awe"}, {"timestamp_ms": 200, "emotion": "fear"},
+        ]}]
+        before = list(AlignedEvents.from_events(events).vocabulary_codes())
+
+        EMOTION_VOCABULARY.local(["Boredom", "Pride"])
+        AlignedEvents.from_events([dict(events[0], emotions=[{"timestamp_ms": 100, "emotion": "Pride"}])])
+
+        assert list(AlignedEvents.from_events(events).vocabulary_codes()) == before
+        assert before == [len(EMOTION_VOCABULARY), EMOTION_VOCABULARY.code("Fear")]
+
+    def test_masks_round_trip(self):
+        """Test bitmask encoding and decoding."""
+        vocabulary = EmotionVocabulary()
+        mask = vocabulary.mask(["Fear", "joy", "Fear"])
+
+        assert vocabulary.labels(mask) == ["Joy", "Fear"]
+        assert mask == codes_mask([vocabulary.code("Joy"), vocabulary.code("Fear")])
+        assert not mask & vocabulary.mask(["Neutral", "Anger"])
+        assert vocabulary.labels(0) == []
+
+    def test_concurrent_registration(self):
+        """Test that concurrent first uses of a label agree on one code."""
+        vocabulary = EmotionVocabulary()
+        size = len(vocabulary)
+        codes = []
+
+        def register():
+            codes.extend(vocabulary.code(f"Label {i}") for i in range(200))
+
+        threads = [threading.Thread(target=register) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(set(codes)) == 200
+        assert len(vocabulary) == size + 200